@@ -0,0 +1,245 @@
+"""Stream job postings from CSV or JSONL files into the MySQL job portal.
+
+    python bulk_import.py feed.csv more.jsonl.gz [--chunk-size 5000]
+
+Every record needs a title, description and company. Salary and the employer
+details (industry, location, website, contact person, phone) are optional, but
+an employer that doesn't exist yet can only be created with a phone number
+(PhoneNo is NOT NULL UNIQUE). Records that can't be imported are skipped and
+counted.
+
+Files are read one record at a time and written one chunk per transaction, so
+memory stays bounded by the chunk size plus the COMPANY -> ID map of employers.
+"""
+import argparse
+import csv
+import gzip
+import json
+import sys
+import time
+from collections import Counter
+from itertools import islice
+
+import mysql.connector
+
+from config import DB_HOST, DB_NAME, DB_PASSWORD, DB_USER
+from salary import parse_salary
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# accepted spellings of each field (compared lower-case, without spaces/underscores)
+FIELD_ALIASES = {
+    "title": ("title", "jobtitle"),
+    "description": ("description", "desc", "jobdescription"),
+    "salary": ("salary", "pay"),
+    "company": ("company", "companyname", "employer"),
+    "industry": ("industry",),
+    "location": ("location", "city"),
+    "website": ("website", "url"),
+    "contact_person": ("contactperson", "contact"),
+    "phone": ("phone", "phoneno", "phonenumber"),
+}
+_ALIAS_TO_FIELD = {alias: field for field, aliases in FIELD_ALIASES.items() for alias in aliases}
+
+# column widths of joblisting / employer; longer values are cut to fit
+MAX_LENGTHS = {"title": 120, "salary": 50, "company": 100, "industry": 100, "location": 100,
+               "website": 255, "contact_person": 100, "phone": 20}
+
+
+# =========================
+# Reading
+# =========================
+def open_text(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.lower().endswith(".csv") else "jsonl"
+
+
+def read_records(path, fmt=None):
+    """Yield normalized records from one file, streaming."""
+    fmt = fmt or detect_format(path)
+    with open_text(path) as f:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                yield normalize(row)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield normalize(json.loads(line))
+
+
+def normalize(record):
+    out = {}
+    for key, value in record.items():
+        field = _ALIAS_TO_FIELD.get("".join(ch for ch in str(key).lower() if ch.isalnum()))
+        if field is None or value is None:
+            continue
+        value = str(value).strip()
+        if value:
+            out[field] = value[:MAX_LENGTHS[field]] if field in MAX_LENGTHS else value
+    return out
+
+
+def chunked(records, size):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# =========================
+# Writing
+# =========================
+class BulkImporter:
+    """Inserts records chunk by chunk; employers are resolved by COMPANY.
+
+    Known employers are loaded once into a name -> ID map; a company that isn't
+    in it is inserted (or, if someone else just created it, looked up) the first
+    time it appears. Employers resolved that way join the map only once their
+    chunk commits: a chunk that is rolled back takes its new employers with it.
+    """
+
+    def __init__(self, conn, chunk_size=DEFAULT_CHUNK_SIZE, progress=sys.stderr):
+        self.conn = conn
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.employers = {}
+        self._pending = {}          # company -> (ID, inserted) resolved in the open chunk
+        self._unresolved = {}       # company -> why it can't be created, so it is tried once
+        self.stats = Counter()
+        self.skipped = Counter()    # reason -> records
+        self._started = None
+
+    def load_employers(self):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT ID, COMPANY FROM employer")
+        for employer_id, company in cursor:
+            self.employers[company.lower()] = employer_id
+        cursor.close()
+
+    def run(self, records):
+        self._started = time.perf_counter()
+        self.load_employers()
+        for chunk in chunked(records, self.chunk_size):
+            self.import_chunk(chunk)
+            self.report()
+        self.report(final=True)
+        return self.stats
+
+    def import_chunk(self, chunk):
+        cursor = self.conn.cursor()
+        try:
+            rows = []
+            for record in chunk:
+                self.stats["read"] += 1
+                if not all(record.get(f) for f in ("title", "description", "company")):
+                    self.skipped["missing title, description or company"] += 1
+                    continue
+                employer_id = self.resolve_employer(cursor, record)
+                if employer_id is None:
+                    continue
+                salary = record.get("salary")
+                rows.append((record["title"], record["description"], salary, *parse_salary(salary), employer_id))
+            if rows:
+                cursor.executemany(
+                    "INSERT INTO joblisting (Title, Description, Salary, SalaryMin, SalaryMax, CompanyID) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    rows,
+                )
+            self.conn.commit()
+            self.employers.update((key, employer_id) for key, (employer_id, _) in self._pending.items())
+            self.stats["employers"] += sum(inserted for _, inserted in self._pending.values())
+            self.stats["jobs"] += len(rows)
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self._pending = {}
+            cursor.close()
+
+    def resolve_employer(self, cursor, record):
+        key = record["company"].lower()
+        employer_id = self.employers.get(key)
+        if employer_id is None and key in self._pending:
+            employer_id = self._pending[key][0]
+        if employer_id is not None:
+            return employer_id
+        reason = self._unresolved.get(key)
+        if reason is None and not record.get("phone"):
+            reason = "new employer without phone"
+        if reason is not None:
+            self.skipped[reason] += 1
+            return None
+        try:
+            cursor.execute(
+                "INSERT INTO employer (COMPANY, INDUSTRY, LOCATION, Website, ContactPerson, PhoneNo) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                (record["company"], record.get("industry", ""), record.get("location", ""),
+                 record.get("website"), record.get("contact_person", ""), record["phone"]),
+            )
+            employer_id, inserted = cursor.lastrowid, True
+        except mysql.connector.IntegrityError:
+            # only this statement is rolled back; either the company was created
+            # meanwhile, or its phone/website belongs to another employer
+            cursor.execute("SELECT ID FROM employer WHERE COMPANY = %s", (record["company"],))
+            row = cursor.fetchone()
+            if row is None:
+                self._unresolved[key] = "employer phone or website already used"
+                self.skipped[self._unresolved[key]] += 1
+                return None
+            employer_id, inserted = row[0], False
+        self._pending[key] = (employer_id, inserted)
+        return employer_id
+
+    def report(self, final=False):
+        if not self.progress:
+            return
+        elapsed = time.perf_counter() - self._started
+        rate = self.stats["read"] / elapsed if elapsed else 0.0
+        line = (f"{self.stats['read']:,} read, {self.stats['jobs']:,} jobs, "
+                f"{self.stats['employers']:,} new employers, {sum(self.skipped.values()):,} skipped "
+                f"- {rate:,.0f} records/s")
+        if final:
+            print(f"\r{line} in {elapsed:.1f}s", file=self.progress)
+            for reason, count in self.skipped.most_common():
+                print(f"  skipped {count:,}: {reason}", file=self.progress)
+        else:
+            print(f"\r{line}", end="", file=self.progress, flush=True)
+
+
+def iter_files(paths, fmt=None):
+    for path in paths:
+        yield from read_records(path, fmt)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import job postings from CSV or JSONL files (optionally .gz).")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="default: from each file's extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"records per transaction (default {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args(argv)
+
+    conn = mysql.connector.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME)
+    try:
+        BulkImporter(conn, chunk_size=args.chunk_size).run(iter_files(args.files, args.format))
+    except mysql.connector.Error as err:
+        if err.errno == 1146:   # table doesn't exist
+            print(f"\n{err.msg} - start the app once to create the schema", file=sys.stderr)
+            return 1
+        raise
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
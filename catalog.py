@@ -0,0 +1,81 @@
+from bisect import bisect_left
+
+
+# =========================
+# Job catalog cache
+# =========================
+class JobCatalog:
+    """Client-side cache of the job listing, newest first, keyed by job ID.
+
+    Pages are appended as they are loaded; single rows can be inserted, replaced
+    or dropped in place. `jobs` is the live ordered list the job list displays.
+    Rows older than the oldest loaded page are ignored until their page is
+    loaded (unless the whole listing is already `complete`).
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self.by_id = {}
+        self._keys = []         # -id for each entry of jobs, ascending
+        self.complete = False
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def __contains__(self, job_id):
+        return job_id in self.by_id
+
+    @property
+    def floor(self):
+        # ID of the oldest loaded job
+        return self.jobs[-1].id if self.jobs else None
+
+    def extend(self, page, complete=False):
+        for job in page:
+            if job.id in self.by_id:
+                self._replace(job)
+            elif self.floor is None or job.id < self.floor:
+                self.jobs.append(job)
+                self._keys.append(-job.id)
+                self.by_id[job.id] = job
+            else:
+                self.upsert(job)
+        self.complete = complete
+
+    def covers(self, job_id):
+        return self.complete or (self.floor is not None and job_id >= self.floor)
+
+    def upsert(self, job):
+        """Insert or replace one job; returns False if it lies beyond the loaded pages."""
+        if job.id in self.by_id:
+            self._replace(job)
+            return True
+        if not self.covers(job.id):
+            return False
+        i = bisect_left(self._keys, -job.id)
+        self.jobs.insert(i, job)
+        self._keys.insert(i, -job.id)
+        self.by_id[job.id] = job
+        return True
+
+    def remove(self, job_id):
+        if self.by_id.pop(job_id, None) is None:
+            return False
+        i = bisect_left(self._keys, -job_id)
+        del self.jobs[i]
+        del self._keys[i]
+        return True
+
+    def apply(self, upserts=(), deletes=()):
+        """Merge a delta; returns True if anything loaded changed."""
+        changed = False
+        for job_id in deletes:
+            changed |= self.remove(job_id)
+        for job in upserts:
+            changed |= self.upsert(job)
+        return changed
+
+    def _replace(self, job):
+        i = bisect_left(self._keys, -job.id)
+        self.jobs[i] = job
+        self.by_id[job.id] = job
@@ -0,0 +1,8 @@
+# =========================
+# Database configuration
+# =========================
+# shared by the app and the command-line tools
+DB_HOST = "localhost"
+DB_USER = "jobuser"
+DB_PASSWORD = "jobpassword"
+DB_NAME = "job_portal"     # database will be created if it doesn't exist
@@ -0,0 +1,188 @@
+"""Password hashing for signup and login, off the calling thread.
+
+Hashes are self-describing strings, so the cost can change at any time:
+
+    scrypt$<n>$<r>$<p>$<salt>$<hash>          (salt and hash base64)
+    pbkdf2_sha256$<iterations>$<salt>$<hash>
+
+A stored hash made with other parameters than the current ones (or a raw
+password from before hashing) still verifies, and verify() hands back a new
+hash to store in its place, so accounts move to the current cost as they log in.
+
+    python credentials.py --bench [--seconds 3] [--workers 4]
+
+reports hashes (= logins) per second for one core and for the process pool, to
+size the cost against the peak login rate.
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# =========================
+# Configuration
+# =========================
+SCHEME = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+SCRYPT_COST = {"n": 2 ** 14, "r": 8, "p": 1}    # ~16 MiB and a few tens of ms per hash
+PBKDF2_ITERATIONS = 600_000
+SALT_BYTES = 16
+HASH_BYTES = 32
+DEFAULT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+
+# =========================
+# Hashing
+# =========================
+def current_params(scheme=SCHEME):
+    if scheme == "scrypt":
+        return dict(SCRYPT_COST)
+    return {"iterations": PBKDF2_ITERATIONS}
+
+
+def hash_password(password, scheme=SCHEME, params=None):
+    params = params or current_params(scheme)
+    salt = os.urandom(SALT_BYTES)
+    digest = _derive(password, salt, scheme, params)
+    return "$".join([scheme, *(str(v) for v in params.values()), _b64(salt), _b64(digest)])
+
+
+def verify_password(password, stored, scheme=SCHEME, params=None):
+    """(matches, new hash to store or None).
+
+    The new hash is only given for a match whose stored hash is a raw password
+    or was made with other parameters than the current ones.
+    """
+    if not stored or password is None:
+        return False, None
+    parsed = _parse(stored)
+    if parsed is None:
+        # raw password stored before hashing
+        ok = hmac.compare_digest(stored.encode(), password.encode())
+    else:
+        stored_scheme, stored_params, salt, digest = parsed
+        ok = hmac.compare_digest(_derive(password, salt, stored_scheme, stored_params), digest)
+    if ok and needs_rehash(stored, scheme, params):
+        return True, hash_password(password, scheme, params)
+    return ok, None
+
+
+def needs_rehash(stored, scheme=SCHEME, params=None):
+    parsed = _parse(stored)
+    return parsed is None or (parsed[0], parsed[1]) != (scheme, params or current_params(scheme))
+
+
+def _derive(password, salt, scheme, params):
+    if scheme == "scrypt":
+        n, r, p = params["n"], params["r"], params["p"]
+        # maxmem: OpenSSL's 32 MiB default is too small above n=2**14
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, dklen=HASH_BYTES,
+                              maxmem=256 * n * r + (1 << 20))
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, params["iterations"], HASH_BYTES)
+
+
+def _parse(stored):
+    # (scheme, params, salt, hash), or None for anything that isn't a hash of ours
+    parts = stored.split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            params = {"n": int(parts[1]), "r": int(parts[2]), "p": int(parts[3])}
+        elif parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            params = {"iterations": int(parts[1])}
+        else:
+            return None
+        return parts[0], params, _unb64(parts[-2]), _unb64(parts[-1])
+    except ValueError:
+        return None
+
+
+def _b64(data):
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4), validate=True)
+
+
+# =========================
+# Process pool
+# =========================
+class PasswordHasher:
+    """Runs hash_password / verify_password in worker processes.
+
+    A hash is deliberately CPU-heavy, and in a thread it would hold the GIL for
+    its whole duration, freezing the Tk loop or the HTTP server's event loop.
+    hash() and verify() return Futures; the pool starts on first use.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, scheme=SCHEME, params=None):
+        self.workers = workers
+        self.scheme = scheme
+        self.params = params or current_params(scheme)
+        self._pool = None
+
+    def hash(self, password):
+        return self._executor().submit(hash_password, password, self.scheme, self.params)
+
+    def verify(self, password, stored):
+        """Future of (matches, new hash to store or None)."""
+        return self._executor().submit(verify_password, password, stored, self.scheme, self.params)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            # spawn, not fork: the parent has DB and Tk threads running
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+
+# =========================
+# Benchmark
+# =========================
+def bench(seconds=3.0, workers=DEFAULT_WORKERS, scheme=SCHEME, params=None):
+    params = params or current_params(scheme)
+    print(f"{scheme} {params}")
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        hash_password("correct horse battery staple", scheme, params)
+        count += 1
+    elapsed = time.perf_counter() - start
+    print(f"1 core: {count / elapsed:,.1f} logins/s ({1000 * elapsed / count:.1f} ms per hash)")
+
+    hasher = PasswordHasher(workers, scheme, params)
+    for f in [hasher.hash("warm up") for _ in range(workers)]:
+        f.result()      # workers started before timing
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for f in [hasher.hash("correct horse battery staple") for _ in range(workers * 4)]:
+            f.result()
+        count += workers * 4
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+    print(f"{workers} workers: {count / elapsed:,.1f} logins/s ({count / elapsed / workers:,.1f} per core)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Password hashing benchmark.")
+    parser.add_argument("--bench", action="store_true", help="measure logins per second at the current cost")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--scheme", choices=("scrypt", "pbkdf2_sha256"), default=SCHEME)
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return 0
+    bench(args.seconds, args.workers, args.scheme)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+# =========================
+# Connection pool
+# =========================
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """A bounded set of DB connections shared by worker threads.
+
+    connect() opens a new connection. On borrow, a connection that has been idle
+    for more than ping_idle seconds is checked with ping(conn); if that fails it
+    is replaced by a fresh one, so connections the server dropped while idle are
+    never handed out.
+    """
+
+    def __init__(self, connect, size=4, ping=None, ping_idle=1.0, timeout=30.0):
+        self._connect = connect
+        self.size = size
+        self._ping = ping
+        self.ping_idle = ping_idle
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._idle = []         # (conn, released at), most recently used last
+        self._open = 0          # idle + borrowed
+        self._closed = False
+        # metrics
+        self._borrows = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._reconnects = 0
+
+    # ---------- Borrow / return ----------
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        with self._cond:
+            while not self._idle and self._open >= self.size:
+                if self._closed:
+                    raise PoolTimeout("pool is closed")
+                remaining = timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    raise PoolTimeout(f"no connection available after {timeout:.1f}s")
+                self._cond.wait(remaining)
+            if self._idle:
+                conn, released = self._idle.pop()
+            else:
+                conn, released = None, None
+                self._open += 1
+            waited = time.perf_counter() - start
+            self._borrows += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            if waited > 0.001:
+                self._waits += 1
+
+        try:
+            if conn is None:
+                conn = self._connect()
+            elif self._ping and time.monotonic() - released > self.ping_idle:
+                conn = self._check(conn)
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def release(self, conn, broken=False):
+        with self._cond:
+            if broken or self._closed:
+                self._open -= 1
+                _close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _check(self, conn):
+        try:
+            self._ping(conn)
+            return conn
+        except Exception:
+            _close_quietly(conn)
+            conn = self._connect()
+            with self._cond:
+                self._reconnects += 1
+            return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            # if even the rollback fails the connection itself is gone; don't put it back
+            self.release(conn, broken=not _rollback_quietly(conn))
+            raise
+        # end the task's transaction too: with autocommit off, a read leaves a REPEATABLE READ
+        # snapshot open, and the connection's next borrower wouldn't see later commits
+        self.release(conn, broken=not _rollback_quietly(conn))
+
+    @contextmanager
+    def cursor(self, **kwargs):
+        # one cursor per operation, committed when the block succeeds
+        with self.connection() as conn:
+            cursor = conn.cursor(**kwargs)
+            try:
+                yield cursor
+                conn.commit()
+            finally:
+                cursor.close()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                _close_quietly(conn)
+            self._open -= len(self._idle)
+            self._idle = []
+            self._cond.notify_all()
+
+    # ---------- Metrics ----------
+    def stats(self):
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self.size,
+                "active": self._open - idle,
+                "idle": idle,
+                "borrows": self._borrows,
+                "waits": self._waits,
+                "wait_avg_ms": 1000 * self._wait_total / self._borrows if self._borrows else 0.0,
+                "wait_max_ms": 1000 * self._wait_max,
+                "reconnects": self._reconnects,
+            }
+
+
+def _rollback_quietly(conn):
+    try:
+        conn.rollback()
+        return True
+    except Exception:
+        return False
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
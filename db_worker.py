@@ -0,0 +1,229 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+# =========================
+# DB executor
+# =========================
+class DBExecutor:
+    """Runs database work on worker threads, each task on a pooled connection.
+
+    submit(fn, *args) queues fn(conn, *args) and returns a Future; the connection
+    is borrowed from the pool for the duration of the call. Submitting with
+    a key supersedes the previous request with the same key: it is cancelled if it
+    has not started yet, and marked stale otherwise so its result can be dropped.
+    """
+
+    def __init__(self, pool, workers=1, name="db"):
+        self.pool = pool
+        self._tasks = queue.Queue()
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, fn, *args, key=None):
+        future = Future()
+        future.stale = False
+        if key is not None:
+            with self._lock:
+                previous = self._latest.get(key)
+                self._latest[key] = future
+            if previous is not None and not previous.cancel():
+                previous.stale = True
+        self._tasks.put((future, fn, args))
+        return future
+
+    def shutdown(self, wait=False, cancel_futures=False):
+        if cancel_futures:
+            # tasks not started yet are dropped; a running one finishes and returns its connection
+            while True:
+                try:
+                    task = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if task is not None:
+                    task[0].cancel()
+        for _ in self._threads:
+            self._tasks.put(None)
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def _run(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            future, fn, args = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                with self.pool.connection() as conn:
+                    result = fn(conn, *args)
+            except BaseException as err:
+                future.set_exception(err)
+            else:
+                future.set_result(result)
+
+
+# =========================
+# Group commit
+# =========================
+class GroupCommitQueue:
+    """Write-behind queue that commits many small writes in one transaction.
+
+    submit(*item) returns a Future. A single writer thread takes whatever has
+    queued up (at most max_batch items, waiting up to max_wait seconds after the
+    first one for more) and runs write_batch(conn, items) on a pooled connection;
+    write_batch writes them all in one transaction and commits. It returns one
+    result per item; an exception in that list fails only its own item's future.
+    If the batch as a whole fails it is rolled back and every future in it gets
+    the error.
+    """
+
+    def __init__(self, pool, write_batch, max_batch=200, max_wait=0.002, name="group-commit"):
+        self.pool = pool
+        self.write_batch = write_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._items = queue.Queue()
+        self._lock = threading.Lock()
+        # metrics
+        self._batches = 0
+        self._written = 0
+        self._max_depth = 0
+        self._commit_total = 0.0
+        self._commit_max = 0.0
+        self._commit_last = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, *item):
+        future = Future()
+        self._items.put((future, item))
+        with self._lock:
+            self._max_depth = max(self._max_depth, self._items.qsize())
+        return future
+
+    def shutdown(self, wait=False):
+        # items queued before this are still written
+        self._items.put(None)
+        if wait:
+            self._thread.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "depth": self._items.qsize(),
+                "max_depth": self._max_depth,
+                "batches": self._batches,
+                "written": self._written,
+                "avg_batch": self._written / self._batches if self._batches else 0.0,
+                "commit_avg_ms": 1000 * self._commit_total / self._batches if self._batches else 0.0,
+                "commit_max_ms": 1000 * self._commit_max,
+                "commit_last_ms": 1000 * self._commit_last,
+            }
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._items.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            # whatever arrived while the last batch was committing goes into this one
+            while len(batch) < self.max_batch:
+                try:
+                    remaining = deadline - time.monotonic()
+                    entry = self._items.get(timeout=remaining) if remaining > 0 else self._items.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._write(batch)
+
+    def _write(self, batch):
+        batch = [(f, item) for f, item in batch if f.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        futures = [f for f, _ in batch]
+        items = [item for _, item in batch]
+        start = time.perf_counter()
+        try:
+            with self.pool.connection() as conn:
+                results = self.write_batch(conn, items)
+        except BaseException as err:
+            for future in futures:
+                future.set_exception(err)
+            return
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._batches += 1
+            self._written += len(items)
+            self._commit_total += elapsed
+            self._commit_max = max(self._commit_max, elapsed)
+            self._commit_last = elapsed
+        for future, result in zip(futures, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# =========================
+# Tk bridge
+# =========================
+class TkDispatcher:
+    """Hands finished futures back to the Tk thread by polling with after().
+
+    Tk must only be touched from its own thread, so callbacks never run on the
+    worker. on_busy(True/False) is called when work starts / all work is done,
+    e.g. to show a loading indicator.
+    """
+
+    def __init__(self, widget, interval=15, on_busy=None):
+        self.widget = widget
+        self.interval = interval
+        self.on_busy = on_busy
+        self._pending = []
+        self._polling = False
+
+    def watch(self, future, on_done=None, on_error=None):
+        self._pending.append((future, on_done, on_error))
+        if not self._polling:
+            self._polling = True
+            if self.on_busy:
+                self.on_busy(True)
+            self.widget.after(self.interval, self._poll)
+        return future
+
+    def _poll(self):
+        finished, pending = [], []
+        for p in self._pending:
+            (finished if p[0].done() else pending).append(p)
+        self._pending = pending
+        for future, on_done, on_error in finished:
+            if future.cancelled() or getattr(future, "stale", False):
+                continue
+            err = future.exception()
+            if err is not None:
+                if on_error:
+                    on_error(err)
+            elif on_done:
+                on_done(future.result())
+        if self._pending:
+            self.widget.after(self.interval, self._poll)
+        else:
+            self._polling = False
+            if self.on_busy:
+                self.on_busy(False)
@@ -0,0 +1,148 @@
+"""Export job applications, with applicant and job details, to CSV or JSONL.
+
+    python export_applications.py applications.csv.gz [--employer "Tech Solutions"]
+        [--since 2024-01-01] [--until 2024-12-31] [--format csv|jsonl] [--sqlite job_portal.db]
+
+Rows are streamed from the database in fetchmany() batches and written as they
+arrive, so memory use doesn't depend on how many applications there are. On MySQL
+the cursor is unbuffered: the server sends rows as they are read instead of the
+client loading the whole result first. A path ending in .gz is gzip-compressed;
+"-" writes to stdout.
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+from config import DB_HOST, DB_NAME, DB_PASSWORD, DB_USER
+
+FETCH_SIZE = 5000           # rows per fetchmany()
+WRITE_BUFFER = 1 << 20      # bytes buffered before each write to disk
+GZIP_LEVEL = 5              # higher levels cost much more CPU for little gain
+
+COLUMNS = ("application_id", "applied_at", "status", "company", "job_id", "job_title",
+           "applicant_name", "applicant_email", "experience", "skills", "cover_letter")
+
+MYSQL_QUERY = """
+    SELECT a.ID, a.ApplicationDate, a.Status, e.COMPANY, j.ID, j.Title,
+           s.Name, s.Email, s.Experience, s.Skills, a.CoverLetter
+    FROM job_application a
+    JOIN joblisting j ON j.ID = a.JobID
+    LEFT JOIN employer e ON e.ID = j.CompanyID
+    JOIN jobseeker s ON s.ID = a.JobSeekerID
+"""
+
+# the sqlite app keeps applicant details on the application itself
+SQLITE_QUERY = """
+    SELECT a.id, a.created_at, NULL, j.company, j.id, j.title,
+           a.applicant_name, a.applicant_email, NULL, NULL, NULL
+    FROM applications a
+    JOIN jobs j ON j.id = a.job_id
+"""
+
+
+def export_applications(conn, out, fmt="csv", employer=None, since=None, until=None, dialect="mysql",
+                        fetch_size=FETCH_SIZE):
+    """Write the matching applications to the text stream `out`; returns the row count.
+
+    employer: company name, or employer ID (MySQL); since/until: dates, inclusive.
+    """
+    mark = "%s" if dialect == "mysql" else "?"
+    where, params = [], []
+    if employer is not None:
+        if dialect == "mysql" and str(employer).isdigit():
+            where.append(f"j.CompanyID = {mark}")
+            params.append(int(employer))
+        else:
+            where.append(f"{'e.COMPANY' if dialect == 'mysql' else 'j.company'} = {mark}")
+            params.append(employer)
+    applied = "a.ApplicationDate" if dialect == "mysql" else "a.created_at"
+    if since is not None:
+        where.append(f"{applied} >= {mark}")
+        params.append(since.isoformat())
+    if until is not None:
+        where.append(f"{applied} < {mark}")
+        params.append((until + timedelta(days=1)).isoformat())
+    sql = (MYSQL_QUERY if dialect == "mysql" else SQLITE_QUERY)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # primary key order (= order of arrival) streams without a sort step
+    sql += " ORDER BY a.ID" if dialect == "mysql" else " ORDER BY a.id"
+
+    # unbuffered (mysql.connector's default): rows come off the socket as they're fetched
+    cursor = conn.cursor(buffered=False) if dialect == "mysql" else conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        return write_rows(out, fmt, iter_batches(cursor, fetch_size))
+    finally:
+        cursor.close()
+
+
+def iter_batches(cursor, size):
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield rows
+
+
+def write_rows(out, fmt, batches):
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(COLUMNS)
+        for rows in batches:
+            writer.writerows(rows)
+            count += len(rows)
+    else:
+        dumps = json.JSONEncoder(default=str, ensure_ascii=False).encode
+        for rows in batches:
+            out.write("".join(dumps(dict(zip(COLUMNS, row))) + "\n" for row in rows))
+            count += len(rows)
+    return count
+
+
+def open_output(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="", write_through=False)
+    if path.endswith(".gz"):
+        raw = gzip.open(path, "wb", compresslevel=GZIP_LEVEL)
+        return io.TextIOWrapper(io.BufferedWriter(raw, WRITE_BUFFER), encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export job applications to CSV or JSONL.")
+    parser.add_argument("output", help='file to write (.gz to compress, "-" for stdout)')
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="default: from the file extension, else csv")
+    parser.add_argument("--employer", help="company name (or employer ID)")
+    parser.add_argument("--since", type=date.fromisoformat, help="first application date, YYYY-MM-DD")
+    parser.add_argument("--until", type=date.fromisoformat, help="last application date, YYYY-MM-DD")
+    parser.add_argument("--sqlite", metavar="DB", help="export from the sqlite app's database instead of MySQL")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("jsonl" if args.output.removesuffix(".gz").endswith((".jsonl", ".json")) else "csv")
+    if args.sqlite:
+        conn, dialect = sqlite3.connect(args.sqlite), "sqlite"
+    else:
+        import mysql.connector  # only needed for MySQL exports
+        conn = mysql.connector.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME)
+        dialect = "mysql"
+    started = time.perf_counter()
+    try:
+        with open_output(args.output) as out:
+            count = export_applications(conn, out, fmt, args.employer, args.since, args.until, dialect)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+    print(f"{count:,} applications exported in {elapsed:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# =========================
+# Facet index
+# =========================
+class FacetIndex:
+    """Item IDs per facet value, for combining facet filters and counting them.
+
+    postings[facet][value] is the set of item IDs with that value, so a value's
+    count is just the size of its set; it is kept current as items are added and
+    removed and never needs a GROUP BY. A selection ({facet: values}) ORs the
+    values within a facet and intersects across facets.
+    """
+
+    def __init__(self, names):
+        self.names = tuple(names)
+        self.postings = {name: {} for name in self.names}
+        self._values = {}       # item id -> {facet: value}
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, item_id):
+        return item_id in self._values
+
+    def add(self, item_id, values):
+        """Index (or re-index) one item; facets whose value is None are left out."""
+        self.remove(item_id)
+        values = {name: v for name, v in values.items() if v is not None and name in self.postings}
+        self._values[item_id] = values
+        for name, value in values.items():
+            self.postings[name].setdefault(value, set()).add(item_id)
+
+    def remove(self, item_id):
+        for name, value in self._values.pop(item_id, {}).items():
+            ids = self.postings[name][value]
+            ids.discard(item_id)
+            if not ids:
+                del self.postings[name][value]
+
+    def matching(self, selected, exclude=None):
+        """IDs matching every selected facet (but `exclude`); None if nothing restricts them."""
+        groups = []
+        for name, values in selected.items():
+            if name == exclude or not values:
+                continue
+            postings = self.postings.get(name, {})
+            sets = [postings[v] for v in values if v in postings]
+            groups.append(sets[0] if len(sets) == 1 else set().union(*sets))
+        if not groups:
+            return None
+        # smallest first, so each intersection only walks what is left
+        groups.sort(key=len)
+        result = set(groups[0])
+        for ids in groups[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+    def counts(self, selected):
+        """{facet: {value: count}} given the selection.
+
+        Each facet is counted against the other facets' selections only, so its
+        counts say how many items choosing that value (too) would show.
+        """
+        counts = {}
+        for name in self.names:
+            base = self.matching(selected, exclude=name)
+            postings = self.postings[name]
+            if base is None:
+                counts[name] = {v: len(ids) for v, ids in postings.items()}
+            else:
+                counts[name] = {v: n for v, ids in postings.items() if (n := len(ids & base))}
+        return counts
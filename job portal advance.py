@@ -1,44 +1,101 @@
-import mysql.connector
+import time
+
+STARTED = time.perf_counter()   # for the startup report, which counts the imports below too
+
+from contextlib import closing
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from datetime import datetime
+
+from catalog import JobCatalog
+from config import DB_HOST, DB_NAME, DB_PASSWORD, DB_USER
+from credentials import PasswordHasher
+from db_pool import ConnectionPool
+from db_worker import DBExecutor, GroupCommitQueue, TkDispatcher
+from facets import FacetIndex
+from migrations import SCHEMA_VERSION, migrate
+from paging import KeysetPager
+from pictures import LIST_THUMB_SIZE, PROFILE_THUMB_SIZE, PictureStore, ThumbnailCache
+from portal_service import DEFAULT_SORT, FACET_COLUMNS, JOB_SORTS, NO_FILTERS, MySQLPortal, facet_dict
+from salary import SALARY_BANDS, parse_amount, parse_salary, salary_band
+from search_index import SearchIndex, TrigramIndex, tokenize
 
 # =========================
 # Configuration
 # =========================
-DB_HOST = "localhost"
-DB_USER = "jobuser"
-DB_PASSWORD = "jobpassword"
-DB_NAME = "job_portal"     # database will be created if it doesn't exist
+DB_POOL_SIZE = 4           # pooled connections, one DB worker thread per connection
+
+SEARCH_MODE = "memory"     # "memory": in-process inverted index, "fulltext": MySQL MATCH ... AGAINST
+SEARCH_PAGE_SIZE = 50      # rows per page fetched in fulltext mode
+SEARCH_DEBOUNCE_MS = 150   # pause in typing before a live search runs
+JOB_PAGE_SIZE = 50         # rows per page when browsing the job list
+INDEX_BATCH_SIZE = 5000    # rows per query when loading the catalog for the in-memory index
+CHANGE_BATCH_SIZE = 5000   # change-log rows per query when refreshing the job list
+
+FACET_LIMIT = 8               # values listed per facet, most jobs first
+RECOMMEND_LIMIT = 10          # jobs suggested for the skills in the profile window
+
+JOB_ROW_HEIGHT = 130              # px per row in the virtualized job list
+JOB_ROW_DESCRIPTION_CHARS = 160
 
 
 # =========================
 # Domain Models
 # =========================
 class Job:
-    def __init__(self, id_, title, description, salary, company):
+    def __init__(self, id_, title, description, salary, company, salary_min=None, salary_max=None,
+                 industry=None, location=None):
         self.id = id_
         self.title = title
         self.description = description
-        self.salary = salary
+        self.salary = salary            # as entered, for display
         self.company = company
+        self.salary_min = salary_min    # parsed, for filtering and sorting
+        self.salary_max = salary_max
+        self.industry = industry        # employer's, for the facets
+        self.location = location
+
+    def _fields(self):
+        return (self.id, self.title, self.description, self.salary, self.company, self.salary_min, self.salary_max,
+                self.industry, self.location)
+
+    def __eq__(self, other):
+        return isinstance(other, Job) and self._fields() == other._fields()
+
+    def __hash__(self):
+        return hash(self.id)
 
 
 class ScrollableFrame(ttk.Frame):
-    def __init__(self, container, *args, **kwargs):
+    def __init__(self, container, *args, virtual=False, row_height=120, overscan=3, **kwargs):
         super().__init__(container, *args, **kwargs)
 
+        self.virtual = virtual
+        self.row_height = row_height
+        self.overscan = overscan
+
         self.canvas = tk.Canvas(self, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.scrollbar = scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
         self.scrollable_frame = ttk.Frame(self.canvas)
 
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")),
-        )
+        if virtual:
+            # rows are canvas windows positioned by index; only the visible slice exists
+            self._items = []
+            self._create_row = None
+            self._bind_row = None
+            self._key = id
+            self._on_near_end = None
+            self._slots = []
+            self._bound = {}  # key -> slot currently showing that item
+            self._free = []
+            self.canvas.configure(yscrollcommand=self._on_yscroll, yscrollincrement=max(1, row_height // 4))
+        else:
+            self.scrollable_frame.bind(
+                "<Configure>",
+                lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")),
+            )
 
-        self._win = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+            self._win = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
+            self.canvas.configure(yscrollcommand=scrollbar.set)
 
         def _on_mousewheel(event):
             self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
@@ -50,28 +107,165 @@ class ScrollableFrame(ttk.Frame):
 
         # Make inner frame adapt to width
         def _configure_inner(event):
-            self.canvas.itemconfig(self._win, width=event.width)
+            if self.virtual:
+                for slot in self._slots:
+                    self.canvas.itemconfig(slot[1], width=event.width)
+                self._render_visible()
+            else:
+                self.canvas.itemconfig(self._win, width=event.width)
         self.canvas.bind('<Configure>', _configure_inner)
 
+    # ---------- Virtual mode ----------
+    def set_rows(self, items, create_row, bind_row, key=id, keep_position=False, on_near_end=None):
+        # create_row(parent) -> row widget, bind_row(row, item) fills it in.
+        # Rows are pooled by key(item): a refresh only rebinds rows whose item changed
+        # and moves rows whose position changed; everything else is left alone.
+        # on_near_end() is called when the view gets within the overscan of the last row.
+        self._items = items
+        self._create_row = create_row
+        self._bind_row = bind_row
+        self._key = key
+        self._on_near_end = on_near_end
+        self.canvas.configure(scrollregion=(0, 0, 0, len(items) * self.row_height))
+        if not keep_position:
+            self.canvas.yview_moveto(0)
+        self._render_visible()
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._render_visible()
+
+    def _visible_range(self):
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+        first = max(0, int(top // self.row_height) - self.overscan)
+        last = min(len(self._items), int((top + height) // self.row_height) + 1 + self.overscan)
+        return first, max(first, last)
+
+    def _render_visible(self):
+        if not self._create_row:
+            return
+        first, last = self._visible_range()
+        visible = self._items[first:last]
+        keys = [self._key(item) for item in visible]
+
+        wanted = set(keys)
+        for k in [k for k in self._bound if k not in wanted]:
+            slot = self._bound.pop(k)
+            self.canvas.itemconfigure(slot[1], state="hidden")
+            self._free.append(slot)
+
+        for offset, (k, item) in enumerate(zip(keys, visible)):
+            y = (first + offset) * self.row_height
+            slot = self._bound.get(k)
+            if slot is None:
+                slot = self._free.pop() if self._free else self._new_slot()
+                self.canvas.itemconfigure(slot[1], state="normal")
+                self._bound[k] = slot
+            if slot[2] is None or slot[2] != item:
+                self._bind_row(slot[0], item)
+                slot[2] = item
+            if slot[3] != y:
+                self.canvas.coords(slot[1], 0, y)
+                slot[3] = y
+
+        if self._on_near_end and last >= len(self._items):
+            self._on_near_end()
+
+    def _new_slot(self):
+        row = self._create_row(self.canvas)
+        win = self.canvas.create_window(0, 0, window=row, anchor="nw",
+                                        width=self.canvas.winfo_width(), height=self.row_height)
+        slot = [row, win, None, None]  # row, canvas window id, bound item, y
+        self._slots.append(slot)
+        return slot
+
+
+# =========================
+# Startup timing
+# =========================
+class StartupReport:
+    """Time from process start to milestones of the app's start, printed once the first page is on screen."""
+
+    def __init__(self, started=STARTED):
+        self.started = started
+        self.marks = []             # (milestone, seconds since start); appended from DB workers too
+        self.notes = []
+        self.reported = False
+
+    def mark(self, milestone, note=None):
+        self.marks.append((milestone, time.perf_counter() - self.started))
+        if note:
+            self.notes.append(note)
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        steps = "  ".join(f"{milestone} {1000 * t:.0f} ms" for milestone, t in self.marks)
+        print(f"Startup: {steps}" + (f"  ({'; '.join(self.notes)})" if self.notes else ""))
+
 
 # =========================
 # Main Application
 # =========================
 class JobPortalApp:
-    def __init__(self, master):
+    def __init__(self, master, startup=None):
         self.master = master
+        self.startup = startup or StartupReport()
         master.title("Job Portal")
         master.attributes('-fullscreen', True)
 
-        self.conn = None
-        self.cursor = None
+        self.catalog = JobCatalog()  # loaded part of the listing, newest first
+        self.jobs = self.catalog.jobs
+        self.pager = None           # loads the catalog page by page
+        self._shown_pager = None    # pager whose rows are on screen, if any
+        self._shown_catalog = None  # catalog those rows are merged into, for the browse list
+        self.service = MySQLPortal()  # the queries shared with portal_http.py
+        self.search_index = SearchIndex()
+        self._index_ready = False
+        self._index_loading = False
+        self._index_backlog = []    # (upserts, deletes) that arrived while the index was being built
+        self._change_tracking = False
+        self._watermark = None      # last joblisting_change.Seq merged into the catalog
+        self._search_after = None   # pending debounced search
+        self._search_pager = None   # fulltext pager of the latest search
+        self._last_query = ""
+        self._last_result_ids = None  # memory mode: IDs matching _last_query, for narrowing
+        self._last_filters = NO_FILTERS
+        self.facets = FacetIndex(FACET_COLUMNS)
+        self._facets_ready = False
+        self._facets_loading = False
+        self._facet_backlog = []    # (upserts, deletes) that arrived while the facets were loading
+        self._facet_selection = set()  # chosen (facet, value) pairs
+        self._facet_vars = []
+        self._fuzzy_vocab = None    # fulltext mode: TrigramIndex of job words, loaded on the first miss
+        self._vocab_loading = False
+        self.recommender = None     # JobRecommender over the whole catalog, built on the first request
+        self._recommender_loading = False
+        self._recommender_backlog = []  # (upserts, deletes) that arrived while it was being built
+        self._recommender_waiting = []  # requests to answer once it is built
 
         self._create_styles()
         self._create_layout()
-        self.connect_db()
-        self.ensure_schema()
-        self.seed_sample_data_if_empty()
-        self.load_jobs_from_db()
+
+        # all SQL runs on the DB workers; results come back to Tk through the dispatcher.
+        # Applications are written behind, many per transaction, on a connection of their own.
+        self.pool = ConnectionPool(self.connect_db, size=DB_POOL_SIZE + 1, ping=self._ping_db)
+        self.db = DBExecutor(self.pool, workers=DB_POOL_SIZE)
+        self.applications = GroupCommitQueue(self.pool, self.service.apply_batch)
+        self.passwords = PasswordHasher()  # hashing runs in worker processes, off the Tk thread
+        self.ranker = None          # ApplicantRanker, made on first use (False without NumPy)
+        self.dispatcher = TkDispatcher(master, on_busy=self._set_busy)
+        # pictures are hashed, stored and thumbnailed on a pool; Tk only sees small decoded thumbnails
+        self.pictures = PictureStore()
+        self.thumbnails = ThumbnailCache(self.pictures, self.dispatcher, LIST_THUMB_SIZE)
+        self.profile_thumbnails = ThumbnailCache(self.pictures, self.dispatcher, PROFILE_THUMB_SIZE, capacity=8)
+        # the window is up before any of the DB work: that all happens on the workers
+        self.db_call(self._prepare_db, then=self._db_ready)
+        self._update_pool_status()
+        master.protocol("WM_DELETE_WINDOW", self.quit)    # closing the window shuts down like Quit
+        master.after_idle(lambda: self.startup.mark("window"))
 
     # ---------- UI ----------
     def _create_styles(self):
@@ -92,6 +286,7 @@ class JobPortalApp:
         self.style.map("SearchButton.TButton", background=[("active", "#218838")])
 
         self.style.configure("JobFrame.TFrame", background="#f8f9fa", borderwidth=2)
+        self.style.configure("Applicants.Treeview", rowheight=LIST_THUMB_SIZE + 6)
         self.style.configure("QuitButton.TButton", font=('Helvetica', 12), foreground="white", background="#dc3545")
         self.style.map("QuitButton.TButton", background=[("active", "#c82333")])
 
@@ -122,200 +317,690 @@ class JobPortalApp:
         self.search_entry.pack(side=tk.LEFT, padx=5)
         self.search_button = ttk.Button(search_wrap, text="Search", style="SearchButton.TButton", command=self.search_jobs)
         self.search_button.pack(side=tk.LEFT)
-
-        # Results list
-        self.scrollable_frame = ScrollableFrame(self.master)
-        self.scrollable_frame.pack(pady=10, padx=20, fill=tk.BOTH, expand=True)
+        ttk.Label(search_wrap, text="Salary", font=('Helvetica', 10)).pack(side=tk.LEFT, padx=(12, 4))
+        self.salary_from_entry = ttk.Entry(search_wrap, width=9, font=('Helvetica', 12))
+        self.salary_from_entry.pack(side=tk.LEFT)
+        ttk.Label(search_wrap, text="to", font=('Helvetica', 10)).pack(side=tk.LEFT, padx=4)
+        self.salary_to_entry = ttk.Entry(search_wrap, width=9, font=('Helvetica', 12))
+        self.salary_to_entry.pack(side=tk.LEFT)
+        self.sort_box = ttk.Combobox(search_wrap, values=list(JOB_SORTS), state="readonly", width=20)
+        self.sort_box.set(DEFAULT_SORT)
+        self.sort_box.pack(side=tk.LEFT, padx=8)
+        self.search_status = ttk.Label(search_wrap, width=40, font=('Helvetica', 10))
+        self.search_status.pack(side=tk.LEFT, padx=8)
+        for entry in (self.search_entry, self.salary_from_entry, self.salary_to_entry):
+            entry.bind("<KeyRelease>", self._on_search_key)
+            entry.bind("<Return>", lambda e: self.search_jobs())
+        self.sort_box.bind("<<ComboboxSelected>>", lambda e: self.search_jobs())
+
+        # Facets and results list
+        body = ttk.Frame(self.master)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.facet_panel = ttk.Frame(body, width=220)
+        self.facet_panel.pack(side=tk.LEFT, fill=tk.Y, padx=(20, 0), pady=10)
+        self.scrollable_frame = ScrollableFrame(body, virtual=True, row_height=JOB_ROW_HEIGHT)
+        self.scrollable_frame.pack(side=tk.LEFT, pady=10, padx=20, fill=tk.BOTH, expand=True)
 
         # Footer
         bottom_bar = ttk.Frame(self.master)
         bottom_bar.pack(side=tk.BOTTOM, fill=tk.X)
         self.show_jobs_button = ttk.Button(bottom_bar, text="Show Current Jobs", style="SearchButton.TButton", command=self.display_current_jobs)
         self.show_jobs_button.pack(side=tk.LEFT, padx=10, pady=8)
-        self.quit_button = ttk.Button(bottom_bar, text="Quit", style="QuitButton.TButton", command=self.master.quit)
+        self.quit_button = ttk.Button(bottom_bar, text="Quit", style="QuitButton.TButton", command=self.quit)
         self.quit_button.pack(side=tk.RIGHT, padx=10, pady=8)
+        self.loading_bar = ttk.Progressbar(bottom_bar, mode="indeterminate", length=160)
+        self.pool_status = ttk.Label(bottom_bar, font=('Helvetica', 9))
+        self.pool_status.pack(side=tk.RIGHT, padx=10, pady=8)
+
+    def _update_pool_status(self):
+        st = self.pool.stats()
+        aq = self.applications.stats()
+        text = (f"DB pool: {st['active']} active / {st['idle']} idle  •  "
+                f"wait avg {st['wait_avg_ms']:.1f} ms, max {st['wait_max_ms']:.0f} ms  •  "
+                f"reconnects {st['reconnects']}  •  "
+                f"applications queued {aq['depth']}, commit avg {aq['commit_avg_ms']:.1f} ms")
+        last = self.service.round_trips.last
+        if last:
+            text += f"  •  {last[0]}: {last[1]} round trips"
+        self.pool_status.configure(text=text)
+        self.master.after(2000, self._update_pool_status)
+
+    def quit(self):
+        # applications still queued are written before the app exits
+        self.applications.shutdown(wait=True)
+        self.passwords.shutdown()
+        self.pictures.shutdown()
+        # queued reads are dropped; the pool closes its idle connections now and a
+        # borrowed one when its query returns
+        self.db.shutdown(cancel_futures=True)
+        self.pool.close()
+        self.master.quit()
+
+    def _set_busy(self, busy):
+        if busy:
+            self.loading_bar.pack(side=tk.RIGHT, padx=10, pady=8)
+            self.loading_bar.start(12)
+        else:
+            self.loading_bar.stop()
+            self.loading_bar.pack_forget()
 
     # ---------- DB ----------
+    def db_call(self, fn, *args, then=None, key=None, error_title="DB Error"):
+        # run fn(conn, *args) on the DB worker and pass its result to then() on the Tk thread
+        future = self.db.submit(fn, *args, key=key)
+        return self.dispatcher.watch(future, then, lambda err: messagebox.showerror(error_title, f"{err}"))
+
     def connect_db(self):
+        # opens one pooled connection; runs on a DB worker, so importing the connector
+        # (slow) is off the Tk thread too
+        import mysql.connector
         try:
+            conn = mysql.connector.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME)
+        except mysql.connector.Error as err:
+            if err.errno != 1049:  # unknown database
+                raise
             # Connect without database to create DB if missing
             tmp_conn = mysql.connector.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD)
             tmp_cursor = tmp_conn.cursor()
             tmp_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_NAME}")
             tmp_cursor.close()
             tmp_conn.close()
+            conn = mysql.connector.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME)
+        return conn
+
+    def _ping_db(self, conn):
+        # health check on borrow; reconnects in place if the server dropped the connection
+        conn.ping(reconnect=True, attempts=2, delay=0)
+
+    def _prepare_db(self, conn):
+        # -> (change tracking, watermark). With the schema at SCHEMA_VERSION this is one
+        # query; the migrations and the seed check only run for a new or older database.
+        self.startup.mark("connected")
+        state = self._read_schema_state(conn)
+        if state is None:
+            start, version, migrated = migrate(conn, "mysql")
+            tracking = migrated["change_tracking"]
+            self.seed_sample_data_if_empty(conn)
+            self.startup.mark("schema", f"schema migrated from version {start} to {version}")
+            return tracking, self._read_watermark(conn) if tracking else None
+        self.startup.mark("schema")
+        return state
+
+    def _read_schema_state(self, conn):
+        # (change tracking, watermark) if the schema is current, else None
+        import mysql.connector
+        with closing(conn.cursor(dictionary=True)) as cursor:
+            try:
+                cursor.execute(
+                    "SELECT v.Version, v.ChangeTracking, (SELECT COALESCE(MAX(Seq), 0) FROM joblisting_change) AS seq "
+                    "FROM schema_version v"
+                )
+            except mysql.connector.ProgrammingError as err:
+                if err.errno != 1146:  # no such table: a database from before versioning, or a new one
+                    raise
+                return None
+            row = cursor.fetchone()
+        if row is None or row["Version"] != SCHEMA_VERSION:
+            return None
+        return bool(row["ChangeTracking"]), row["seq"] if row["ChangeTracking"] else None
+
+    def _db_ready(self, state):
+        self._change_tracking, watermark = state
+        self._start_catalog(watermark)
+
+    def seed_sample_data_if_empty(self, conn):
+        # seed minimal employer + jobs if table empty; runs after the migrations only.
+        # EXISTS stops at the first row where COUNT(*) would scan the table.
+        with closing(conn.cursor(dictionary=True)) as cursor:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM employer) AS c")
+            if not cursor.fetchone()["c"]:
+                employers = [
+                    ("Tech Solutions", "Software", "Bengaluru", "https://techsolutions.example", "A. Kumar", "+91-9876543210"),
+                    ("Data Insights", "Analytics", "Pune", "https://datainsights.example", "S. Rao", "+91-9988776655"),
+                    ("Global Marketing", "Marketing", "Mumbai", "https://globalmkt.example", "R. Singh", "+91-9123456780"),
+                ]
+                cursor.executemany(
+                    """
+                    INSERT INTO employer (COMPANY, INDUSTRY, LOCATION, Website, ContactPerson, PhoneNo)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    """,
+                    employers,
+                )
+                conn.commit()
+
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM joblisting) AS c")
+            if not cursor.fetchone()["c"]:
+                # map company names to ids
+                cursor.execute("SELECT ID, COMPANY FROM employer")
+                m = {row['COMPANY']: row['ID'] for row in cursor.fetchall()}
+                jobs = [
+                    ("Software Engineer", "Develop web applications", "$100,000", m.get("Tech Solutions")),
+                    ("Data Scientist", "Analyze data and build predictive models", "$120,000", m.get("Data Insights")),
+                    ("Marketing Manager", "Lead marketing campaigns", "$90,000", m.get("Global Marketing")),
+                ]
+                cursor.executemany(
+                    """
+                    INSERT INTO joblisting (Title, Description, Salary, SalaryMin, SalaryMax, CompanyID)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    """,
+                    [(title, desc, salary, *parse_salary(salary), cid) for title, desc, salary, cid in jobs],
+                )
+                conn.commit()
 
-            self.conn = mysql.connector.connect(
-                host=DB_HOST,
-                user=DB_USER,
-                password=DB_PASSWORD,
-                database=DB_NAME,
-            )
-            self.cursor = self.conn.cursor(dictionary=True)
-            print("Database connected successfully!")
-        except mysql.connector.Error as err:
-            messagebox.showerror("Database Error", f"Error: {err}")
-
-    def ensure_schema(self):
-        if not self.cursor:
+    def load_jobs_from_db(self, keep_position=False):
+        # newest first, one page at a time; the rest is fetched as the list scrolls
+        if self._change_tracking:
+            # take the watermark before the first page so no change falls in between
+            self.db_call(self._read_watermark, then=lambda seq: self._start_catalog(seq, keep_position))
+        else:
+            self._start_catalog(None, keep_position)
+
+    def _start_catalog(self, watermark, keep_position=False):
+        self._watermark = watermark
+        if self.startup.reported:
+            self._ensure_facets()   # at startup, only once the first page is on screen
+        self.catalog = JobCatalog()
+        self.jobs = self.catalog.jobs
+        self.pager = KeysetPager(self._page_fetcher(self.fetch_job_page), JOB_PAGE_SIZE)
+        self.show_pager(self.pager, self.catalog, keep_position=keep_position)
+
+    def _ensure_facets(self):
+        if not self._facets_ready and not self._facets_loading:
+            # after the watermark, so changes the snapshot misses are in the next refresh
+            self._facets_loading = True
+            self.db_call(self._load_facets, then=self._facets_loaded)
+
+    def _first_page_shown(self):
+        # the full-catalog facet scan waits until now so it doesn't compete with the first page
+        self.master.after_idle(self._startup_done)
+        self._ensure_facets()
+
+    def _startup_done(self):
+        if self.startup.reported:
             return
-        stmts = [
-            # employer
-            """
-            CREATE TABLE IF NOT EXISTS employer (
-                ID INT AUTO_INCREMENT PRIMARY KEY,
-                COMPANY VARCHAR(100) NOT NULL UNIQUE,
-                INDUSTRY VARCHAR(100) NOT NULL,
-                LOCATION VARCHAR(100) NOT NULL,
-                Website VARCHAR(255) UNIQUE,
-                ContactPerson VARCHAR(100) NOT NULL,
-                PhoneNo VARCHAR(20) NOT NULL UNIQUE
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-            """,
-            # jobseeker
-            """
-            CREATE TABLE IF NOT EXISTS jobseeker (
-                ID INT AUTO_INCREMENT PRIMARY KEY,
-                Username VARCHAR(80) UNIQUE,
-                PasswordHash VARCHAR(255),
-                Name VARCHAR(100),
-                Email VARCHAR(120) UNIQUE,
-                Experience VARCHAR(50),
-                Skills TEXT,
-                PicturePath VARCHAR(255)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-            """,
-            # joblisting
-            """
-            CREATE TABLE IF NOT EXISTS joblisting (
-                ID INT AUTO_INCREMENT PRIMARY KEY,
-                Title VARCHAR(120) NOT NULL,
-                Description TEXT NOT NULL,
-                Salary VARCHAR(50),
-                CompanyID INT,
-                FOREIGN KEY (CompanyID) REFERENCES employer(ID) ON DELETE CASCADE
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-            """,
-            # job_application
-            """
-            CREATE TABLE IF NOT EXISTS job_application (
-                ID INT AUTO_INCREMENT PRIMARY KEY,
-                JobID INT NOT NULL,
-                JobSeekerID INT NOT NULL,
-                ApplicationDate DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                Status ENUM('Pending','Accepted','Rejected') NOT NULL DEFAULT 'Pending',
-                CoverLetter TEXT,
-                FOREIGN KEY (JobID) REFERENCES joblisting(ID) ON DELETE CASCADE,
-                FOREIGN KEY (JobSeekerID) REFERENCES jobseeker(ID) ON DELETE CASCADE,
-                UNIQUE(JobID, JobSeekerID)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-            """,
-        ]
-        for s in stmts:
-            self.cursor.execute(s)
-        self.conn.commit()
-
-    def seed_sample_data_if_empty(self):
-        # seed minimal employer + jobs if table empty
-        self.cursor.execute("SELECT COUNT(*) AS c FROM employer")
-        if self.cursor.fetchone()["c"] == 0:
-            employers = [
-                ("Tech Solutions", "Software", "Bengaluru", "https://techsolutions.example", "A. Kumar", "+91-9876543210"),
-                ("Data Insights", "Analytics", "Pune", "https://datainsights.example", "S. Rao", "+91-9988776655"),
-                ("Global Marketing", "Marketing", "Mumbai", "https://globalmkt.example", "R. Singh", "+91-9123456780"),
-            ]
-            self.cursor.executemany(
-                """
-                INSERT INTO employer (COMPANY, INDUSTRY, LOCATION, Website, ContactPerson, PhoneNo)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """,
-                employers,
-            )
-            self.conn.commit()
-
-        self.cursor.execute("SELECT COUNT(*) AS c FROM joblisting")
-        if self.cursor.fetchone()["c"] == 0:
-            # map company names to ids
-            self.cursor.execute("SELECT ID, COMPANY FROM employer")
-            m = {row['COMPANY']: row['ID'] for row in self.cursor.fetchall()}
-            jobs = [
-                ("Software Engineer", "Develop web applications", "$100,000", m.get("Tech Solutions")),
-                ("Data Scientist", "Analyze data and build predictive models", "$120,000", m.get("Data Insights")),
-                ("Marketing Manager", "Lead marketing campaigns", "$90,000", m.get("Global Marketing")),
-            ]
-            self.cursor.executemany(
-                """
-                INSERT INTO joblisting (Title, Description, Salary, CompanyID)
-                VALUES (%s, %s, %s, %s)
-                """,
-                jobs,
-            )
-            self.conn.commit()
-
-    def load_jobs_from_db(self):
-        try:
-            sql = (
-                "SELECT j.ID, j.Title, j.Description, j.Salary, e.COMPANY "
-                "FROM joblisting j LEFT JOIN employer e ON j.CompanyID = e.ID "
-                "ORDER BY j.ID DESC"
-            )
-            self.cursor.execute(sql)
-            rows = self.cursor.fetchall()
-            self.jobs = [Job(r['ID'], r['Title'], r['Description'], r['Salary'] or "N/A", r['COMPANY'] or "Unknown") for r in rows]
-            self.refresh_job_list(self.jobs)
-        except mysql.connector.Error as err:
-            messagebox.showerror("DB Error", f"Failed to load jobs: {err}")
-
-    # ---------- CRUD helpers ----------
-    def add_employer(self, company, industry, location, website, contact_person, phone):
-        sql = (
-            "INSERT INTO employer (COMPANY, INDUSTRY, LOCATION, Website, ContactPerson, PhoneNo) "
-            "VALUES (%s, %s, %s, %s, %s, %s)"
-        )
-        self.cursor.execute(sql, (company, industry, location, website, contact_person, phone))
-        self.conn.commit()
-        return self.cursor.lastrowid
-
-    def add_job(self, title, desc, salary, company_id):
-        sql = "INSERT INTO joblisting (Title, Description, Salary, CompanyID) VALUES (%s, %s, %s, %s)"
-        self.cursor.execute(sql, (title, desc, salary, company_id))
-        self.conn.commit()
-        return self.cursor.lastrowid
+        self.startup.mark("first page")
+        self.startup.report()
+
+    def _read_watermark(self, conn):
+        with closing(conn.cursor(dictionary=True)) as cursor:
+            cursor.execute("SELECT COALESCE(MAX(Seq), 0) AS seq FROM joblisting_change")
+            return cursor.fetchone()["seq"]
+
+    def fetch_changes(self, conn, since):
+        # rows changed after the watermark, collapsed to the last operation per job
+        last_op = {}
+        with closing(conn.cursor(dictionary=True)) as cursor:
+            while True:
+                cursor.execute(
+                    "SELECT Seq, JobID, Op FROM joblisting_change WHERE Seq > %s ORDER BY Seq LIMIT %s",
+                    (since, CHANGE_BATCH_SIZE),
+                )
+                rows = cursor.fetchall()
+                for r in rows:
+                    last_op[r["JobID"]] = r["Op"]
+                if rows:
+                    since = rows[-1]["Seq"]
+                if len(rows) < CHANGE_BATCH_SIZE:
+                    break
+        changed = [job_id for job_id, op in last_op.items() if op != 'D']
+        upserts = []
+        for i in range(0, len(changed), CHANGE_BATCH_SIZE):
+            chunk = changed[i:i + CHANGE_BATCH_SIZE]
+            upserts.extend(self._job_from_row(r) for r in self.service.jobs_by_id(conn, chunk))
+        found = {job.id for job in upserts}
+        # a row logged as changed but gone by now was deleted afterwards
+        deletes = [job_id for job_id in last_op if job_id not in found]
+        return since, upserts, deletes
+
+    def refresh_jobs(self):
+        # merge only what changed since the last refresh into the cached listing
+        if not self._change_tracking or self._watermark is None:
+            self.load_jobs_from_db()
+            return
+        self.db_call(self.fetch_changes, self._watermark, then=self._changes_arrived, key="changes")
+
+    def _changes_arrived(self, result):
+        watermark, upserts, deletes = result
+        self._watermark = max(self._watermark, watermark)
+        browsing = self._shown_catalog is self.catalog
+        self.apply_job_changes(upserts, deletes)
+        self.show_pager(self.pager, self.catalog, keep_position=browsing)
+
+    def apply_job_changes(self, upserts=(), deletes=()):
+        # one delta path for added, edited and deleted jobs: the cache, the search
+        # index and the on-screen list are patched in place instead of reloaded
+        if self._index_ready:
+            for job_id in deletes:
+                self.search_index.remove(job_id)
+            for job in upserts:
+                self.search_index.add(job)
+            self._last_result_ids = None  # may no longer be a superset for narrowing
+        elif self._index_loading:
+            self._index_backlog.append((list(upserts), list(deletes)))
+        if self._facets_ready:
+            for job_id in deletes:
+                self.facets.remove(job_id)
+            for job in upserts:
+                self.facets.add(job.id, self._facet_values(job.company, job.industry, job.location, job.salary_max))
+            self._render_facets()
+        elif self._facets_loading:
+            self._facet_backlog.append((list(upserts), list(deletes)))
+        if self._fuzzy_vocab is not None:
+            # words of deleted jobs stay: at worst a correction finds nothing
+            for job in upserts:
+                self._add_job_words(self._fuzzy_vocab, job)
+        if self.recommender is not None:
+            self._update_recommender(self.recommender, upserts, deletes)
+        elif self._recommender_loading:
+            self._recommender_backlog.append((list(upserts), list(deletes)))
+        if self.catalog.apply(upserts, deletes) and self._shown_catalog is self.catalog:
+            self.refresh_job_list(self.catalog.jobs, keep_position=True, on_near_end=self._load_next_page)
+
+    def _page_fetcher(self, fn, *args, key=None):
+        # adapts a worker query fn(conn, *args, after, limit) to KeysetPager's fetch_page
+        def fetch_page(after, limit, deliver):
+            def failed(err):
+                deliver(None)
+                messagebox.showerror("DB Error", f"Failed to load jobs: {err}")
+            self.dispatcher.watch(self.db.submit(fn, *args, after, limit, key=key), deliver, failed)
+        return fetch_page
+
+    def fetch_job_page(self, conn, after_id, limit):
+        return [self._job_from_row(r) for r in self.service.job_page(conn, after_id, limit)]
+
+    def fetch_job(self, conn, job_id):
+        row = self.service.get_job(conn, job_id)
+        return self._job_from_row(row) if row else None
+
+    def _job_from_row(self, r):
+        return Job(r['id'], r['title'], r['description'], r['salary'] or "N/A", r['company'] or "Unknown",
+                   r['salary_min'], r['salary_max'], r['industry'], r['location'])
+
+    def _build_search_index(self, conn):
+        # memory mode needs the whole catalog; it is loaded on the first search only.
+        # Built on the worker and swapped in on the Tk thread.
+        jobs = []
+        after_id = None
+        while True:
+            page = self.fetch_job_page(conn, after_id, INDEX_BATCH_SIZE)
+            jobs.extend(page)
+            if len(page) < INDEX_BATCH_SIZE:
+                break
+            after_id = page[-1].id
+        return SearchIndex().build(jobs)
+
+    def _load_facets(self, conn):
+        # only the facet columns of every job, batched by ID; counts then come from
+        # the in-memory sets and are patched by apply_job_changes
+        facets = FacetIndex(FACET_COLUMNS)
+        after_id = 0
+        with closing(conn.cursor(dictionary=True)) as cursor:
+            while True:
+                cursor.execute(
+                    "SELECT j.ID, j.SalaryMax, COALESCE(e.COMPANY, 'Unknown') AS COMPANY, e.INDUSTRY, e.LOCATION "
+                    "FROM joblisting j LEFT JOIN employer e ON j.CompanyID = e.ID "
+                    "WHERE j.ID > %s ORDER BY j.ID LIMIT %s",
+                    (after_id, INDEX_BATCH_SIZE),
+                )
+                rows = cursor.fetchall()
+                for r in rows:
+                    facets.add(r["ID"], self._facet_values(r["COMPANY"], r["INDUSTRY"], r["LOCATION"], r["SalaryMax"]))
+                if len(rows) < INDEX_BATCH_SIZE:
+                    break
+                after_id = rows[-1]["ID"]
+        return facets
+
+    def _facet_values(self, company, industry, location, salary_max):
+        return {"Company": company, "Industry": industry, "Location": location, "Salary": salary_band(salary_max)}
+
+    def _load_vocabulary(self, conn):
+        # fulltext mode: words of titles, companies and descriptions (skills included)
+        # for spelling correction; batched like the index load, only the words are kept
+        vocab = TrigramIndex()
+        after_id = None
+        while True:
+            page = self.fetch_job_page(conn, after_id, INDEX_BATCH_SIZE)
+            for job in page:
+                self._add_job_words(vocab, job)
+            if len(page) < INDEX_BATCH_SIZE:
+                break
+            after_id = page[-1].id
+        return vocab
+
+    def _add_job_words(self, vocab, job):
+        for text in (job.title, job.company, job.description):
+            for word in tokenize(text):
+                vocab.add(word)
+
+    def _build_recommender(self, conn):
+        # vectors of every job, in one batch; only the ID and text of each page are kept.
+        # recommend (NumPy) is imported here, on the worker, rather than at startup.
+        from recommend import JobRecommender
+        jobs = []
+        after_id = None
+        while True:
+            page = self.fetch_job_page(conn, after_id, INDEX_BATCH_SIZE)
+            jobs.extend((job.id, self._job_text(job)) for job in page)
+            if len(page) < INDEX_BATCH_SIZE:
+                break
+            after_id = page[-1].id
+        return JobRecommender().build(jobs)
+
+    def _update_recommender(self, recommender, upserts, deletes):
+        recommender.remove(deletes)
+        recommender.add((job.id, self._job_text(job)) for job in upserts)
+
+    def _job_text(self, job):
+        return f"{job.title} {job.description}"
+
+    def fetch_search_page(self, conn, query, filters=NO_FILTERS, offset=0, limit=SEARCH_PAGE_SIZE):
+        return [self._job_from_row(r) for r in self.service.search_page(conn, query, filters, offset, limit)]
+
+    def fetch_filtered_page(self, conn, filters, after, limit):
+        return [self._job_from_row(r) for r in self.service.filtered_page(conn, filters, after, limit)]
+
+    def fetch_jobs_by_id(self, conn, ids, offset, limit):
+        return [self._job_from_row(r) for r in self.service.jobs_by_id(conn, ids, offset, limit)]
 
     # ---------- UI Actions ----------
+    def _on_search_key(self, event=None):
+        # live search: wait for a short pause in typing, then search once
+        if self._search_after is not None:
+            self.master.after_cancel(self._search_after)
+        self._search_after = self.master.after(SEARCH_DEBOUNCE_MS, self._search_typed)
+
+    def _search_typed(self):
+        self._search_after = None
+        query = (self.search_entry.get() or "").strip()
+        if (query, self._current_filters()) != (self._last_query, self._last_filters):
+            self.search_jobs()
+
+    def _current_filters(self):
+        # amounts are read like listed salaries: 80000, 80k and $80,000 all work
+        return (parse_amount(self.salary_from_entry.get()), parse_amount(self.salary_to_entry.get()),
+                self.sort_box.get() or DEFAULT_SORT, frozenset(self._facet_selection))
+
     def search_jobs(self):
-        query = (self.search_entry.get() or "").strip().lower()
+        if self._search_after is not None:
+            self.master.after_cancel(self._search_after)
+            self._search_after = None
+        query = (self.search_entry.get() or "").strip()
+        filters = self._current_filters()
+        previous, previous_ids = self._last_query, self._last_result_ids
+        self._last_query, self._last_result_ids, self._last_filters = query, None, filters
+        self._search_pager = None
         if not query:
-            self.refresh_job_list(self.jobs)
+            self.search_status.configure(text="")
+            if filters == NO_FILTERS:
+                self.show_pager(self.pager, self.catalog)
+            elif filters[:3] == NO_FILTERS[:3] and self._facets_ready:
+                self._facet_list(filters[3])
+            else:
+                self._filtered_list(filters)
+            return
+        if SEARCH_MODE == "fulltext":
+            self._fulltext_search(query, filters)
+            return
+        if not self._index_ready:
+            self.search_status.configure(text="Indexing jobs…")
+            if not self._index_loading:
+                self._index_loading = True
+                self.db_call(self._build_search_index, then=self._search_index_built)
+            return
+        if filters[3] and not self._facets_ready:
+            # the chosen facets filter through the FacetIndex: searched again once it's loaded
+            self.search_status.configure(text="Loading filters…")
+            self._ensure_facets()
+            return
+        # typing more of the same query only narrows it: filter the previous results
+        within = previous_ids if previous_ids is not None and self.search_index.narrows(previous, query) else None
+        scores = self.search_index.match(query, within=within)
+        corrected = None
+        if not scores:
+            # nothing matched as typed: try again with misspelled terms corrected
+            corrected = self.search_index.suggest(query)
+            if corrected:
+                scores = self.search_index.match(corrected)
+        if corrected is None:
+            self._last_result_ids = set(scores)     # unfiltered, so narrowing holds
+        scores = self._filter_matches(scores, filters)
+        # ranked a page at a time, as the list scrolls: a keystroke only ranks what is shown
+        pager = KeysetPager(self._ranked_fetcher(scores, filters[2]), JOB_PAGE_SIZE, key=None, read_ahead=False)
+        self._search_pager = pager
+        self.show_pager(pager)
+        self._show_search_status(len(scores), corrected=corrected)
+
+    def _filter_matches(self, scores, filters):
+        # memory mode: the matches are already here, so the facets and salary range
+        # narrow them before any are ranked
+        salary_from, salary_to, sort, chosen = filters
+        if not chosen and salary_from is None and salary_to is None and sort == DEFAULT_SORT:
+            return scores
+        ids = scores.keys()
+        if chosen:
+            ids = ids & self.facets.matching(facet_dict(chosen))
+        docs = self.search_index.docs
+        jobs = [docs[d] for d in ids if d in docs]
+        if salary_from is not None:
+            jobs = [j for j in jobs if j.salary_max is not None and j.salary_max >= salary_from]
+        if salary_to is not None:
+            jobs = [j for j in jobs if j.salary_min is not None and j.salary_min <= salary_to]
+        if sort != DEFAULT_SORT:
+            attr = JOB_SORTS[sort][0][0]
+            jobs = [j for j in jobs if getattr(j, attr) is not None]
+        return {j.id: scores[j.id] for j in jobs}
+
+    def _ranked_fetcher(self, scores, sort):
+        # KeysetPager's fetch_page over in-memory matches; offset paging, answered at once
+        if sort == DEFAULT_SORT:
+            key, reverse = None, True
+        else:
+            attrs, direction = JOB_SORTS[sort]
+            docs = self.search_index.docs
+            values = {d: tuple(getattr(docs[d], a) for a in attrs) for d in scores}
+            key, reverse = values.__getitem__, direction == "DESC"
+
+        def fetch_page(offset, limit, deliver):
+            deliver(self.search_index.top(scores, limit, offset, key=key, reverse=reverse))
+        return fetch_page
+
+    def _filtered_list(self, filters):
+        # browsing with a salary range or order: paged by MySQL on the salary indexes
+        attrs, _ = JOB_SORTS[filters[2]]
+        pager = KeysetPager(self._page_fetcher(self.fetch_filtered_page, filters, key="search"),
+                            JOB_PAGE_SIZE, key=lambda job: tuple(getattr(job, a) for a in attrs))
+        self._search_pager = pager
+        pager.next_page(lambda page: self._show_search_results(pager, page))
+
+    def _facet_list(self, chosen):
+        # facets alone: the matching IDs come from intersecting the facet sets, and
+        # only the rows of each page shown are fetched
+        ids = sorted(self.facets.matching(facet_dict(chosen)), reverse=True)
+        pager = KeysetPager(self._page_fetcher(self.fetch_jobs_by_id, ids, key="search"), JOB_PAGE_SIZE, key=None)
+        self._search_pager = pager
+        pager.next_page(lambda page: self._show_search_results(pager, page))
+
+    def _fulltext_search(self, query, filters, corrected=None):
+        # key="search": a newer search supersedes pages still queued for an older one,
+        # and results of a superseded pager are ignored
+        pager = KeysetPager(self._page_fetcher(self.fetch_search_page, corrected or query, filters, key="search"),
+                            SEARCH_PAGE_SIZE, key=None)
+        self._search_pager = pager
+        pager.next_page(lambda page: self._show_search_results(pager, page, query, filters, corrected))
+
+    def _show_search_status(self, count, more=False, corrected=None):
+        if count == 0:
+            text = "No matching jobs found"
+        else:
+            text = f"{count}{'+' if more else ''} matching job{'s' if count != 1 else ''}"
+            if corrected:
+                text += f" for \"{corrected}\""
+        self.search_status.configure(text=text)
+
+    def _search_index_built(self, index):
+        for upserts, deletes in self._index_backlog:
+            for job_id in deletes:
+                index.remove(job_id)
+            for job in upserts:
+                index.add(job)
+        self._index_backlog = []
+        self.search_index = index
+        self._index_ready = True
+        self._index_loading = False
+        self._last_query = None
+        self.search_jobs()
+
+    def _facets_loaded(self, facets):
+        for upserts, deletes in self._facet_backlog:
+            for job_id in deletes:
+                facets.remove(job_id)
+            for job in upserts:
+                facets.add(job.id, self._facet_values(job.company, job.industry, job.location, job.salary_max))
+        self._facet_backlog = []
+        self.facets = facets
+        self._facets_ready = True
+        self._facets_loading = False
+        self._render_facets()
+        if self._facet_selection:
+            # a search made meanwhile waited for these
+            self._last_query = None
+            self.search_jobs()
+
+    def _render_facets(self):
+        # one checkbox per value with the number of jobs it would show
+        for widget in self.facet_panel.winfo_children():
+            widget.destroy()
+        self._facet_vars = []
+        counts = self.facets.counts(facet_dict(self._facet_selection))
+        bands = [label for _, _, label in SALARY_BANDS]
+        for name in FACET_COLUMNS:
+            ttk.Label(self.facet_panel, text=name, font=('Helvetica', 11, 'bold')).pack(anchor=tk.W, pady=(8, 2))
+            values = counts[name]
+            chosen = [v for n, v in self._facet_selection if n == name]
+            if name == "Salary":
+                shown = [v for v in bands if v in values or v in chosen]
+            else:
+                shown = sorted(values, key=lambda v: (-values[v], str(v)))[:FACET_LIMIT]
+                shown += [v for v in chosen if v not in shown]
+            for value in shown:
+                var = tk.BooleanVar(value=value in chosen)
+                self._facet_vars.append(var)
+                ttk.Checkbutton(self.facet_panel, text=f"{value} ({values.get(value, 0)})", variable=var,
+                                command=lambda n=name, v=value: self._toggle_facet(n, v)).pack(anchor=tk.W)
+
+    def _toggle_facet(self, name, value):
+        self._facet_selection ^= {(name, value)}
+        self._render_facets()
+        self.search_jobs()
+
+    def _recommender_built(self, recommender):
+        for upserts, deletes in self._recommender_backlog:
+            self._update_recommender(recommender, upserts, deletes)
+        self._recommender_backlog = []
+        self.recommender = recommender
+        self._recommender_loading = False
+        waiting, self._recommender_waiting = self._recommender_waiting, []
+        for request in waiting:
+            request()
+
+    def _recommender_failed(self, err):
+        self._recommender_loading = False
+        self._recommender_waiting = []
+        messagebox.showerror("Recommendations", f"{err}")
+
+    def _vocabulary_loaded(self, vocab):
+        self._fuzzy_vocab = vocab
+        self._vocab_loading = False
+        self._last_query = None
+        self.search_jobs()
+
+    def _show_search_results(self, pager, page, query=None, filters=NO_FILTERS, corrected=None):
+        if page is None or pager is not self._search_pager:
             return
-        found = [j for j in self.jobs if query in j.title.lower() or query in j.description.lower() or query in j.company.lower()]
-        if found:
-            self.refresh_job_list(found)
+        if not page and query and corrected is None:
+            # nothing matched as typed: retry once with misspelled terms corrected
+            if self._fuzzy_vocab is None:
+                self.search_status.configure(text="Checking spelling…")
+                if not self._vocab_loading:
+                    self._vocab_loading = True
+                    self.db_call(self._load_vocabulary, then=self._vocabulary_loaded)
+                return
+            corrected = self._fuzzy_vocab.correct(query)
+            if corrected:
+                self._fulltext_search(query, filters, corrected)
+                return
+        if page:
+            self.show_pager(pager)
         else:
-            messagebox.showinfo("Job Search", "No matching jobs found!")
+            self.refresh_job_list([])
+        self._show_search_status(len(page), more=not pager.done, corrected=corrected)
+
+    def show_pager(self, pager, catalog=None, keep_position=False):
+        # list the pager's rows so far and fetch more when the end comes into view;
+        # with a catalog, pages are merged into it and the catalog is what's listed
+        if pager is None:
+            return
+        self._shown_pager = pager
+        self._shown_catalog = catalog
+        if not pager.rows and not pager.done:
+            self._request_page(pager, keep_position)
+        self.refresh_job_list(self._shown_rows(), keep_position=keep_position, on_near_end=self._load_next_page)
+
+    def _shown_rows(self):
+        return self._shown_catalog.jobs if self._shown_catalog is not None else self._shown_pager.rows
+
+    def _load_next_page(self):
+        pager = self._shown_pager
+        if pager is None or pager.done:
+            return
+        self._request_page(pager, True)
+
+    def _request_page(self, pager, keep_position):
+        catalog = self._shown_catalog
+
+        def arrived(page):
+            if page and catalog is not None:
+                catalog.extend(page, complete=pager.done)
+            if pager is self._shown_pager:
+                self.refresh_job_list(self._shown_rows(), keep_position=keep_position, on_near_end=self._load_next_page)
+                if page is not None and not self.startup.reported:
+                    self._first_page_shown()
+
+        pager.next_page(arrived)
 
-    def refresh_job_list(self, jobs):
-        # clear
-        for child in self.scrollable_frame.scrollable_frame.winfo_children():
-            child.destroy()
-        # repopulate
-        for job in jobs:
-            job_frame = ttk.Frame(self.scrollable_frame.scrollable_frame, style="JobFrame.TFrame", relief=tk.RIDGE, borderwidth=2)
-            job_frame.pack(fill=tk.BOTH, padx=10, pady=6)
+    def refresh_job_list(self, jobs, keep_position=False, on_near_end=None):
+        self.scrollable_frame.set_rows(jobs, self._create_job_row, self._bind_job_row,
+                                       key=lambda j: j.id, keep_position=keep_position,
+                                       on_near_end=on_near_end)
 
-            title_label = ttk.Label(job_frame, text=f"{job.title}", font=('Helvetica', 13, 'bold'))
-            title_label.pack(anchor=tk.W, padx=8, pady=(6,0))
+    def _create_job_row(self, parent):
+        job_frame = ttk.Frame(parent, style="JobFrame.TFrame", relief=tk.RIDGE, borderwidth=2)
 
-            description_label = ttk.Label(job_frame, text=f"{job.description}", font=('Helvetica', 11))
-            description_label.pack(anchor=tk.W, padx=8)
+        job_frame.title_label = ttk.Label(job_frame, font=('Helvetica', 13, 'bold'))
+        job_frame.title_label.pack(anchor=tk.W, padx=8, pady=(6,0))
 
-            meta = ttk.Label(job_frame, text=f"Company: {job.company}    •    Salary: {job.salary}", font=('Helvetica', 10))
-            meta.pack(anchor=tk.W, padx=8, pady=(0,6))
+        job_frame.description_label = ttk.Label(job_frame, font=('Helvetica', 11))
+        job_frame.description_label.pack(anchor=tk.W, padx=8)
 
-            ttk.Button(job_frame, text="View Details", command=lambda j=job: self.view_job_details(j)).pack(padx=8, pady=(0,8))
+        job_frame.meta = ttk.Label(job_frame, font=('Helvetica', 10))
+        job_frame.meta.pack(anchor=tk.W, padx=8, pady=(0,6))
+
+        job_frame.details_button = ttk.Button(job_frame, text="View Details")
+        job_frame.details_button.pack(padx=8, pady=(0,8))
+        return job_frame
+
+    def _bind_job_row(self, job_frame, job):
+        # rows have a fixed height, so the description is cut to a single line
+        description = " ".join(job.description.split())
+        if len(description) > JOB_ROW_DESCRIPTION_CHARS:
+            description = description[:JOB_ROW_DESCRIPTION_CHARS - 1] + "…"
+        job_frame.title_label.configure(text=f"{job.title}")
+        job_frame.description_label.configure(text=description)
+        job_frame.meta.configure(text=f"Company: {job.company}    •    Salary: {job.salary}")
+        job_frame.details_button.configure(command=lambda j=job: self.view_job_details(j))
 
     def display_current_jobs(self):
-        self.load_jobs_from_db()
+        self.refresh_jobs()
 
     # ---------- Auth & Profile ----------
     def open_login_page(self):
@@ -367,7 +1052,7 @@ class JobPortalApp:
     def view_profile(self):
         win = tk.Toplevel(self.master)
         win.title("Your Profile")
-        win.geometry(self._centered_geometry(460, 440))
+        win.geometry(self._centered_geometry(460, 660))
 
         ttk.Label(win, text="Add Your Details", style="Subtitle.TLabel").pack(pady=10)
 
@@ -378,6 +1063,9 @@ class JobPortalApp:
         ttk.Label(win, text="Email:", style="Content.TLabel").pack()
         email_entry = ttk.Entry(win)
         email_entry.pack()
+        # the picture saved for this email, shown once it is entered
+        email_entry.bind("<FocusOut>", lambda e: self._show_profile_picture(email_entry.get().strip(), picture))
+        email_entry.bind("<Return>", lambda e: self._show_profile_picture(email_entry.get().strip(), picture))
 
         ttk.Label(win, text="Experience:", style="Content.TLabel").pack()
         experience_entry = ttk.Entry(win)
@@ -388,7 +1076,10 @@ class JobPortalApp:
         skills_entry.pack()
 
         ttk.Label(win, text="Upload Picture:", style="Content.TLabel").pack()
-        ttk.Button(win, text="Upload", style="SearchButton.TButton", command=lambda: self.upload_picture(win)).pack(pady=4)
+        picture = ttk.Label(win)
+        picture.pack()
+        ttk.Button(win, text="Upload", style="SearchButton.TButton",
+                   command=lambda: self.upload_picture(win, email_entry.get().strip(), picture)).pack(pady=4)
 
         ttk.Button(
             win,
@@ -397,63 +1088,130 @@ class JobPortalApp:
             command=lambda: self.save_profile(name_entry.get(), email_entry.get(), experience_entry.get(), skills_entry.get()),
         ).pack(pady=16)
 
-    def upload_picture(self, parent):
+        ttk.Button(win, text="Recommend Jobs", style="SearchButton.TButton",
+                   command=lambda: self.recommend_jobs(skills_entry.get(), recommended)).pack(pady=4)
+        recommended = tk.Listbox(win, height=RECOMMEND_LIMIT, width=60, activestyle="none")
+        recommended.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        recommended.jobs = []
+
+        def open_recommended(event=None):
+            selected = recommended.curselection()
+            if selected and selected[0] < len(recommended.jobs):
+                self.view_job_details(recommended.jobs[selected[0]])
+
+        recommended.bind("<Double-Button-1>", open_recommended)
+
+    def recommend_jobs(self, skills, listbox):
+        # the skills are scored against every job in memory; only the top rows are fetched
+        if not skills.strip():
+            messagebox.showwarning("Recommendations", "Enter your skills first")
+            return
+        if self.recommender is None:
+            self._recommender_waiting.append(lambda: self.recommend_jobs(skills, listbox))
+            if not self._recommender_loading:
+                self._recommender_loading = True
+                listbox.delete(0, tk.END)
+                listbox.insert(tk.END, "Loading job catalog...")
+                self.dispatcher.watch(self.db.submit(self._build_recommender),
+                                      self._recommender_built, self._recommender_failed)
+            return
+        scores = dict(self.recommender.recommend(skills, RECOMMEND_LIMIT))
+
+        def show(jobs):
+            if not listbox.winfo_exists():
+                return
+            jobs.sort(key=lambda job: -scores[job.id])
+            listbox.jobs = jobs
+            listbox.delete(0, tk.END)
+            for job in jobs:
+                listbox.insert(tk.END, f"{job.title} - {job.company} ({job.salary})")
+            if not jobs:
+                listbox.insert(tk.END, "No jobs match these skills")
+
+        self.db_call(self.fetch_jobs_by_id, list(scores), 0, None, then=show, key="recommend")
+
+    def upload_picture(self, parent, email, picture_label):
+        # hashed and copied into the picture store on its pool, then recorded in PicturePath;
+        # the thumbnails are made in the background meanwhile
+        if not email:
+            messagebox.showwarning("Profile", "Enter your email before uploading a picture", parent=parent)
+            return
         filename = filedialog.askopenfilename(parent=parent, title="Select Profile Picture", filetypes=(("Image files", "*.jpg;*.jpeg;*.png"), ("All files", "*.*")))
-        if filename:
-            messagebox.showinfo("Selected", filename)
-            # Optionally store the path somewhere or copy to app folder.
-            return filename
-        return None
+        if not filename:
+            return
+
+        def stored(name):
+            self.db_call(self.service.set_picture, email, name,
+                         then=lambda _: self._show_picture(name, picture_label))
+
+        self.dispatcher.watch(self.pictures.put(filename), stored,
+                              lambda err: messagebox.showerror("Upload", f"{err}", parent=parent))
+
+    def _show_profile_picture(self, email, picture_label):
+        if email:
+            self.db_call(self.service.get_profile, email,
+                         then=lambda p: p and p["picture_path"] and self._show_picture(p["picture_path"], picture_label))
+
+    def _show_picture(self, name, picture_label):
+        def show(image):
+            if picture_label.winfo_exists():
+                picture_label.configure(image=image)
+                picture_label.image = image     # Tk drops an image nothing in Python refers to
+        image = self.profile_thumbnails.get(name, show)
+        if image is not None:
+            show(image)
 
     def login(self, username, password, win):
         if not username:
             messagebox.showwarning("Login", "Please enter username")
             return
-        self.cursor.execute("SELECT ID, Username FROM jobseeker WHERE Username=%s", (username,))
-        row = self.cursor.fetchone()
-        if row:
-            messagebox.showinfo("Login", f"Welcome back, {row['Username']} (ID {row['ID']})")
+
+        def checked(result, user):
+            ok, new_hash = result
+            if not ok:
+                messagebox.showwarning("Login", "Incorrect password")
+                return
+            if new_hash:
+                # stored at an older cost (or in the clear): replace it while we know the password
+                self.db_call(self.service.set_password_hash, user['id'], new_hash)
+            messagebox.showinfo("Login", f"Welcome back, {user['username']} (ID {user['id']})")
             win.destroy()
-        else:
-            messagebox.showwarning("Login", "User not found. Please sign up.")
+
+        def found(user):
+            if not user:
+                messagebox.showwarning("Login", "User not found. Please sign up.")
+                return
+            self.dispatcher.watch(self.passwords.verify(password, user['password_hash']),
+                                  lambda result: checked(result, user),
+                                  lambda err: messagebox.showerror("Login", f"{err}"))
+
+        self.db_call(self.service.find_user, username, then=found)
 
     def signup(self, email, username, password, name, remember_me, win):
         if not username or not email:
             messagebox.showwarning("Sign Up", "Email and Username are required")
             return
-        try:
-            self.cursor.execute(
-                "INSERT INTO jobseeker (Username, PasswordHash, Name, Email) VALUES (%s, %s, %s, %s)",
-                (username, password, name, email),
-            )
-            self.conn.commit()
+
+        def done(_):
             messagebox.showinfo("Sign Up", f"Account created for {username}\nRemember Me: {remember_me}")
             win.destroy()
-        except mysql.connector.Error as err:
-            messagebox.showerror("Sign Up Error", str(err))
+
+        def hashed(password_hash):
+            self.db_call(self.service.signup, username, password_hash, name, email, then=done,
+                         error_title="Sign Up Error")
+
+        self.dispatcher.watch(self.passwords.hash(password), hashed,
+                              lambda err: messagebox.showerror("Sign Up Error", f"{err}"))
 
     def save_profile(self, name, email, experience, skills):
         # For demo: upsert by email (if exists update, else insert minimal row)
         if not email:
             messagebox.showwarning("Profile", "Email is required to save profile")
             return
-        try:
-            self.cursor.execute("SELECT ID FROM jobseeker WHERE Email=%s", (email,))
-            row = self.cursor.fetchone()
-            if row:
-                self.cursor.execute(
-                    "UPDATE jobseeker SET Name=%s, Experience=%s, Skills=%s WHERE ID=%s",
-                    (name, experience, skills, row['ID']),
-                )
-            else:
-                self.cursor.execute(
-                    "INSERT INTO jobseeker (Name, Email, Experience, Skills) VALUES (%s, %s, %s, %s)",
-                    (name, email, experience, skills),
-                )
-            self.conn.commit()
-            messagebox.showinfo("Profile Saved", "Your profile has been saved successfully!")
-        except mysql.connector.Error as err:
-            messagebox.showerror("DB Error", f"{err}")
+        self.db_call(
+            self.service.save_profile, name, email, experience, skills,
+            then=lambda _: messagebox.showinfo("Profile Saved", "Your profile has been saved successfully!"),
+        )
 
     # ---------- Job details ----------
     def view_job_details(self, job):
@@ -467,6 +1225,89 @@ class JobPortalApp:
         ttk.Label(win, text=f"Description:\n{job.description}", font=('Helvetica', 12), wraplength=480, justify=tk.LEFT).pack(anchor=tk.W, padx=10, pady=10)
 
         ttk.Button(win, text="Apply Now", style="SearchButton.TButton", command=lambda: self.open_apply_dialog(job)).pack(pady=10)
+        ttk.Button(win, text="View Applicants", style="SearchButton.TButton", command=lambda: self.view_applicants(job)).pack()
+
+    def view_applicants(self, job):
+        # employer side: every applicant ranked against the job in one pass on the DB worker
+        if self.ranker is None:
+            from recommend import ApplicantRanker  # NumPy: loaded on first use, not at startup
+            try:
+                self.ranker = ApplicantRanker(self.service)
+            except RuntimeError:
+                self.ranker = False
+        if not self.ranker:
+            messagebox.showwarning("Applicants", "Ranking applicants needs NumPy (pip install numpy)")
+            return
+        win = tk.Toplevel(self.master)
+        win.title(f"Applicants: {job.title}")
+        win.geometry(self._centered_geometry(760, 420))
+        status = ttk.Label(win, text="Ranking applicants...", style="Content.TLabel")
+        status.pack(anchor=tk.W, padx=10, pady=6)
+
+        columns = ("score", "name", "email", "experience", "skills", "status")
+        frame = ttk.Frame(win)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        tree = ttk.Treeview(frame, columns=columns, show="tree headings", style="Applicants.Treeview")
+        tree.column("#0", width=LIST_THUMB_SIZE + 12, stretch=False)
+        for column, width in zip(columns, (60, 130, 170, 110, 200, 70)):
+            tree.heading(column, text=column.title())
+            tree.column(column, width=width, stretch=column == "skills")
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        applicants = []
+        shown = {}      # iid -> thumbnail of the rows in view; only these hold images
+
+        def show_thumbnails():
+            # pictures of the rows in view (and a few either side) are loaded, the rest let go
+            if not applicants:
+                return
+            top, bottom = tree.yview()
+            first = max(0, int(top * len(applicants)) - 5)
+            last = min(len(applicants), int(bottom * len(applicants)) + 6)
+            for iid in [iid for iid in shown if not first <= int(iid) < last]:
+                tree.item(iid, image="")
+                del shown[iid]
+            for i in range(first, last):
+                name = applicants[i].get("picture_path")
+                if name and str(i) not in shown:
+                    image = self.thumbnails.get(name, lambda image, iid=str(i): set_thumbnail(iid, image))
+                    if image is not None:
+                        set_thumbnail(str(i), image)
+
+        def set_thumbnail(iid, image):
+            if tree.winfo_exists() and tree.exists(iid):
+                tree.item(iid, image=image)
+                shown[iid] = image
+
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            show_thumbnails()
+
+        tree.configure(yscrollcommand=on_scroll)
+
+        def show_cover_letter(event=None):
+            selected = tree.selection()
+            if selected:
+                a = applicants[int(selected[0])]
+                messagebox.showinfo(a["name"] or a["email"], a["cover_letter"] or "(no cover letter)", parent=win)
+
+        def ranked(result):
+            if not win.winfo_exists():
+                return
+            if result is None:
+                status.configure(text="This job no longer exists")
+                return
+            applicants[:] = result
+            for i, a in enumerate(result):
+                tree.insert("", tk.END, iid=str(i), values=(f"{a['score']:.2f}", a["name"] or "", a["email"],
+                                                            a["experience"] or "", a["skills"] or "", a["status"] or ""))
+            status.configure(text=f"{len(result)} applicant{'s' if len(result) != 1 else ''}, best match first"
+                                  " (double-click for the cover letter)")
+            tree.after_idle(show_thumbnails)
+
+        tree.bind("<Double-Button-1>", show_cover_letter)
+        self.db_call(self.ranker.ranked, job.id, then=ranked)
 
     def open_apply_dialog(self, job):
         win = tk.Toplevel(self.master)
@@ -487,29 +1328,18 @@ class JobPortalApp:
             if not email:
                 messagebox.showwarning("Apply", "Email required")
                 return
-            # ensure jobseeker exists
-            self.cursor.execute("SELECT ID FROM jobseeker WHERE Email=%s", (email,))
-            row = self.cursor.fetchone()
-            if not row:
-                self.cursor.execute("INSERT INTO jobseeker (Email) VALUES (%s)", (email,))
-                self.conn.commit()
-                jobseeker_id = self.cursor.lastrowid
-            else:
-                jobseeker_id = row['ID']
-            # insert application
-            try:
-                self.cursor.execute(
-                    "INSERT INTO job_application (JobID, JobSeekerID, ApplicationDate, Status, CoverLetter) VALUES (%s, %s, %s, %s, %s)",
-                    (job.id, jobseeker_id, datetime.now(), 'Pending', cover_text or None),
-                )
-                self.conn.commit()
-                messagebox.showinfo("Applied", "Application submitted!")
-                win.destroy()
-            except mysql.connector.Error as err:
-                if err.errno == 1062:  # duplicate key (unique JobID, JobSeekerID)
-                    messagebox.showwarning("Already Applied", "You have already applied for this job.")
+
+            def done(applied):
+                if applied:
+                    if self.ranker:
+                        self.ranker.invalidate([job.id])
+                    messagebox.showinfo("Applied", "Application submitted!")
+                    win.destroy()
                 else:
-                    messagebox.showerror("DB Error", str(err))
+                    messagebox.showwarning("Already Applied", "You have already applied for this job.")
+
+            self.dispatcher.watch(self.applications.submit(job.id, email, cover_text), done,
+                                  lambda err: messagebox.showerror("DB Error", f"{err}"))
 
         ttk.Button(win, text="Submit Application", style="SearchButton.TButton", command=submit).pack(pady=10)
 
@@ -523,11 +1353,14 @@ class JobPortalApp:
         ttk.Label(win, text="Employer:", style="Content.TLabel").pack(pady=(10,0))
         employer_var = tk.StringVar()
         employer_combo = ttk.Combobox(win, textvariable=employer_var, state="readonly", width=46)
-        self.cursor.execute("SELECT ID, COMPANY FROM employer ORDER BY COMPANY")
-        employers = self.cursor.fetchall()
-        employer_combo['values'] = [f"{e['ID']} - {e['COMPANY']}" for e in employers]
         employer_combo.pack(pady=4)
 
+        def fill_employers(employers):
+            if employer_combo.winfo_exists():
+                employer_combo['values'] = [f"{e['id']} - {e['company']}" for e in employers]
+
+        self.db_call(self.service.employers, then=fill_employers)
+
         def get_selected_employer_id():
             val = employer_var.get()
             return int(val.split(" - ")[0]) if val else None
@@ -553,13 +1386,15 @@ class JobPortalApp:
             if not (cid and title and desc):
                 messagebox.showwarning("Add Job", "Employer, Title and Description are required")
                 return
-            try:
-                self.add_job(title, desc, salary, cid)
+
+            def saved(job):
+                # only the new row is fetched and merged in; no reload
+                if job:
+                    self.apply_job_changes(upserts=[job])
                 messagebox.showinfo("Success", "Job added")
                 win.destroy()
-                self.load_jobs_from_db()
-            except mysql.connector.Error as err:
-                messagebox.showerror("DB Error", str(err))
+
+            self.db_call(lambda conn: self.fetch_job(conn, self.service.add_job(conn, title, desc, salary, cid)), then=saved)
 
         ttk.Button(win, text="Save Job", style="SearchButton.TButton", command=save_job).pack(pady=10)
 
@@ -573,8 +1408,11 @@ class JobPortalApp:
 
 
 def main():
+    startup = StartupReport()
+    startup.mark("imports")
     root = tk.Tk()
-    app = JobPortalApp(root)
+    startup.mark("tk")
+    app = JobPortalApp(root, startup)
     root.mainloop()
 
 
@@ -1,6 +1,33 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import os
 import sqlite3
+import sys
+
+# shared modules live next to "job portal advance.py"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from credentials import PasswordHasher
+from paging import KeysetPager
+from migrations import migrate
+from portal_service import DEFAULT_SORT, JOB_SORTS, ensure_fts, fts_query, salary_where
+from salary import parse_amount
+from search_index import TrigramIndex, tokenize
+
+DB_PATH = 'job_portal.db'
+SEARCH_LIMIT = 200
+PAGE_SIZE = 50
+
+JOB_COLUMNS = ("id", "title", "description", "salary", "company", "salary_min", "salary_max")
+
+
+def load_vocabulary(conn, fts_enabled):
+    # FTS keeps the term list already; without it, collect the words LIKE searches (titles)
+    if fts_enabled:
+        words = (row[0] for row in conn.execute("SELECT term FROM jobs_fts_vocab"))
+    else:
+        words = (w for (title,) in conn.execute("SELECT title FROM jobs") for w in tokenize(title))
+    return TrigramIndex(words)
+
 
 class Job:
     def __init__(self, title, description, salary, company):
@@ -25,7 +52,16 @@ class ScrollableFrame(ttk.Frame):
         )
 
         self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+
+        # called when the view scrolls close to the bottom, e.g. to load the next page
+        self.on_near_end = None
+
+        def _on_yscroll(first, last):
+            scrollbar.set(first, last)
+            if self.on_near_end and float(last) > 0.9:
+                self.on_near_end()
+
+        self.canvas.configure(yscrollcommand=_on_yscroll)
 
         self.canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
@@ -37,8 +73,12 @@ class JobPortalApp:
         master.attributes('-fullscreen', True)  # Set fullscreen mode
 
         # Connect to the database
-        self.conn = sqlite3.connect('job_portal.db')
+        self.conn = sqlite3.connect(DB_PATH)
         self.cursor = self.conn.cursor()
+        migrate(self.conn, "sqlite")
+        self.fts_enabled = ensure_fts(self.conn)
+        self.vocabulary = None  # TrigramIndex, loaded the first time a search finds nothing
+        self.passwords = PasswordHasher()  # hashing runs in worker processes, off the Tk thread
 
         self.create_widgets()
 
@@ -81,6 +121,18 @@ class JobPortalApp:
         self.search_entry = ttk.Entry(self.master, width=50, font=('Helvetica', 12))
         self.search_entry.pack(pady=10)
 
+        filter_frame = ttk.Frame(self.master)
+        filter_frame.pack(pady=(0, 10))
+        ttk.Label(filter_frame, text="Salary", font=('Helvetica', 12)).pack(side=tk.LEFT, padx=4)
+        self.salary_from_entry = ttk.Entry(filter_frame, width=10, font=('Helvetica', 12))
+        self.salary_from_entry.pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text="to", font=('Helvetica', 12)).pack(side=tk.LEFT, padx=4)
+        self.salary_to_entry = ttk.Entry(filter_frame, width=10, font=('Helvetica', 12))
+        self.salary_to_entry.pack(side=tk.LEFT)
+        self.sort_box = ttk.Combobox(filter_frame, values=list(JOB_SORTS), state="readonly", width=20)
+        self.sort_box.set(DEFAULT_SORT)
+        self.sort_box.pack(side=tk.LEFT, padx=8)
+
         self.search_button = ttk.Button(self.master, text="Search", style="SearchButton.TButton", command=self.search_jobs)
         self.search_button.pack()
 
@@ -100,15 +152,20 @@ class JobPortalApp:
         screen_width = login_window.winfo_screenwidth()
         screen_height = login_window.winfo_screenheight()
         x = (screen_width - 400) / 2
-        y = (screen_height - 200) / 2
-        login_window.geometry("400x200+%d+%d" % (x, y))
+        y = (screen_height - 260) / 2
+        login_window.geometry("400x260+%d+%d" % (x, y))
 
-        ttk.Label(login_window, text="Enter Your Login ID", font=('Helvetica', 16), style="Subtitle.TLabel").pack(pady=10)
+        ttk.Label(login_window, text="Login", font=('Helvetica', 16), style="Subtitle.TLabel").pack(pady=10)
 
+        ttk.Label(login_window, text="Email or Username:", font=('Helvetica', 12), style="Content.TLabel").pack()
         login_entry = ttk.Entry(login_window)
-        login_entry.pack(pady=10)
+        login_entry.pack()
 
-        ttk.Button(login_window, text="Login", style="SearchButton.TButton", command=lambda: self.login(login_entry.get())).pack(pady=20)
+        ttk.Label(login_window, text="Password:", font=('Helvetica', 12), style="Content.TLabel").pack()
+        password_entry = ttk.Entry(login_window, show="*")
+        password_entry.pack()
+
+        ttk.Button(login_window, text="Login", style="SearchButton.TButton", command=lambda: self.login(login_entry.get().strip(), password_entry.get())).pack(pady=20)
 
     def open_signup_page(self):
         signup_window = tk.Toplevel(self.master)
@@ -184,59 +241,193 @@ class JobPortalApp:
         self.conn.commit()
         messagebox.showinfo("Success", "Profile details saved successfully.")
 
-    def login(self, login_id):
-        self.cursor.execute("SELECT * FROM profiles WHERE id = ?", (login_id,))
+    def login(self, login_id, password):
+        # by email or username; the password is checked in the hashing pool
+        self.cursor.execute("SELECT id, username, password FROM users WHERE username = ? OR email = ? ORDER BY id LIMIT 1", (login_id, login_id))
         user = self.cursor.fetchone()
-        if user:
-            messagebox.showinfo("Success", "Login successful!")
-        else:
-            messagebox.showerror("Error", "Login ID not found.")
+        if not user:
+            messagebox.showerror("Error", "No account with that email or username.")
+            return
+        user_id, username, stored = user
+
+        def checked(result):
+            ok, new_hash = result
+            if not ok:
+                messagebox.showerror("Error", "Incorrect password.")
+                return
+            if new_hash:
+                # stored at an older cost (or in the clear): replace it while we know the password
+                self.cursor.execute("UPDATE users SET password = ? WHERE id = ?", (new_hash, user_id))
+                self.conn.commit()
+            messagebox.showinfo("Success", f"Login successful! Welcome back, {username}.")
+
+        self._in_pool(self.passwords.verify, password, stored, then=checked, error_title="Login Error")
 
     def signup(self, email, username, password, remember_me):
-        self.cursor.execute("INSERT INTO users (email, username, password, remember_me) VALUES (?, ?, ?, ?)", (email, username, password, remember_me))
-        self.conn.commit()
-        messagebox.showinfo("Success", "Sign up successful!")
+        # only the hash is stored
+        def store(password_hash):
+            self.cursor.execute("INSERT INTO users (email, username, password, remember_me) VALUES (?, ?, ?, ?)", (email, username, password_hash, remember_me))
+            self.conn.commit()
+            messagebox.showinfo("Success", "Sign up successful!")
+
+        self._in_pool(self.passwords.hash, password, then=store, error_title="Sign Up Error")
+
+    def _in_pool(self, submit, *args, then, error_title):
+        # submit(*args) hands work to the hashing pool; any failure is shown, not swallowed
+        try:
+            future = submit(*args)
+        except Exception as err:    # e.g. the pool's worker processes died
+            messagebox.showerror(error_title, f"{err}")
+            return
+        self._when_done(future, then, error_title)
+
+    def _when_done(self, future, then, error_title):
+        # polls so the window stays responsive meanwhile; then(result) runs on the Tk thread
+        if not future.done():
+            self.master.after(20, self._when_done, future, then, error_title)
+            return
+        try:
+            then(future.result())
+        except Exception as err:    # hashing failed (e.g. a broken worker process), or the write did
+            self.conn.rollback()
+            messagebox.showerror(error_title, f"{err}")
 
     def search_jobs(self):
-        search_term = self.search_entry.get()
-        self.cursor.execute("SELECT title, description, salary, company FROM jobs WHERE title LIKE ?", ('%' + search_term + '%',))
-        jobs = self.cursor.fetchall()
-
+        search_term = self.search_entry.get().strip()
+        jobs = self._query_jobs(search_term)
+        corrected = None
+        if not jobs and search_term:
+            # nothing matched as typed: try again with misspelled terms corrected
+            if self.vocabulary is None:
+                self.vocabulary = load_vocabulary(self.conn, self.fts_enabled)
+            corrected = self.vocabulary.correct(search_term)
+            if corrected:
+                jobs = self._query_jobs(corrected)
+
+        self.scrollable_frame.on_near_end = None
         for widget in self.scrollable_frame.scrollable_frame.winfo_children():
             widget.destroy()
 
         if jobs:
+            if corrected:
+                ttk.Label(self.scrollable_frame.scrollable_frame, text=f'Showing results for "{corrected}"', font=('Helvetica', 12, 'italic'), style="Content.TLabel").pack(anchor="w")
             for job in jobs:
-                job_frame = ttk.Frame(self.scrollable_frame.scrollable_frame, style="JobFrame.TFrame")
-                job_frame.pack(pady=10, padx=10, fill="x")
-
-                ttk.Label(job_frame, text=job[0], font=('Helvetica', 14, 'bold'), style="Subtitle.TLabel").pack(anchor="w")
-                ttk.Label(job_frame, text=f"Company: {job[3]}", font=('Helvetica', 12), style="Content.TLabel").pack(anchor="w")
-                ttk.Label(job_frame, text=f"Salary: {job[2]}", font=('Helvetica', 12), style="Content.TLabel").pack(anchor="w")
-                ttk.Label(job_frame, text=f"Description: {job[1]}", font=('Helvetica', 12), style="Content.TLabel").pack(anchor="w")
+                self._add_job_frame(*job)
         else:
             ttk.Label(self.scrollable_frame.scrollable_frame, text="No jobs found.", font=('Helvetica', 12), style="Content.TLabel").pack(anchor="w")
 
+    def _filters(self):
+        # amounts are read like listed salaries: 80000, 80k and $80,000 all work
+        return (parse_amount(self.salary_from_entry.get()), parse_amount(self.salary_to_entry.get()),
+                self.sort_box.get() or DEFAULT_SORT)
+
+    def _query_jobs(self, search_term):
+        salary_from, salary_to, sort = self._filters()
+        where, params = salary_where(salary_from, salary_to, sort, prefix='j.')
+        columns, direction = JOB_SORTS[sort]
+        order = ', '.join(f'j.{c} {direction}' for c in columns)
+        if self.fts_enabled and search_term:
+            if sort == DEFAULT_SORT:
+                order = 'bm25(jobs_fts, 10.0, 1.0, 5.0)'
+            self.cursor.execute(
+                f"""
+                SELECT highlight(jobs_fts, 0, '[', ']'),
+                       snippet(jobs_fts, 1, '[', ']', '...', 16),
+                       j.salary,
+                       highlight(jobs_fts, 2, '[', ']')
+                FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid
+                WHERE {' AND '.join(['jobs_fts MATCH ?'] + where)}
+                ORDER BY {order}
+                LIMIT ?
+                """,
+                [fts_query(search_term)] + params + [SEARCH_LIMIT],
+            )
+        else:
+            self.cursor.execute(
+                f"SELECT j.title, j.description, j.salary, j.company FROM jobs j "
+                f"WHERE {' AND '.join(['j.title LIKE ?'] + where)} ORDER BY {order} LIMIT ?",
+                ['%' + search_term + '%'] + params + [SEARCH_LIMIT],
+            )
+        return self.cursor.fetchall()
+
+    def _add_job_frame(self, title, description, salary, company):
+        job_frame = ttk.Frame(self.scrollable_frame.scrollable_frame, style="JobFrame.TFrame")
+        job_frame.pack(pady=10, padx=10, fill="x")
+
+        ttk.Label(job_frame, text=title, font=('Helvetica', 14, 'bold'), style="Subtitle.TLabel").pack(anchor="w")
+        ttk.Label(job_frame, text=f"Company: {company}", font=('Helvetica', 12), style="Content.TLabel").pack(anchor="w")
+        ttk.Label(job_frame, text=f"Salary: {salary}", font=('Helvetica', 12), style="Content.TLabel").pack(anchor="w")
+        ttk.Label(job_frame, text=f"Description: {description}", font=('Helvetica', 12), style="Content.TLabel").pack(anchor="w")
+
+    def fetch_job_page(self, after, limit, filters=(None, None, DEFAULT_SORT)):
+        # keyset pagination on the sort columns (the primary key, or salary then id),
+        # so every page is a seek on an index
+        salary_from, salary_to, sort = filters
+        columns, direction = JOB_SORTS[sort]
+        where, params = salary_where(salary_from, salary_to, sort)
+        if after is not None:
+            op = '<' if direction == 'DESC' else '>'
+            where.append(f"({', '.join(columns)}) {op} ({', '.join('?' * len(columns))})")
+            params.extend(after)
+        self.cursor.execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs "
+            f"{'WHERE ' + ' AND '.join(where) + ' ' if where else ''}"
+            f"ORDER BY {', '.join(f'{c} {direction}' for c in columns)} LIMIT ?",
+            params + [limit],
+        )
+        return self.cursor.fetchall()
+
     def display_current_jobs(self):
-        self.cursor.execute("SELECT title, description, salary, company FROM jobs")
-        jobs = self.cursor.fetchall()
+        filters = self._filters()
+        positions = [JOB_COLUMNS.index(c) for c in JOB_SORTS[filters[2]][0]]
+        self.pager = KeysetPager(lambda after, limit, deliver: self._fetch_job_page_idle(after, limit, filters, deliver),
+                                 PAGE_SIZE, key=lambda row: tuple(row[i] for i in positions))
 
         for widget in self.scrollable_frame.scrollable_frame.winfo_children():
             widget.destroy()
 
-        if jobs:
-            for job in jobs:
-                job_frame = ttk.Frame(self.scrollable_frame.scrollable_frame, style="JobFrame.TFrame")
-                job_frame.pack(pady=10, padx=10, fill="x")
-
-                ttk.Label(job_frame, text=job[0], font=('Helvetica', 14, 'bold'), style="Subtitle.TLabel").pack(anchor="w")
-                ttk.Label(job_frame, text=f"Company: {job[3]}", font=('Helvetica', 12), style="Content.TLabel").pack(anchor="w")
-                ttk.Label(job_frame, text=f"Salary: {job[2]}", font=('Helvetica', 12), style="Content.TLabel").pack(anchor="w")
-                ttk.Label(job_frame, text=f"Description: {job[1]}", font=('Helvetica', 12), style="Content.TLabel").pack(anchor="w")
-        else:
+        self.scrollable_frame.on_near_end = self._show_next_page
+        self._show_next_page()
+
+    def _fetch_job_page_idle(self, after, limit, filters, deliver):
+        # run the query once Tk is idle so scrolling stays smooth
+        def fetch():
+            try:
+                page = self.fetch_job_page(after, limit, filters)
+            except Exception as err:    # e.g. the database is locked; deliver(None) lets the next scroll retry
+                deliver(None)
+                messagebox.showerror("DB Error", f"Failed to load jobs: {err}")
+                return
+            deliver(page)
+        self.master.after_idle(fetch)
+
+    def _show_next_page(self):
+        pager = self.pager
+        if not pager.done:
+            pager.next_page(lambda page: self._add_page(pager, page))
+
+    def _add_page(self, pager, page):
+        if page is None or pager is not self.pager:
+            return
+        for job in page:
+            self._add_job_frame(*job[1:5])
+        if not pager.rows:
+            self.scrollable_frame.on_near_end = None
             ttk.Label(self.scrollable_frame.scrollable_frame, text="No jobs available.", font=('Helvetica', 12), style="Content.TLabel").pack(anchor="w")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--rebuild-fts":
+        # one-shot: python job_portal_app.py --rebuild-fts [path/to/job_portal.db ...]
+        for path in sys.argv[2:] or [DB_PATH]:
+            conn = sqlite3.connect(path)
+            if ensure_fts(conn, rebuild=True):
+                count = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+                print(f"{path}: full-text index rebuilt over {count} jobs")
+            else:
+                print(f"{path}: no jobs table or FTS5 not available, skipped")
+            conn.close()
+        sys.exit(0)
+
     root = tk.Tk()
     app = JobPortalApp(root)
     root.mainloop()
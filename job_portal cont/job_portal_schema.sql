@@ -0,0 +1,124 @@
+-- job_portal_schema.sql: generated by `python migrations.py --sql`; migrations.py is the source.
+-- A database made from this script is at the latest version; migrate() takes it on from there.
+-- It can be run again: what exists already is kept, and the triggers are replaced.
+
+CREATE TABLE IF NOT EXISTS employer (
+    ID INT AUTO_INCREMENT PRIMARY KEY,
+    COMPANY VARCHAR(100) NOT NULL UNIQUE,
+    INDUSTRY VARCHAR(100) NOT NULL,
+    LOCATION VARCHAR(100) NOT NULL,
+    Website VARCHAR(255) UNIQUE,
+    ContactPerson VARCHAR(100) NOT NULL,
+    PhoneNo VARCHAR(20) NOT NULL UNIQUE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS jobseeker (
+    ID INT AUTO_INCREMENT PRIMARY KEY,
+    Username VARCHAR(80) UNIQUE,
+    PasswordHash VARCHAR(255),
+    Name VARCHAR(100),
+    Email VARCHAR(120) UNIQUE,
+    Experience VARCHAR(50),
+    Skills TEXT,
+    PicturePath VARCHAR(255)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS joblisting (
+    ID INT AUTO_INCREMENT PRIMARY KEY,
+    Title VARCHAR(120) NOT NULL,
+    Description TEXT NOT NULL,
+    Salary VARCHAR(50),
+    SalaryMin INT UNSIGNED,
+    SalaryMax INT UNSIGNED,
+    CompanyID INT,
+    INDEX idx_salary_min (SalaryMin),
+    INDEX idx_salary_max (SalaryMax),
+    FOREIGN KEY (CompanyID) REFERENCES employer(ID) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS job_application (
+    ID INT AUTO_INCREMENT PRIMARY KEY,
+    JobID INT NOT NULL,
+    JobSeekerID INT NOT NULL,
+    ApplicationDate DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    Status ENUM('Pending','Accepted','Rejected') NOT NULL DEFAULT 'Pending',
+    CoverLetter TEXT,
+    FOREIGN KEY (JobID) REFERENCES joblisting(ID) ON DELETE CASCADE,
+    FOREIGN KEY (JobSeekerID) REFERENCES jobseeker(ID) ON DELETE CASCADE,
+    UNIQUE(JobID, JobSeekerID)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS job_recommendation (
+    JobSeekerID INT NOT NULL,
+    JobID INT NOT NULL,
+    `Rank` SMALLINT NOT NULL,
+    Score FLOAT NOT NULL,
+    PRIMARY KEY (JobSeekerID, `Rank`),
+    FOREIGN KEY (JobSeekerID) REFERENCES jobseeker(ID) ON DELETE CASCADE,
+    FOREIGN KEY (JobID) REFERENCES joblisting(ID) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS joblisting_change (
+    Seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+    JobID INT NOT NULL,
+    Op CHAR(1) NOT NULL,
+    ChangedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS schema_version (
+    Version INT NOT NULL,
+    ChangeTracking TINYINT(1) NOT NULL,
+    UpdatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+SET @ddl = IF(EXISTS (SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()
+                     AND TABLE_NAME = 'joblisting' AND INDEX_NAME = 'ft_title_description'),
+              'DO 0', 'ALTER TABLE joblisting ADD FULLTEXT INDEX ft_title_description (Title, Description)');
+PREPARE add_index FROM @ddl;
+EXECUTE add_index;
+DEALLOCATE PREPARE add_index;
+
+SET @ddl = IF(EXISTS (SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()
+                     AND TABLE_NAME = 'job_application' AND INDEX_NAME = 'idx_application_job'),
+              'DO 0', 'ALTER TABLE job_application ADD INDEX idx_application_job (JobID, ID)');
+PREPARE add_index FROM @ddl;
+EXECUTE add_index;
+DEALLOCATE PREPARE add_index;
+
+SET @ddl = IF(EXISTS (SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()
+                     AND TABLE_NAME = 'job_application' AND INDEX_NAME = 'idx_application_seeker'),
+              'DO 0', 'ALTER TABLE job_application ADD INDEX idx_application_seeker (JobSeekerID, JobID)');
+PREPARE add_index FROM @ddl;
+EXECUTE add_index;
+DEALLOCATE PREPARE add_index;
+
+SET @ddl = IF(EXISTS (SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()
+                     AND TABLE_NAME = 'employer' AND INDEX_NAME = 'idx_employer_industry'),
+              'DO 0', 'ALTER TABLE employer ADD INDEX idx_employer_industry (INDUSTRY)');
+PREPARE add_index FROM @ddl;
+EXECUTE add_index;
+DEALLOCATE PREPARE add_index;
+
+SET @ddl = IF(EXISTS (SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()
+                     AND TABLE_NAME = 'employer' AND INDEX_NAME = 'idx_employer_location'),
+              'DO 0', 'ALTER TABLE employer ADD INDEX idx_employer_location (LOCATION)');
+PREPARE add_index FROM @ddl;
+EXECUTE add_index;
+DEALLOCATE PREPARE add_index;
+
+DROP TRIGGER IF EXISTS joblisting_log_insert;
+DROP TRIGGER IF EXISTS joblisting_log_update;
+DROP TRIGGER IF EXISTS joblisting_log_delete;
+DROP TRIGGER IF EXISTS employer_log_update;
+DROP TRIGGER IF EXISTS employer_log_delete;
+
+DELIMITER //
+CREATE TRIGGER joblisting_log_insert AFTER INSERT ON joblisting FOR EACH ROW INSERT INTO joblisting_change (JobID, Op) VALUES (NEW.ID, 'I') //
+CREATE TRIGGER joblisting_log_update AFTER UPDATE ON joblisting FOR EACH ROW INSERT INTO joblisting_change (JobID, Op) VALUES (NEW.ID, 'U') //
+CREATE TRIGGER joblisting_log_delete AFTER DELETE ON joblisting FOR EACH ROW INSERT INTO joblisting_change (JobID, Op) VALUES (OLD.ID, 'D') //
+CREATE TRIGGER employer_log_update AFTER UPDATE ON employer FOR EACH ROW BEGIN IF NOT (NEW.COMPANY <=> OLD.COMPANY AND NEW.INDUSTRY <=> OLD.INDUSTRY AND NEW.LOCATION <=> OLD.LOCATION) THEN INSERT INTO joblisting_change (JobID, Op) SELECT ID, 'U' FROM joblisting WHERE CompanyID = NEW.ID; END IF; END //
+CREATE TRIGGER employer_log_delete BEFORE DELETE ON employer FOR EACH ROW INSERT INTO joblisting_change (JobID, Op) SELECT ID, 'D' FROM joblisting WHERE CompanyID = OLD.ID //
+DELIMITER ;
+
+INSERT INTO schema_version (Version, ChangeTracking) SELECT 6, 1 FROM DUAL
+    WHERE NOT EXISTS (SELECT 1 FROM schema_version);
@@ -0,0 +1,675 @@
+"""Versioned schema migrations, for the MySQL app and the sqlite app alike.
+
+    python migrations.py [--sqlite job_portal.db] [--status]
+    python migrations.py --sql > "job_portal cont/job_portal_schema.sql"
+
+A database records the last migration applied to it (MySQL: the one-row
+schema_version table, SQLite: PRAGMA user_version) and migrate() applies the
+ones after it, in order. Version numbers are shared by both dialects; a
+migration with nothing to do for one of them only moves its version on.
+SQLite applies everything pending in one transaction. MySQL commits DDL as it
+goes, so it records each migration as it finishes, and every step checks for
+what it creates first: a database made by the app before versioning, or by a
+run stopped half-way, picks up where it left off.
+
+The layout of the first create_job_portal_db.sql (VARCHAR ids, one
+application per job) is recognised: its tables are set aside where their
+names clash with ours and their rows copied into the current tables. Its
+skill, education, experience and location tables belong to no jobseeker, so
+they are left where they are.
+"""
+import argparse
+import re
+import sqlite3
+import sys
+import time
+from typing import NamedTuple
+
+from config import DB_HOST, DB_NAME, DB_PASSWORD, DB_USER
+from salary import parse_salary
+
+BACKFILL_BATCH_SIZE = 5000  # rows parsed per query when salaries are backfilled
+LOCK_TIMEOUT = 60           # s to wait for another process migrating the same MySQL database
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    mysql: tuple = ()       # steps: SQL, or step(conn, state)
+    sqlite: tuple = ()
+
+
+# =========================
+# MySQL
+# =========================
+MYSQL_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS employer (
+        ID INT AUTO_INCREMENT PRIMARY KEY,
+        COMPANY VARCHAR(100) NOT NULL UNIQUE,
+        INDUSTRY VARCHAR(100) NOT NULL,
+        LOCATION VARCHAR(100) NOT NULL,
+        Website VARCHAR(255) UNIQUE,
+        ContactPerson VARCHAR(100) NOT NULL,
+        PhoneNo VARCHAR(20) NOT NULL UNIQUE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS jobseeker (
+        ID INT AUTO_INCREMENT PRIMARY KEY,
+        Username VARCHAR(80) UNIQUE,
+        PasswordHash VARCHAR(255),
+        Name VARCHAR(100),
+        Email VARCHAR(120) UNIQUE,
+        Experience VARCHAR(50),
+        Skills TEXT,
+        PicturePath VARCHAR(255)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS joblisting (
+        ID INT AUTO_INCREMENT PRIMARY KEY,
+        Title VARCHAR(120) NOT NULL,
+        Description TEXT NOT NULL,
+        Salary VARCHAR(50),
+        SalaryMin INT UNSIGNED,
+        SalaryMax INT UNSIGNED,
+        CompanyID INT,
+        INDEX idx_salary_min (SalaryMin),
+        INDEX idx_salary_max (SalaryMax),
+        FOREIGN KEY (CompanyID) REFERENCES employer(ID) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_application (
+        ID INT AUTO_INCREMENT PRIMARY KEY,
+        JobID INT NOT NULL,
+        JobSeekerID INT NOT NULL,
+        ApplicationDate DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        Status ENUM('Pending','Accepted','Rejected') NOT NULL DEFAULT 'Pending',
+        CoverLetter TEXT,
+        FOREIGN KEY (JobID) REFERENCES joblisting(ID) ON DELETE CASCADE,
+        FOREIGN KEY (JobSeekerID) REFERENCES jobseeker(ID) ON DELETE CASCADE,
+        UNIQUE(JobID, JobSeekerID)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+]
+
+MYSQL_SCHEMA_VERSION = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        Version INT NOT NULL,
+        ChangeTracking TINYINT(1) NOT NULL,
+        UpdatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+
+# Every insert/update/delete of a listing is appended to joblisting_change so a
+# refresh only fetches what changed since its watermark. Cascaded deletes don't
+# fire triggers, and company, industry and location live in employer, so employer
+# changes are logged for their jobs too.
+MYSQL_CHANGE_LOG = """
+    CREATE TABLE IF NOT EXISTS joblisting_change (
+        Seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+        JobID INT NOT NULL,
+        Op CHAR(1) NOT NULL,
+        ChangedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+
+# recommend.py precompute's top jobs per jobseeker, replaced wholesale by each run
+MYSQL_RECOMMENDATIONS = """
+    CREATE TABLE IF NOT EXISTS job_recommendation (
+        JobSeekerID INT NOT NULL,
+        JobID INT NOT NULL,
+        `Rank` SMALLINT NOT NULL,
+        Score FLOAT NOT NULL,
+        PRIMARY KEY (JobSeekerID, `Rank`),
+        FOREIGN KEY (JobSeekerID) REFERENCES jobseeker(ID) ON DELETE CASCADE,
+        FOREIGN KEY (JobID) REFERENCES joblisting(ID) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+
+MYSQL_TRIGGERS = {
+    "joblisting_log_insert":
+        "CREATE TRIGGER joblisting_log_insert AFTER INSERT ON joblisting FOR EACH ROW "
+        "INSERT INTO joblisting_change (JobID, Op) VALUES (NEW.ID, 'I')",
+    "joblisting_log_update":
+        "CREATE TRIGGER joblisting_log_update AFTER UPDATE ON joblisting FOR EACH ROW "
+        "INSERT INTO joblisting_change (JobID, Op) VALUES (NEW.ID, 'U')",
+    "joblisting_log_delete":
+        "CREATE TRIGGER joblisting_log_delete AFTER DELETE ON joblisting FOR EACH ROW "
+        "INSERT INTO joblisting_change (JobID, Op) VALUES (OLD.ID, 'D')",
+    "employer_log_update":
+        "CREATE TRIGGER employer_log_update AFTER UPDATE ON employer FOR EACH ROW "
+        "BEGIN IF NOT (NEW.COMPANY <=> OLD.COMPANY AND NEW.INDUSTRY <=> OLD.INDUSTRY "
+        "AND NEW.LOCATION <=> OLD.LOCATION) THEN "
+        "INSERT INTO joblisting_change (JobID, Op) SELECT ID, 'U' FROM joblisting WHERE CompanyID = NEW.ID; "
+        "END IF; END",
+    "employer_log_delete":
+        "CREATE TRIGGER employer_log_delete BEFORE DELETE ON employer FOR EACH ROW "
+        "INSERT INTO joblisting_change (JobID, Op) SELECT ID, 'D' FROM joblisting WHERE CompanyID = OLD.ID",
+}
+
+# (table, index, columns), each for the queries of portal_service.MySQLPortal and the app
+# that would otherwise scan or sort. An index is skipped where one already starts with its columns.
+MYSQL_INDEXES = [
+    # applicants() and application_stamp(): one job's applications in ID order, MAX(ID) without a scan.
+    # The UNIQUE (JobID, JobSeekerID) finds them too, but in seeker order.
+    ("job_application", "idx_application_job", ("JobID", "ID")),
+    # apply_batch(): which of the jobs in a batch each seeker has applied to already
+    ("job_application", "idx_application_seeker", ("JobSeekerID", "JobID")),
+    # get_profile(), save_profile(), apply_batch(): seekers by email. Jobseeker tables
+    # made by this schema have it as their UNIQUE key; older ones may have none.
+    ("jobseeker", "idx_jobseeker_email", ("Email",)),
+    # the Industry and Location facets filter jobs through their employer
+    ("employer", "idx_employer_industry", ("INDUSTRY",)),
+    ("employer", "idx_employer_location", ("LOCATION",)),
+]
+
+LEGACY_TABLES = ("employer", "joblisting", "job_application")
+LEGACY_STATUS = {"A": "Accepted", "R": "Rejected"}     # anything else is Pending
+
+
+def _mysql():
+    import mysql.connector  # only needed for MySQL
+    return mysql.connector
+
+
+def _mysql_tables(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()")
+    return {name.lower() for name, in cursor.fetchall()}
+
+
+def _add_index(cursor, table, name, columns, kind="INDEX"):
+    """Add an index unless one already starts with columns; online where InnoDB can build it so.
+
+    ALGORITHM=INPLACE, LOCK=NONE keeps the table readable and writable while a
+    large table is indexed; the server refuses (rather than silently locking)
+    where it can't, e.g. for a FULLTEXT index, and the index is then built
+    with the server's default.
+    """
+    cursor.execute(
+        "SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+        (table,),
+    )
+    existing = {}
+    for index, column in cursor.fetchall():
+        existing.setdefault(index, []).append(column.lower())
+    wanted = [c.lower() for c in columns]
+    if any(cols[:len(wanted)] == wanted for cols in existing.values()):
+        return False
+    ddl = f"ALTER TABLE {table} ADD {kind} {name} ({', '.join(columns)})"
+    try:
+        cursor.execute(ddl + ", ALGORITHM=INPLACE, LOCK=NONE")
+    except _mysql().Error as err:
+        if err.errno not in (1845, 1846):   # ER_ALTER_OPERATION_NOT_SUPPORTED(_REASON)
+            raise
+        cursor.execute(ddl)
+    return True
+
+
+def _mysql_set_aside_legacy(conn, state):
+    # create_job_portal_db.sql's tables of these names have VARCHAR ids; renamed
+    # together so their foreign keys follow, and copied from by the next migration
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT TABLE_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() "
+        f"AND COLUMN_NAME = 'ID' AND DATA_TYPE = 'varchar' AND TABLE_NAME IN ({', '.join(['%s'] * len(LEGACY_TABLES))})",
+        LEGACY_TABLES,
+    )
+    legacy = [name for name, in cursor.fetchall()]
+    if legacy:
+        cursor.execute("RENAME TABLE " + ", ".join(f"{t} TO legacy_{t}" for t in legacy))
+
+
+def _mysql_fulltext(conn, state):
+    # server-side search; added separately so existing tables pick it up too
+    _add_index(conn.cursor(), "joblisting", "ft_title_description", ("Title", "Description"), kind="FULLTEXT INDEX")
+
+
+def _mysql_salary_columns(conn, state):
+    # Salary is free text ("$100,000", "80k - 120k"); filters and sorts use the
+    # parsed, indexed SalaryMin/SalaryMax instead. Tables from before those
+    # columns get them here, and their existing rows are parsed once.
+    # (InnoDB secondary indexes carry the primary key, so both are (salary, ID).)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'joblisting' AND COLUMN_NAME = 'SalaryMin'"
+    )
+    if cursor.fetchone()[0]:
+        return
+    cursor.execute(
+        "ALTER TABLE joblisting "
+        "ADD COLUMN SalaryMin INT UNSIGNED AFTER Salary, ADD COLUMN SalaryMax INT UNSIGNED AFTER SalaryMin, "
+        "ADD INDEX idx_salary_min (SalaryMin), ADD INDEX idx_salary_max (SalaryMax)"
+    )
+    # parse in Python batch by batch, then one joined UPDATE per batch
+    cursor.execute(
+        "CREATE TEMPORARY TABLE salary_parsed "
+        "(ID INT PRIMARY KEY, SalaryMin INT UNSIGNED, SalaryMax INT UNSIGNED) ENGINE=MEMORY"
+    )
+    after_id = 0
+    while True:
+        cursor.execute(
+            "SELECT ID, Salary FROM joblisting WHERE ID > %s AND Salary IS NOT NULL ORDER BY ID LIMIT %s",
+            (after_id, BACKFILL_BATCH_SIZE),
+        )
+        rows = cursor.fetchall()
+        parsed = [(job_id, *parse_salary(text)) for job_id, text in rows]
+        parsed = [p for p in parsed if p[1] is not None]
+        if parsed:
+            cursor.executemany("INSERT INTO salary_parsed (ID, SalaryMin, SalaryMax) VALUES (%s, %s, %s)", parsed)
+            cursor.execute(
+                "UPDATE joblisting j JOIN salary_parsed p ON p.ID = j.ID "
+                "SET j.SalaryMin = p.SalaryMin, j.SalaryMax = p.SalaryMax"
+            )
+            cursor.execute("DELETE FROM salary_parsed")
+            conn.commit()
+        if len(rows) < BACKFILL_BATCH_SIZE:
+            break
+        after_id = rows[-1][0]
+    cursor.execute("DROP TEMPORARY TABLE salary_parsed")
+
+
+def _mysql_change_log(conn, state):
+    # Without the triggers (e.g. no TRIGGER privilege) change tracking is off and
+    # the app falls back to full reloads; state["change_tracking"] says which.
+    cursor = conn.cursor()
+    cursor.execute(MYSQL_CHANGE_LOG)
+    cursor.execute(
+        "SELECT TRIGGER_NAME, ACTION_STATEMENT FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE()"
+    )
+    existing = dict(cursor.fetchall())
+    try:
+        for name, ddl in MYSQL_TRIGGERS.items():
+            if name in existing and existing[name].strip() == ddl.split(" FOR EACH ROW ", 1)[1]:
+                continue
+            if name in existing:
+                # created by an older version with a different body
+                cursor.execute(f"DROP TRIGGER {name}")
+            cursor.execute(ddl)
+    except _mysql().Error as err:
+        print(f"Change tracking disabled: {err}")
+        state["change_tracking"] = False
+        return
+    state["change_tracking"] = True
+
+
+def _mysql_copy_legacy(conn, state):
+    # Row by row, for the new ids the next table's references map to. A company or
+    # seeker already there (same name, website, phone, username or email) is reused.
+    cursor = conn.cursor(dictionary=True)
+    tables = _mysql_tables(conn)
+    employers, jobs, seekers = {}, {}, {}
+    if "legacy_employer" in tables:
+        cursor.execute("SELECT ID AS id, COMPANY AS company, INDUSTRY AS industry, LOCATION AS location, "
+                       "Website AS website, contactperson AS contact, phoneNo AS phone FROM legacy_employer")
+        for r in cursor.fetchall():
+            cursor.execute(
+                "INSERT INTO employer (COMPANY, INDUSTRY, LOCATION, Website, ContactPerson, PhoneNo) "
+                "VALUES (%s, %s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE ID = LAST_INSERT_ID(ID)",
+                (r["company"], r["industry"], r["location"], r["website"], r["contact"], str(r["phone"])),
+            )
+            employers[r["id"]] = cursor.lastrowid
+    if "legacy_joblisting" in tables:
+        cursor.execute("SELECT ID AS id, job AS title, description, requirement, salary, compID AS company "
+                       "FROM legacy_joblisting")
+        for r in cursor.fetchall():
+            description = "\n\n".join(part for part in (r["description"], r["requirement"]) if part)
+            cursor.execute(
+                "INSERT INTO joblisting (Title, Description, Salary, SalaryMin, SalaryMax, CompanyID) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                (r["title"], description, str(r["salary"]), r["salary"], r["salary"], employers.get(r["company"])),
+            )
+            jobs[r["id"]] = cursor.lastrowid
+    if "users" in tables:
+        # passwords were stored raw; they still verify, and are hashed at the next login
+        cursor.execute("SELECT ID AS id, Username AS username, Email AS email, Password AS password FROM users")
+        for r in cursor.fetchall():
+            cursor.execute(
+                "INSERT INTO jobseeker (Username, PasswordHash, Name, Email) VALUES (%s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE ID = LAST_INSERT_ID(ID)",
+                (r["username"], r["password"], r["username"], r["email"]),
+            )
+            seekers[r["id"]] = cursor.lastrowid
+    if "legacy_job_application" in tables:
+        cursor.execute("SELECT jobID AS job, jobseekerID AS seeker, applicationdate AS applied, status, "
+                       "coverletter AS cover_letter FROM legacy_job_application")
+        rows = [(jobs[r["job"]], seekers[r["seeker"]], r["applied"], LEGACY_STATUS.get(r["status"], "Pending"),
+                 r["cover_letter"])
+                for r in cursor.fetchall() if r["job"] in jobs and r["seeker"] in seekers]
+        cursor.executemany(
+            "INSERT IGNORE INTO job_application (JobID, JobSeekerID, ApplicationDate, Status, CoverLetter) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def _mysql_indexes(conn, state):
+    cursor = conn.cursor()
+    for table, name, columns in MYSQL_INDEXES:
+        _add_index(cursor, table, name, columns)
+
+
+# =========================
+# SQLite
+# =========================
+SQLITE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT, username TEXT, password TEXT, remember_me INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS profiles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT, email TEXT, experience TEXT, skills TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT, description TEXT, salary TEXT, company TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS applications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id INTEGER,
+        applicant_name TEXT,
+        applicant_email TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+# The same access paths as MYSQL_INDEXES, for portal_service.SQLitePortal and the sqlite app.
+# SQLite ends every index with the rowid, so (job_id) already lists a job's applications in id order
+# and (email) finds a profile's latest row. There is no online build: CREATE INDEX holds the write
+# lock while it runs, readers carry on under WAL.
+SQLITE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_applications_job ON applications(job_id)",
+    "CREATE INDEX IF NOT EXISTS idx_applications_email ON applications(applicant_email, job_id)",
+    "CREATE INDEX IF NOT EXISTS idx_profiles_email ON profiles(email)",
+    "CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)",
+    "CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company)",     # Company facet, exports by employer
+]
+
+
+SQLITE_RECOMMENDATIONS = """
+    CREATE TABLE IF NOT EXISTS job_recommendation (
+        profile_id INTEGER NOT NULL,
+        job_id INTEGER NOT NULL,
+        rank INTEGER NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (profile_id, rank)
+    )
+    """
+
+
+def table_exists(cursor, name):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,))
+    return cursor.fetchone() is not None
+
+
+def _columns(cursor, table):
+    return {row[1].lower() for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _sqlite_set_aside_legacy(conn, state):
+    # create_job_portal_db.sql's users (ID, Username, Email, Password) takes the name of ours
+    cursor = conn.cursor()
+    if table_exists(cursor, "users") and "remember_me" not in _columns(cursor, "users"):
+        cursor.execute("ALTER TABLE users RENAME TO legacy_users")
+
+
+def _sqlite_copy_legacy(conn, state):
+    # row by row, for the new ids; a user whose username or email is taken is not copied again
+    cursor = conn.cursor()
+    jobs, seekers = {}, {}
+    if table_exists(cursor, "joblisting") and "job" in _columns(cursor, "joblisting"):
+        rows = cursor.execute(
+            "SELECT j.ID, j.job, j.description, j.requirement, j.salary, e.COMPANY "
+            "FROM joblisting j LEFT JOIN employer e ON e.ID = j.compID"
+        ).fetchall()
+        for legacy_id, title, description, requirement, salary, company in rows:
+            description = "\n\n".join(part for part in (description, requirement) if part)
+            cursor.execute("INSERT INTO jobs (title, description, salary, company) VALUES (?, ?, ?, ?)",
+                           (title, description, None if salary is None else str(salary), company))
+            jobs[legacy_id] = cursor.lastrowid
+    if table_exists(cursor, "legacy_users"):
+        # passwords were stored raw; they still verify, and are hashed at the next login
+        for legacy_id, username, email, password in cursor.execute(
+                "SELECT ID, Username, Email, Password FROM legacy_users").fetchall():
+            seekers[legacy_id] = (username, email)
+            if not cursor.execute("SELECT 1 FROM users WHERE username = ? OR email = ?", (username, email)).fetchone():
+                cursor.execute("INSERT INTO users (email, username, password, remember_me) VALUES (?, ?, ?, 0)",
+                               (email, username, password))
+    if table_exists(cursor, "job_application") and "jobseekerid" in _columns(cursor, "job_application"):
+        rows = cursor.execute("SELECT jobID, jobseekerID, applicationdate FROM job_application").fetchall()
+        cursor.executemany(
+            "INSERT INTO applications (job_id, applicant_name, applicant_email, created_at) VALUES (?, ?, ?, ?)",
+            [(jobs[job], *seekers[seeker], applied) for job, seeker, applied in rows if job in jobs and seeker in seekers],
+        )
+
+
+def _sqlite_salary_columns(conn, state):
+    # the parsed, indexed salary_min/salary_max; rows without them yet are parsed once
+    cursor = conn.cursor()
+    if "salary_min" not in _columns(cursor, "jobs"):
+        cursor.execute("ALTER TABLE jobs ADD COLUMN salary_min INTEGER")
+        cursor.execute("ALTER TABLE jobs ADD COLUMN salary_max INTEGER")
+    rows = cursor.execute("SELECT id, salary FROM jobs WHERE salary_min IS NULL AND salary IS NOT NULL").fetchall()
+    parsed = [(lo, hi, job_id) for job_id, text in rows for lo, hi in [parse_salary(text)] if lo is not None]
+    cursor.executemany("UPDATE jobs SET salary_min = ?, salary_max = ? WHERE id = ?", parsed)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_salary_min ON jobs(salary_min)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_salary_max ON jobs(salary_max)")
+
+
+def _sqlite_picture_column(conn, state):
+    # profiles.picture_path (jobseeker.PicturePath in MySQL)
+    cursor = conn.cursor()
+    if "picture_path" not in _columns(cursor, "profiles"):
+        cursor.execute("ALTER TABLE profiles ADD COLUMN picture_path TEXT")
+
+
+# =========================
+# Migrations
+# =========================
+MIGRATIONS = [
+    Migration(1, "base schema",
+              mysql=(_mysql_set_aside_legacy, *MYSQL_TABLES, _mysql_fulltext, _mysql_salary_columns, _mysql_change_log),
+              sqlite=(_sqlite_set_aside_legacy, *SQLITE_TABLES)),
+    Migration(2, "copy rows of the legacy layout", mysql=(_mysql_copy_legacy,), sqlite=(_sqlite_copy_legacy,)),
+    Migration(3, "parsed salaries", sqlite=(_sqlite_salary_columns,)),     # MySQL: in the base schema
+    Migration(4, "profile pictures", sqlite=(_sqlite_picture_column,)),   # MySQL: jobseeker.PicturePath
+    Migration(5, "indexes for the hot queries", mysql=(_mysql_indexes,), sqlite=tuple(SQLITE_INDEXES)),
+    Migration(6, "precomputed job recommendations", mysql=(MYSQL_RECOMMENDATIONS,), sqlite=(SQLITE_RECOMMENDATIONS,)),
+]
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def migrate(conn, dialect, target=SCHEMA_VERSION, log=None):
+    """Apply the migrations after the database's version, up to target.
+
+    Returns (version before, version after, state); state["change_tracking"] is
+    whether MySQL's change-log triggers are in place. log(message) hears of
+    each migration applied.
+    """
+    if dialect == "mysql":
+        return _migrate_mysql(conn, target, log)
+    if dialect == "sqlite":
+        return _migrate_sqlite(conn, target, log)
+    raise ValueError(f"unknown dialect {dialect!r}")
+
+
+def current_version(conn, dialect):
+    """The database's version, 0 for one from before versioning. Changes nothing."""
+    if dialect == "sqlite":
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT Version FROM schema_version")
+    except _mysql().ProgrammingError as err:
+        if err.errno != 1146:   # no such table
+            raise
+        return 0
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def pending(version, dialect):
+    return [m for m in MIGRATIONS if m.version > version and getattr(m, dialect)]
+
+
+def _apply(conn, steps, state):
+    for step in steps:
+        if callable(step):
+            step(conn, state)
+        else:
+            conn.cursor().execute(step)
+
+
+def _migrate_mysql(conn, target, log):
+    # one process at a time; the others wait, then find the work done
+    cursor = conn.cursor()
+    cursor.execute("SELECT GET_LOCK('job_portal_migrations', %s)", (LOCK_TIMEOUT,))
+    if cursor.fetchone()[0] != 1:
+        raise RuntimeError("timed out waiting for another process migrating the database")
+    try:
+        cursor.execute(MYSQL_SCHEMA_VERSION)
+        cursor.execute("SELECT Version, ChangeTracking FROM schema_version")
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute("INSERT INTO schema_version (Version, ChangeTracking) VALUES (0, 0)")
+            row = (0, 0)
+        start = version = row[0]
+        state = {"change_tracking": bool(row[1])}
+        for m in MIGRATIONS:
+            if version < m.version <= target:
+                started = time.perf_counter()
+                _apply(conn, m.mysql, state)
+                # in the same transaction as a migration's row changes; its DDL is committed already
+                cursor.execute("UPDATE schema_version SET Version = %s, ChangeTracking = %s",
+                               (m.version, state["change_tracking"]))
+                conn.commit()
+                version = m.version
+                if log:
+                    log(f"{m.version}: {m.name} ({time.perf_counter() - started:.2f}s)")
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("DO RELEASE_LOCK('job_portal_migrations')")
+    return start, version, state
+
+
+def _migrate_sqlite(conn, target, log):
+    # all or nothing: SQLite's DDL is transactional, and so is user_version
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    applied = []
+    try:
+        start = version = conn.execute("PRAGMA user_version").fetchone()[0]
+        state = {"change_tracking": False}
+        for m in MIGRATIONS:
+            if version < m.version <= target:
+                started = time.perf_counter()
+                _apply(conn, m.sqlite, state)
+                version = m.version
+                applied.append(f"{m.version}: {m.name} ({time.perf_counter() - started:.2f}s)")
+        if version != start:
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    if log:
+        for message in applied:
+            log(message)
+    return start, version, state
+
+
+# =========================
+# Command line
+# =========================
+def mysql_script():
+    """The MySQL schema of the latest version as one script, for the mysql client."""
+    lines = [
+        "-- job_portal_schema.sql: generated by `python migrations.py --sql`; migrations.py is the source.",
+        "-- A database made from this script is at the latest version; migrate() takes it on from there.",
+        "-- It can be run again: what exists already is kept, and the triggers are replaced.",
+        "",
+    ]
+    tables = "\n".join(MYSQL_TABLES)
+    for ddl in MYSQL_TABLES + [MYSQL_RECOMMENDATIONS, MYSQL_CHANGE_LOG, MYSQL_SCHEMA_VERSION]:
+        lines += [_dedent(ddl) + ";", ""]
+    lines += _script_add_index("joblisting", "ft_title_description", ("Title", "Description"), kind="FULLTEXT INDEX")
+    for table, name, columns in MYSQL_INDEXES:
+        # skip an index a column's own UNIQUE already is
+        if len(columns) == 1 and re.search(rf"^\s*{columns[0]} [^,]*\bUNIQUE\b", tables, re.M):
+            continue
+        lines += _script_add_index(table, name, columns)
+    lines += [f"DROP TRIGGER IF EXISTS {name};" for name in MYSQL_TRIGGERS]
+    lines += ["", "DELIMITER //"]
+    lines += [f"{ddl} //" for ddl in MYSQL_TRIGGERS.values()]
+    # schema_version is one row: running the script again must not add a second
+    lines += ["DELIMITER ;", "", f"INSERT INTO schema_version (Version, ChangeTracking) SELECT {SCHEMA_VERSION}, 1 FROM DUAL",
+              "    WHERE NOT EXISTS (SELECT 1 FROM schema_version);"]
+    return "\n".join(lines) + "\n"
+
+
+def _script_add_index(table, name, columns, kind="INDEX"):
+    # MySQL has no CREATE INDEX IF NOT EXISTS: the ALTER is prepared only while the index is missing
+    ddl = f"ALTER TABLE {table} ADD {kind} {name} ({', '.join(columns)})"
+    return [
+        "SET @ddl = IF(EXISTS (SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()",
+        f"                     AND TABLE_NAME = '{table}' AND INDEX_NAME = '{name}'),",
+        f"              'DO 0', '{ddl}');",
+        "PREPARE add_index FROM @ddl;",
+        "EXECUTE add_index;",
+        "DEALLOCATE PREPARE add_index;",
+        "",
+    ]
+
+
+def _dedent(ddl):
+    return "\n".join(line[4:] if line.startswith("    ") else line for line in ddl.strip("\n").splitlines()).strip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bring a job portal database to the latest schema version.")
+    parser.add_argument("--sqlite", metavar="DB", help="migrate the sqlite app's database instead of MySQL")
+    parser.add_argument("--status", action="store_true", help="show the version and what is pending, change nothing")
+    parser.add_argument("--sql", action="store_true", help="print the latest MySQL schema as a script")
+    args = parser.parse_args(argv)
+    if args.sql:
+        sys.stdout.write(mysql_script())
+        return 0
+    if args.sqlite:
+        conn, dialect = sqlite3.connect(args.sqlite), "sqlite"
+    else:
+        conn = _mysql().connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME)
+        dialect = "mysql"
+    try:
+        version = current_version(conn, dialect)
+        if args.status:
+            print(f"version {version} of {SCHEMA_VERSION}")
+            for m in pending(version, dialect):
+                print(f"  pending {m.version}: {m.name}")
+            return 0
+        start, version, _ = migrate(conn, dialect, log=print)
+        print(f"version {version}" + (f" (was {start})" if start != version else ", nothing to do"))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# =========================
+# Keyset pagination
+# =========================
+class KeysetPager:
+    """Walks an ordered result one page at a time, keeping one page fetched ahead.
+
+    fetch_page(after, limit, deliver) starts fetching the next `limit` rows after
+    `after`: the key of the last row seen (None for the first page), e.g. the ID
+    for `WHERE ID < %s ORDER BY ID DESC LIMIT %s`. It calls deliver(rows) when they
+    arrive, or deliver(None) if the fetch failed; a synchronous fetch may call it
+    right away. With key=None the pager does offset paging instead and passes the
+    number of rows already fetched.
+
+    As soon as a page is handed out the following one is requested, so scrolling
+    normally finds it already loaded.
+    """
+
+    def __init__(self, fetch_page, page_size=50, key=lambda row: row.id, read_ahead=True):
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.key = key
+        self.read_ahead = read_ahead
+        self.rows = []          # every row handed out so far, in order
+        self._after = None
+        self._fetched = 0
+        self._ahead = None      # page read ahead, not yet handed out
+        self._exhausted = False
+        self._in_flight = False
+        self._waiting = None    # on_page callback of a next_page() call not served yet
+
+    @property
+    def done(self):
+        return self._exhausted and self._ahead is None and not self._in_flight
+
+    @property
+    def loading(self):
+        return self._waiting is not None
+
+    def next_page(self, on_page):
+        """Hand the next page to on_page(rows); on_page(None) if fetching failed.
+
+        Returns False (and does nothing) while a previous request is still waiting.
+        """
+        if self._waiting is not None:
+            return False
+        if self._ahead is not None:
+            page, self._ahead = self._ahead, None
+            self._hand_out(page, on_page)
+        elif self._exhausted and not self._in_flight:
+            on_page([])
+        else:
+            self._waiting = on_page
+            self._start_fetch()
+        return True
+
+    def _start_fetch(self):
+        if self._in_flight or self._exhausted:
+            return
+        self._in_flight = True
+        after = self._fetched if self.key is None else self._after
+        self.fetch_page(after, self.page_size, self._received)
+
+    def _received(self, page):
+        self._in_flight = False
+        waiting, self._waiting = self._waiting, None
+        if page is None:
+            # a failed read-ahead is retried by the next request
+            if waiting:
+                waiting(None)
+            return
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if page:
+            self._fetched += len(page)
+            if self.key is not None:
+                self._after = self.key(page[-1])
+        if waiting:
+            self._hand_out(page, waiting)
+        else:
+            self._ahead = page
+
+    def _hand_out(self, page, on_page):
+        self.rows.extend(page)
+        on_page(page)
+        if self.read_ahead and self._ahead is None:
+            self._start_fetch()
@@ -0,0 +1,190 @@
+"""Profile pictures: stored once by content, thumbnailed in the background.
+
+    <PICTURE_DIR>/originals/ab/ab12...ef.jpg        SHA-256 of the file, original extension
+    <PICTURE_DIR>/thumbs/<size>/ab/ab12...ef.png
+
+jobseeker.PicturePath holds the original's name relative to PICTURE_DIR
+("ab/ab12...ef.jpg"). The same file uploaded twice, by anyone, is stored once.
+Hashing, copying and thumbnailing run on a small thread pool (Pillow releases
+the GIL while decoding and resizing); the Tk side only turns small PNG
+thumbnails into images, through a bounded LRU. Thumbnails need Pillow: without
+it pictures are still stored and recorded, just not shown.
+"""
+import hashlib
+import io
+import os
+import re
+import tempfile
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# =========================
+# Configuration
+# =========================
+PICTURE_DIR = os.path.join(os.path.expanduser("~"), ".job_portal", "pictures")
+LIST_THUMB_SIZE = 48        # px, rows of lists
+PROFILE_THUMB_SIZE = 128    # px, the profile window
+THUMB_WORKERS = 2
+IMAGE_CACHE_SIZE = 256      # decoded thumbnails kept on the Tk side
+MAX_PICTURE_BYTES = 20 * 1024 * 1024
+CHUNK_SIZE = 1 << 16
+
+_NAME_RE = re.compile(r"[0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]{1,5}")
+
+
+# =========================
+# Store
+# =========================
+class PictureStore:
+    """Content-addressed originals and their thumbnails under one directory.
+
+    put() and thumbnail() return Futures and run on the store's thread pool.
+    Files are written to a temporary name and renamed into place, so a reader
+    never sees half a file and two writers of the same content don't clash.
+    """
+
+    def __init__(self, root=PICTURE_DIR, sizes=(LIST_THUMB_SIZE, PROFILE_THUMB_SIZE), workers=THUMB_WORKERS):
+        self.root = root
+        self.sizes = sizes
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="pictures")
+
+    def put(self, source):
+        """Future of the stored name of the picture file at source; its thumbnails are made next."""
+        return self._pool.submit(self._put, source)
+
+    def thumbnail(self, name, size):
+        """Future of the PNG bytes of name's thumbnail, made first if missing; None without Pillow."""
+        return self._pool.submit(self._thumbnail, name, size)
+
+    def path(self, name):
+        if not _NAME_RE.fullmatch(name or ""):
+            raise ValueError(f"not a stored picture: {name!r}")
+        return os.path.join(self.root, "originals", name)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _put(self, source):
+        # hashed while copied, one read of the source
+        ext = os.path.splitext(source)[1].lower().lstrip(".") or "bin"
+        if not re.fullmatch(r"[a-z0-9]{1,5}", ext):
+            ext = "bin"
+        directory = os.path.join(self.root, "originals")
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+        try:
+            with open(source, "rb") as src, os.fdopen(fd, "wb") as dst:
+                while chunk := src.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_PICTURE_BYTES:
+                        raise ValueError(f"pictures are limited to {MAX_PICTURE_BYTES // (1024 * 1024)} MB")
+                    digest.update(chunk)
+                    dst.write(chunk)
+            Image = _pillow()
+            if Image is not None:
+                try:
+                    with Image.open(tmp) as image:
+                        image.verify()
+                except Exception as err:
+                    raise ValueError("not a picture Pillow can read") from err
+            hexdigest = digest.hexdigest()
+            name = f"{hexdigest[:2]}/{hexdigest}.{ext}"
+            target = self.path(name)
+            if os.path.exists(target):
+                os.remove(tmp)      # already stored
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        if _pillow() is not None:
+            for thumb_size in self.sizes:
+                self._pool.submit(self._thumbnail, name, thumb_size)
+        return name
+
+    def _thumbnail(self, name, size):
+        Image = _pillow()
+        if Image is None:
+            return None
+        target = os.path.join(self.root, "thumbs", str(size), os.path.splitext(name)[0] + ".png")
+        try:
+            with open(target, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        with Image.open(self.path(name)) as image:
+            image.draft("RGB", (size, size))    # JPEG: decode at a fraction of full size
+            image.thumbnail((size, size))
+            out = io.BytesIO()
+            image.convert("RGBA").save(out, "PNG")
+        data = out.getvalue()
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+        return data
+
+
+@lru_cache(maxsize=None)
+def _pillow():
+    # PIL.Image, or None without Pillow (no thumbnails then). Imported on the pool's
+    # first use rather than with this module, to keep it off the app's start.
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+# =========================
+# Tk image cache
+# =========================
+class ThumbnailCache:
+    """Decoded thumbnails for Tk, least recently used dropped first. Tk thread only.
+
+    get() answers from the cache or starts a load and answers later through
+    on_ready; several requests for one picture share the load. An image
+    dropped from the cache stays valid for widgets that keep a reference.
+    """
+
+    def __init__(self, store, dispatcher, size, capacity=IMAGE_CACHE_SIZE):
+        self.store = store
+        self.dispatcher = dispatcher
+        self.size = size
+        self.capacity = capacity
+        self._images = OrderedDict()    # name -> PhotoImage
+        self._waiting = {}              # name -> [on_ready, ...]
+
+    def get(self, name, on_ready):
+        """The thumbnail if cached, else None and on_ready(image) once loaded (not called if it can't be)."""
+        image = self._images.get(name)
+        if image is not None:
+            self._images.move_to_end(name)
+            return image
+        if name in self._waiting:
+            self._waiting[name].append(on_ready)
+            return None
+        self._waiting[name] = [on_ready]
+        self.dispatcher.watch(self.store.thumbnail(name, self.size),
+                              lambda data: self._loaded(name, data),
+                              lambda err: self._waiting.pop(name, None))
+        return None
+
+    def _loaded(self, name, data):
+        waiting = self._waiting.pop(name, [])
+        if data is None:
+            return
+        # a small PNG: the expensive decode of the original happened on the pool
+        image = tk.PhotoImage(master=self.dispatcher.widget, data=data, format="png")
+        self._images[name] = image
+        while len(self._images) > self.capacity:
+            self._images.popitem(last=False)
+        for on_ready in waiting:
+            on_ready(image)
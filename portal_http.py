@@ -0,0 +1,405 @@
+"""HTTP/JSON front end of portal_service: the job portal without the Tk UI.
+
+    python portal_http.py [--port 8080] [--workers 8] [--sqlite job_portal.db]
+
+    GET  /jobs?after=&limit=&salary_from=&salary_to=&sort=&facet=Company:Acme
+    GET  /jobs/search?q=&offset=&limit=&salary_from=&salary_to=&sort=&facet=
+    GET  /jobs/<id>
+    POST /jobs/<id>/apply   {"email", "cover_letter"}                 201, 409 if already applied
+    GET  /jobs/<id>/applicants?offset=&limit=                        best match first (needs NumPy)
+    POST /signup            {"username", "password", "name", "email"} 201, 409 if taken
+    POST /login             {"username", "password"}                  401 if the password is wrong
+    GET  /profile?email=
+    PUT  /profile           {"name", "email", "experience", "skills"}
+    GET  /stats             pool, application queue and (MySQL) round trips per action
+
+A job list answers {"jobs": [...], "next": ...}; pass "next" back as after=
+(or offset= for searches) for the following page, it is null on the last one.
+On SQLite a search result also has "title_highlight" and "snippet", with the
+matched terms in [brackets]; on MySQL it has its fulltext "score".
+
+The event loop only parses requests and writes responses. Every query runs on
+DBExecutor's worker threads with a pooled connection, so hundreds of clients
+can be connected (kept alive between requests) while at most --workers
+queries run at once; the rest wait in the executor's queue. Applications go
+through a GroupCommitQueue: a burst of them is written in a few statements and
+one commit. Passwords are hashed and checked in a process pool (credentials.py),
+so a login costs the event loop nothing but the wait.
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+from urllib.parse import parse_qs, urlsplit
+
+from db_pool import ConnectionPool, PoolTimeout
+from credentials import DEFAULT_WORKERS as DEFAULT_HASH_WORKERS, PasswordHasher
+from db_worker import DBExecutor, GroupCommitQueue
+from migrations import migrate
+from portal_service import DEFAULT_SORT, FACET_COLUMNS, JOB_SORTS, NO_FILTERS, Conflict, MySQLPortal, SQLitePortal
+from recommend import ApplicantRanker
+from salary import parse_amount
+
+DEFAULT_WORKERS = 8        # DB worker threads = pooled connections
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BODY = 64 * 1024       # bytes of a request body
+MAX_HEADERS = 100
+IDLE_TIMEOUT = 30.0        # seconds a kept-alive connection may wait for its next request
+
+# ?sort= values
+SORTS = {"newest": DEFAULT_SORT, "salary_desc": "Salary: high to low", "salary_asc": "Salary: low to high"}
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 414: "URI Too Long", 431: "Request Header Fields Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# =========================
+# Server
+# =========================
+class PortalServer:
+    def __init__(self, service, db, applications, passwords):
+        self.service = service
+        self.db = db
+        self.applications = applications
+        self.passwords = passwords
+        try:
+            self.ranker = ApplicantRanker(service)
+        except RuntimeError:    # no NumPy: applicant ranking answers 503
+            self.ranker = None
+        self.routes = [
+            ("GET", re.compile(r"/jobs"), self.list_jobs),
+            ("GET", re.compile(r"/jobs/search"), self.search_jobs),
+            ("GET", re.compile(r"/jobs/(\d+)"), self.get_job),
+            ("POST", re.compile(r"/jobs/(\d+)/apply"), self.apply),
+            ("GET", re.compile(r"/jobs/(\d+)/applicants"), self.applicants),
+            ("POST", re.compile(r"/signup"), self.signup),
+            ("POST", re.compile(r"/login"), self.login),
+            ("GET", re.compile(r"/profile"), self.get_profile),
+            ("PUT", re.compile(r"/profile"), self.save_profile),
+            ("GET", re.compile(r"/stats"), self.stats),
+        ]
+
+    async def call(self, fn, *args):
+        # fn(conn, *args) on a DB worker; the event loop keeps serving meanwhile
+        return await asyncio.wrap_future(self.db.submit(fn, *args))
+
+    # ---------- Connections ----------
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), IDLE_TIMEOUT)
+                except HTTPError as err:
+                    # the rest of a bad request can't be trusted to be framed right: answer and close
+                    writer.write(self._response(err.status, {"error": str(err)}, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = await self.dispatch(method, target, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await self._read_line(reader, 414, "request line")
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "malformed request line")
+        headers = {}
+        while True:
+            line = await self._read_line(reader, 431, "header")
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(400, "too many headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive":
+            headers["connection"] = "close"
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "bad Content-Length")
+        if length > MAX_BODY:
+            raise HTTPError(413, f"body over {MAX_BODY} bytes")
+        body = await reader.readexactly(length) if length > 0 else b""
+        return method, target, headers, body
+
+    async def _read_line(self, reader, status, what):
+        try:
+            return await reader.readline()
+        except ValueError:  # longer than the stream's limit (readline's form of LimitOverrunError)
+            raise HTTPError(status, f"{what} too long")
+
+    def _response(self, status, payload, keep_alive=True):
+        body = json.dumps(payload, default=str).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        return head.encode() + body
+
+    # ---------- Routing ----------
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            m = pattern.fullmatch(url.path.rstrip("/") or "/")
+            if not m:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            try:
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise HTTPError(400, "expected a JSON object")
+                return await handler(query, data, *m.groups())
+            except HTTPError as err:
+                return err.status, {"error": str(err)}
+            except json.JSONDecodeError:
+                return 400, {"error": "invalid JSON"}
+            except Conflict as err:
+                return 409, {"error": str(err)}
+            except PoolTimeout:
+                return 503, {"error": "database busy, try again"}
+            except Exception as err:
+                print(f"{method} {target} failed: {err!r}", file=sys.stderr)
+                return 500, {"error": "internal error"}
+        if allowed:
+            return 405, {"error": f"{method} not allowed here"}
+        return 404, {"error": "no such endpoint"}
+
+    # ---------- Jobs ----------
+    async def list_jobs(self, query, data):
+        limit = _int_param(query, "limit", PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        filters = _filters(query)
+        attrs, _ = JOB_SORTS[filters[2]]
+        after = _param(query, "after")
+        if filters == NO_FILTERS:
+            jobs = await self.call(self.service.job_page, _to_int(after, "after") if after else None, limit)
+        else:
+            # the keyset of a sorted list is (salary, id): "next" is both, comma-separated
+            key = tuple(_to_int(v, "after") for v in after.split(",")) if after else None
+            if key is not None and len(key) != len(attrs):
+                raise HTTPError(400, f"after needs {len(attrs)} values for this sort")
+            jobs = await self.call(self.service.filtered_page, filters, key, limit)
+        last = jobs[-1] if len(jobs) == limit else None
+        return 200, {"jobs": jobs, "next": ",".join(str(last[a]) for a in attrs) if last else None}
+
+    async def search_jobs(self, query, data):
+        q = (_param(query, "q") or "").strip()
+        if not q:
+            raise HTTPError(400, "q is required")
+        offset = _int_param(query, "offset", 0, 0, None)
+        limit = _int_param(query, "limit", PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        jobs = await self.call(self.service.search_page, q, _filters(query), offset, limit)
+        return 200, {"jobs": jobs, "next": offset + limit if len(jobs) == limit else None}
+
+    async def get_job(self, query, data, job_id):
+        job = await self.call(self.service.get_job, int(job_id))
+        if job is None:
+            raise HTTPError(404, "no such job")
+        return 200, job
+
+    async def apply(self, query, data, job_id):
+        email = _field(data, "email")
+        if await self.call(self.service.get_job, int(job_id)) is None:
+            raise HTTPError(404, "no such job")
+        applied = await asyncio.wrap_future(
+            self.applications.submit(int(job_id), email, data.get("cover_letter") or ""))
+        if not applied:
+            raise HTTPError(409, "already applied for this job")
+        if self.ranker is not None:
+            self.ranker.invalidate([int(job_id)])
+        return 201, {"applied": True}
+
+    async def applicants(self, query, data, job_id):
+        # the whole ranking is cached per job; pages are slices of it
+        if self.ranker is None:
+            raise HTTPError(503, "applicant ranking needs NumPy on the server")
+        offset = _int_param(query, "offset", 0, 0, None)
+        limit = _int_param(query, "limit", PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        ranked = await self.call(self.ranker.ranked, int(job_id))
+        if ranked is None:
+            raise HTTPError(404, "no such job")
+        return 200, {"count": len(ranked), "applicants": ranked[offset:offset + limit],
+                     "next": offset + limit if offset + limit < len(ranked) else None}
+
+    # ---------- Users ----------
+    async def signup(self, query, data):
+        username, password, email = _field(data, "username"), _field(data, "password"), _field(data, "email")
+        password_hash = await asyncio.wrap_future(self.passwords.hash(password))
+        user_id = await self.call(self.service.signup, username, password_hash, data.get("name") or "", email)
+        return 201, {"id": user_id}
+
+    async def login(self, query, data):
+        username, password = _field(data, "username"), _field(data, "password")
+        user = await self.call(self.service.find_user, username)
+        if user is None:
+            raise HTTPError(404, "user not found")
+        ok, new_hash = await asyncio.wrap_future(self.passwords.verify(password, user["password_hash"]))
+        if not ok:
+            raise HTTPError(401, "incorrect password")
+        if new_hash:
+            # stored at an older cost (or in the clear): replace it while we know the password
+            await self.call(self.service.set_password_hash, user["id"], new_hash)
+        return 200, {"id": user["id"], "username": user["username"]}
+
+    async def get_profile(self, query, data):
+        email = _param(query, "email")
+        if not email:
+            raise HTTPError(400, "email is required")
+        profile = await self.call(self.service.get_profile, email)
+        if profile is None:
+            raise HTTPError(404, "no profile for this email")
+        return 200, profile
+
+    async def save_profile(self, query, data):
+        await self.call(self.service.save_profile, data.get("name") or "", _field(data, "email"),
+                        data.get("experience") or "", data.get("skills") or "")
+        return 200, {"saved": True}
+
+    # ---------- Metrics ----------
+    async def stats(self, query, data):
+        stats = {"pool": self.db.pool.stats(), "applications": self.applications.stats()}
+        if self.service.round_trips is not None:
+            stats["round_trips"] = self.service.round_trips.stats()
+        return 200, stats
+
+
+# =========================
+# Request parsing
+# =========================
+def _param(query, name):
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _to_int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be a whole number")
+
+
+def _int_param(query, name, default, minimum, maximum):
+    value = _param(query, name)
+    value = default if value is None else _to_int(value, name)
+    if value < minimum or (maximum is not None and value > maximum):
+        raise HTTPError(400, f"{name} must be between {minimum} and {maximum}" if maximum is not None
+                        else f"{name} must be at least {minimum}")
+    return value
+
+
+def _field(data, name):
+    value = data.get(name)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(400, f"{name} is required")
+    return value.strip()
+
+
+def _filters(query):
+    # the service's (salary from, salary to, sort, chosen facets); amounts read like listed salaries
+    sort = _param(query, "sort") or "newest"
+    if sort not in SORTS:
+        raise HTTPError(400, f"sort must be one of {', '.join(SORTS)}")
+    chosen = set()
+    for facet in query.get("facet", []):
+        name, sep, value = facet.partition(":")
+        if not sep or name not in FACET_COLUMNS:
+            raise HTTPError(400, f"facet must be <{'|'.join(FACET_COLUMNS)}>:<value>")
+        chosen.add((name, value))
+    return (parse_amount(_param(query, "salary_from")), parse_amount(_param(query, "salary_to")),
+            SORTS[sort], frozenset(chosen))
+
+
+# =========================
+# Entry point
+# =========================
+def open_backend(args):
+    """(service, pool) for the command line's database; the pool has a connection for the application writer too."""
+    if args.sqlite:
+        conn = SQLitePortal.connect(args.sqlite)
+        try:
+            service = SQLitePortal.prepare(conn)
+        finally:
+            conn.close()
+        pool = ConnectionPool(lambda: SQLitePortal.connect(args.sqlite), size=args.workers + 1)
+        return service, pool
+    import mysql.connector  # only needed for MySQL
+    from config import DB_HOST, DB_NAME, DB_PASSWORD, DB_USER
+
+    def connect():
+        return mysql.connector.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME)
+
+    def ping(conn):
+        conn.ping(reconnect=True, attempts=2, delay=0)
+
+    conn = connect()
+    try:
+        migrate(conn, "mysql")
+    finally:
+        conn.close()
+    return MySQLPortal(), ConnectionPool(connect, size=args.workers + 1, ping=ping)
+
+
+async def serve(server, host, port):
+    listener = await asyncio.start_server(server.handle_client, host, port, backlog=1024)
+    print(f"job portal API on http://{host}:{port}", file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the job portal over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"DB worker threads and pooled connections (default {DEFAULT_WORKERS})")
+    parser.add_argument("--hash-workers", type=int, default=DEFAULT_HASH_WORKERS,
+                        help=f"processes hashing passwords (default {DEFAULT_HASH_WORKERS})")
+    parser.add_argument("--sqlite", metavar="DB", help="serve the sqlite app's database instead of MySQL")
+    args = parser.parse_args(argv)
+
+    service, pool = open_backend(args)
+    db = DBExecutor(pool, workers=args.workers, name="http-db")
+    applications = GroupCommitQueue(pool, service.apply_batch)
+    passwords = PasswordHasher(args.hash_workers)
+    try:
+        asyncio.run(serve(PortalServer(service, db, applications, passwords), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        applications.shutdown(wait=True)
+        passwords.shutdown()
+        db.shutdown()
+        pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
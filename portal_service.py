@@ -0,0 +1,785 @@
+"""Job portal operations, independent of any UI.
+
+MySQLPortal works on the schema of "job portal advance.py", SQLitePortal on the
+sqlite app's database. Both have the same methods; every method takes an open
+connection first, so callers decide where it runs (a DB worker thread for the
+Tk app, an executor for the HTTP server). Jobs come back as plain dicts with
+the keys of JOB_FIELDS.
+"""
+import functools
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from migrations import migrate, table_exists
+from salary import SALARY_BANDS, parse_salary
+from search_index import boolean_query
+
+JOB_FIELDS = ("id", "title", "description", "salary", "company", "salary_min", "salary_max", "industry", "location")
+
+# job list orders: label -> (sort key as job fields, direction).
+# The salary orders page on (salary, id) so each page is a seek on a salary index.
+DEFAULT_SORT = "Best match / newest"
+JOB_SORTS = {
+    DEFAULT_SORT: (("id",), "DESC"),
+    "Salary: high to low": (("salary_max", "id"), "DESC"),
+    "Salary: low to high": (("salary_min", "id"), "ASC"),
+}
+NO_FILTERS = (None, None, DEFAULT_SORT, frozenset())   # (salary from, salary to, sort, chosen (facet, value)s)
+
+
+class Conflict(Exception):
+    """The operation clashes with existing data, e.g. a username already taken."""
+
+
+def facet_dict(chosen):
+    # {(facet, value), ...} -> {facet: {value, ...}}
+    selected = {}
+    for name, value in chosen:
+        selected.setdefault(name, set()).add(value)
+    return selected
+
+
+def _salary_band_where(values, column, mark):
+    # salary bands are ranges of the top of the salary range
+    bands, params = [], []
+    for low, high, label in SALARY_BANDS:
+        if label not in values:
+            continue
+        if high is None:
+            bands.append(f"{column} >= {mark}")
+            params.append(low)
+        else:
+            bands.append(f"{column} >= {mark} AND {column} < {mark}")
+            params.extend([low, high])
+    return "(" + " OR ".join(f"({b})" for b in bands) + ")", params
+
+
+def _keyset_where(columns, op, after):
+    # rows after `after` in (columns) order, spelled out as a < x OR (a = x AND b < y): MySQL
+    # doesn't turn the row constructor (a, b) < (x, y) into a range scan on an (a, b) index
+    clauses, params = [], []
+    for i, column in enumerate(columns):
+        clauses.append(" AND ".join([f"{c} = %s" for c in columns[:i]] + [f"{column} {op} %s"]))
+        params.extend(after[:i + 1])
+    if len(clauses) == 1:
+        return clauses[0], params
+    return "(" + " OR ".join(f"({c})" for c in clauses) + ")", params
+
+
+# =========================
+# MySQL
+# =========================
+MYSQL_JOB_COLUMNS = (
+    "j.ID AS id, j.Title AS title, j.Description AS description, j.Salary AS salary, "
+    "j.SalaryMin AS salary_min, j.SalaryMax AS salary_max, e.COMPANY AS company, "
+    "e.INDUSTRY AS industry, e.LOCATION AS location"
+)
+MYSQL_JOB_FROM = "FROM joblisting j LEFT JOIN employer e ON j.CompanyID = e.ID "
+MYSQL_JOB_SELECT = f"SELECT {MYSQL_JOB_COLUMNS} {MYSQL_JOB_FROM}"
+MYSQL_SORT_COLUMNS = {"id": "j.ID", "salary_min": "j.SalaryMin", "salary_max": "j.SalaryMax"}
+
+# facet -> SQL expression of its value (the salary band is a range on SalaryMax)
+FACET_COLUMNS = {
+    "Company": "COALESCE(e.COMPANY, 'Unknown')",
+    "Industry": "e.INDUSTRY",
+    "Location": "e.LOCATION",
+    "Salary": None,
+}
+
+
+STATEMENT_CACHE_SIZE = 64     # prepared statements kept per connection, least recently used closed
+
+
+class RoundTrips:
+    """Requests sent to the server (prepare, statement reset, execute, commit) per action.
+
+    An action is one call of a public portal method, i.e. one user action; the
+    methods it calls in turn count toward it.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._actions = {}      # name -> [calls, round trips, most in one call]
+        self.last = None        # (action, round trips) of the latest call
+
+    @contextmanager
+    def action(self, name):
+        if getattr(self._local, "name", None) is not None:
+            yield               # nested: counted by the outer action
+            return
+        self._local.name, self._local.trips = name, 0
+        try:
+            yield
+        finally:
+            trips = self._local.trips
+            self._local.name = None
+            with self._lock:
+                entry = self._actions.setdefault(name, [0, 0, 0])
+                entry[0] += 1
+                entry[1] += trips
+                entry[2] = max(entry[2], trips)
+                self.last = (name, trips)
+
+    def add(self, n=1):
+        if getattr(self._local, "name", None) is not None:
+            self._local.trips += n
+
+    def stats(self):
+        with self._lock:
+            return {name: {"calls": calls, "avg": trips / calls, "max": most}
+                    for name, (calls, trips, most) in self._actions.items()}
+
+
+def _action(method):
+    # counts the round trips of every call of a public portal method
+    @functools.wraps(method)
+    def counted(self, conn, *args, **kwargs):
+        with self.round_trips.action(method.__name__):
+            return method(self, conn, *args, **kwargs)
+    return counted
+
+
+class _Statements:
+    """Server-side prepared statements of one connection, a prepared cursor each.
+
+    mysql.connector only reuses a cursor's statement when it is executed with the
+    very same string object, so the cached SQL string is handed back with it.
+    """
+
+    def __init__(self, conn, size):
+        self.conn = conn
+        self.connection_id = conn.connection_id
+        self.size = size
+        self._cursors = OrderedDict()   # sql -> (cursor, sql)
+
+    def get(self, sql):
+        """(cursor, sql, newly prepared)"""
+        entry = self._cursors.get(sql)
+        if entry is not None:
+            self._cursors.move_to_end(sql)
+            return (*entry, False)
+        entry = self._cursors[sql] = (self.conn.cursor(prepared=True), sql)
+        if len(self._cursors) > self.size:
+            _, (oldest, _) = self._cursors.popitem(last=False)
+            oldest.close()      # deallocates its statement on the server
+        return (*entry, True)
+
+
+class MySQLPortal:
+    """The portal on MySQL, through server-side prepared statements.
+
+    A statement whose shape doesn't depend on the length of a list is prepared
+    once per connection and from then on only executed. mysql.connector resets
+    a prepared statement on the server before each execute and waits for the
+    reply, so a prepared read costs two round trips (reset, execute). Writes are
+    single statements (upserts, not a SELECT first), so a write costs three
+    (reset, execute, commit). round_trips keeps the count.
+    """
+
+    def __init__(self, statement_cache_size=STATEMENT_CACHE_SIZE):
+        self.round_trips = RoundTrips()
+        self.statement_cache_size = statement_cache_size
+        self._statements = weakref.WeakKeyDictionary()     # connection -> _Statements
+        self._lock = threading.Lock()
+
+    # ---------- Statements ----------
+    @contextmanager
+    def _cursor(self, conn, sql, prepared):
+        # (cursor, sql to execute): a cached prepared cursor, or a text-protocol one closed afterwards
+        if not prepared:
+            cursor = conn.cursor()
+            self.round_trips.add()
+            try:
+                yield cursor, sql
+            finally:
+                cursor.close()
+            return
+        with self._lock:
+            statements = self._statements.get(conn)
+            if statements is None or statements.connection_id != conn.connection_id:
+                # new connection, or reconnected in place by the pool's ping: the old handles are gone
+                statements = self._statements[conn] = _Statements(conn, self.statement_cache_size)
+        cursor, sql, new = statements.get(sql)
+        # every execute sends COM_STMT_RESET first; the first one also COM_STMT_PREPARE
+        self.round_trips.add(3 if new else 2)
+        yield cursor, sql
+
+    def _query(self, conn, sql, params=(), prepared=True):
+        with self._cursor(conn, sql, prepared) as (cursor, sql):
+            cursor.execute(sql, params)
+            names = cursor.column_names
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def _execute(self, conn, sql, params=(), prepared=True):
+        with self._cursor(conn, sql, prepared) as (cursor, sql):
+            cursor.execute(sql, params)
+            return cursor.lastrowid
+
+    def _commit(self, conn):
+        self.round_trips.add()
+        conn.commit()
+
+    # ---------- Jobs ----------
+    @_action
+    def job_page(self, conn, after_id, limit):
+        # keyset pagination: seeks on the primary key instead of skipping OFFSET rows
+        where = "WHERE j.ID < %s " if after_id is not None else ""
+        params = (after_id, limit) if after_id is not None else (limit,)
+        return self._query(conn, f"{MYSQL_JOB_SELECT}{where}ORDER BY j.ID DESC LIMIT %s", params)
+
+    @_action
+    def filtered_page(self, conn, filters, after, limit):
+        # the job list with a salary range, facets and/or order: keyset-paged on the
+        # sort columns, so each page is an index range scan rather than a filesort
+        attrs, direction = JOB_SORTS[filters[2]]
+        columns = [MYSQL_SORT_COLUMNS[a] for a in attrs]
+        where, params = self._filter_where(filters)
+        if after is not None:
+            clause, after_params = _keyset_where(columns, "<" if direction == "DESC" else ">", after)
+            where.append(clause)
+            params.extend(after_params)
+        sql = (
+            f"{MYSQL_JOB_SELECT}{'WHERE ' + ' AND '.join(where) + ' ' if where else ''}"
+            f"ORDER BY {', '.join(f'{c} {direction}' for c in columns)} LIMIT %s"
+        )
+        return self._query(conn, sql, params + [limit])
+
+    @_action
+    def search_page(self, conn, query, filters=NO_FILTERS, offset=0, limit=50):
+        # ranking and paging happen in MySQL; only the requested page is transferred
+        sort = filters[2]
+        where, params = self._filter_where(filters)
+        terms = boolean_query(query)
+        if terms:
+            score = "MATCH(j.Title, j.Description) AGAINST (%s IN BOOLEAN MODE)"
+            where.insert(0, score)
+            params = [terms, terms] + params
+            order = "score DESC, j.ID DESC"
+        else:
+            # only terms too short for the fulltext index; fall back to a title prefix match
+            score = "NULL"
+            where.insert(0, "j.Title LIKE %s")
+            params.insert(0, query.replace("%", r"\%").replace("_", r"\_") + "%")
+            order = "j.ID DESC"
+        if sort != DEFAULT_SORT:
+            attrs, direction = JOB_SORTS[sort]
+            order = ", ".join(f"{MYSQL_SORT_COLUMNS[a]} {direction}" for a in attrs)
+        sql = (
+            f"SELECT {MYSQL_JOB_COLUMNS}, {score} AS score {MYSQL_JOB_FROM}"
+            f"WHERE {' AND '.join(where)} ORDER BY {order} LIMIT %s OFFSET %s"
+        )
+        return self._query(conn, sql, params + [limit, offset])
+
+    @_action
+    def jobs_by_id(self, conn, ids, offset=0, limit=None):
+        # one page of a precomputed ID list (newest first), e.g. a facet selection;
+        # prepared only for a full page, other list lengths would each be a new statement
+        chunk = ids[offset:offset + limit] if limit is not None else ids[offset:]
+        if not chunk:
+            return []
+        return self._query(conn, f"{MYSQL_JOB_SELECT}WHERE j.ID IN ({', '.join(['%s'] * len(chunk))}) ORDER BY j.ID DESC",
+                           list(chunk), prepared=limit is not None and len(chunk) == limit)
+
+    @_action
+    def get_job(self, conn, job_id):
+        jobs = self._query(conn, f"{MYSQL_JOB_SELECT}WHERE j.ID = %s", (job_id,))
+        return jobs[0] if jobs else None
+
+    @_action
+    def employers(self, conn):
+        return self._query(conn, "SELECT ID AS id, COMPANY AS company FROM employer ORDER BY COMPANY")
+
+    @_action
+    def add_employer(self, conn, company, industry, location, website, contact_person, phone):
+        employer_id = self._execute(
+            conn,
+            "INSERT INTO employer (COMPANY, INDUSTRY, LOCATION, Website, ContactPerson, PhoneNo) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            (company, industry, location, website, contact_person, phone),
+        )
+        self._commit(conn)
+        return employer_id
+
+    @_action
+    def add_job(self, conn, title, description, salary, company_id):
+        job_id = self._execute(
+            conn,
+            "INSERT INTO joblisting (Title, Description, Salary, SalaryMin, SalaryMax, CompanyID) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            (title, description, salary, *parse_salary(salary), company_id),
+        )
+        self._commit(conn)
+        return job_id
+
+    def _filter_where(self, filters):
+        # a job matches when its salary range overlaps the requested one and it has
+        # one of the chosen values of every chosen facet; sorting by salary lists
+        # only jobs that state one
+        salary_from, salary_to, sort, chosen = filters
+        where, params = [], []
+        for name, values in facet_dict(chosen).items():
+            column = FACET_COLUMNS[name]
+            if column is None:
+                clause, band_params = _salary_band_where(values, "j.SalaryMax", "%s")
+                where.append(clause)
+                params.extend(band_params)
+            else:
+                where.append(f"{column} IN ({', '.join(['%s'] * len(values))})")
+                params.extend(values)
+        if salary_from is not None:
+            where.append("j.SalaryMax >= %s")
+            params.append(salary_from)
+        if salary_to is not None:
+            where.append("j.SalaryMin <= %s")
+            params.append(salary_to)
+        if sort != DEFAULT_SORT:
+            where.append(f"{MYSQL_SORT_COLUMNS[JOB_SORTS[sort][0][0]]} IS NOT NULL")
+        return where, params
+
+    # ---------- Users ----------
+    @_action
+    def find_user(self, conn, username):
+        # the hash is for credentials.verify_password only; don't hand it out
+        rows = self._query(
+            conn,
+            "SELECT ID AS id, Username AS username, PasswordHash AS password_hash FROM jobseeker WHERE Username = %s",
+            (username,),
+        )
+        return rows[0] if rows else None
+
+    @_action
+    def signup(self, conn, username, password_hash, name, email):
+        try:
+            user_id = self._execute(
+                conn,
+                "INSERT INTO jobseeker (Username, PasswordHash, Name, Email) VALUES (%s, %s, %s, %s)",
+                (username, password_hash, name, email),
+            )
+        except _mysql().IntegrityError as err:
+            raise Conflict("Username or email is already registered") from err
+        self._commit(conn)
+        return user_id
+
+    @_action
+    def set_password_hash(self, conn, user_id, password_hash):
+        # rehashed at the current cost on login
+        self._execute(conn, "UPDATE jobseeker SET PasswordHash = %s WHERE ID = %s", (password_hash, user_id))
+        self._commit(conn)
+
+    @_action
+    def get_profile(self, conn, email):
+        rows = self._query(
+            conn,
+            "SELECT Name AS name, Email AS email, Experience AS experience, Skills AS skills, "
+            "PicturePath AS picture_path FROM jobseeker WHERE Email = %s",
+            (email,),
+        )
+        return rows[0] if rows else None
+
+    @_action
+    def save_profile(self, conn, name, email, experience, skills):
+        # upsert by email (Email is UNIQUE): one statement whether or not the jobseeker exists
+        self._execute(
+            conn,
+            "INSERT INTO jobseeker (Name, Email, Experience, Skills) VALUES (%s, %s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE Name = VALUES(Name), Experience = VALUES(Experience), Skills = VALUES(Skills)",
+            (name, email, experience, skills),
+        )
+        self._commit(conn)
+
+    @_action
+    def set_picture(self, conn, email, picture_path):
+        # the name of a pictures.PictureStore original; creates the jobseeker like save_profile
+        self._execute(
+            conn,
+            "INSERT INTO jobseeker (Email, PicturePath) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE PicturePath = VALUES(PicturePath)",
+            (email, picture_path),
+        )
+        self._commit(conn)
+
+    # ---------- Applications ----------
+    @_action
+    def apply(self, conn, job_id, email, cover_letter):
+        # returns False if this jobseeker already applied for the job
+        applied, = self.apply_batch(conn, [(job_id, email, cover_letter)])
+        if isinstance(applied, Exception):
+            raise applied
+        return applied
+
+    @_action
+    def apply_batch(self, conn, applications):
+        """[(job id, email, cover letter), ...] -> True, or False for a repeat application, each.
+
+        Any number of applications take the same four round trips: an upsert of
+        the jobseekers, one lookup of their IDs and earlier applications, one
+        multi-row insert and the commit. A job that no longer exists gets its
+        IntegrityError in place of a result. These statements change with the
+        batch size, so they are not prepared.
+        """
+        emails = sorted({email for _, email, _ in applications})
+        job_ids = sorted({job_id for job_id, _, _ in applications})
+        self._execute(
+            conn,
+            f"INSERT INTO jobseeker (Email) VALUES {', '.join(['(%s)'] * len(emails))} ON DUPLICATE KEY UPDATE ID = ID",
+            emails, prepared=False,
+        )
+        rows = self._query(
+            conn,
+            "SELECT s.ID AS seeker, s.Email AS email, a.JobID AS job FROM jobseeker s "
+            f"LEFT JOIN job_application a ON a.JobSeekerID = s.ID AND a.JobID IN ({', '.join(['%s'] * len(job_ids))}) "
+            f"WHERE s.Email IN ({', '.join(['%s'] * len(emails))})",
+            job_ids + emails, prepared=False,
+        )
+        seekers = {r["email"].lower(): r["seeker"] for r in rows}     # Email compares case-insensitively
+        taken = {(r["job"], r["seeker"]) for r in rows if r["job"] is not None}
+        results, new = [], []
+        now = datetime.now()
+        for job_id, email, cover_letter in applications:
+            pair = (job_id, seekers[email.lower()])
+            results.append(pair not in taken)
+            if pair not in taken:
+                taken.add(pair)
+                new.append((len(results) - 1, (*pair, now, 'Pending', cover_letter or None)))
+        insert = "INSERT INTO job_application (JobID, JobSeekerID, ApplicationDate, Status, CoverLetter) VALUES "
+        try:
+            if new:
+                self._execute(conn, insert + ", ".join(["(%s, %s, %s, %s, %s)"] * len(new)),
+                              [v for _, row in new for v in row], prepared=False)
+        except _mysql().IntegrityError:
+            # only that statement was undone: a duplicate from another writer since the
+            # check, or a deleted job. Row by row, so each application gets its own answer.
+            for i, row in new:
+                try:
+                    self._execute(conn, insert + "(%s, %s, %s, %s, %s)", row)
+                except _mysql().IntegrityError as err:
+                    results[i] = False if err.errno == 1062 else err  # 1062: duplicate (JobID, JobSeekerID)
+        self._commit(conn)
+        return results
+
+    @_action
+    def applicants(self, conn, job_id):
+        # what ranking and review need of each applicant, in order of application
+        return self._query(
+            conn,
+            "SELECT a.ID AS application_id, s.ID AS seeker_id, s.Name AS name, s.Email AS email, "
+            "s.Experience AS experience, s.Skills AS skills, s.PicturePath AS picture_path, a.CoverLetter AS cover_letter, "
+            "a.Status AS status, a.ApplicationDate AS applied "
+            "FROM job_application a JOIN jobseeker s ON s.ID = a.JobSeekerID WHERE a.JobID = %s ORDER BY a.ID",
+            (job_id,),
+        )
+
+    @_action
+    def application_stamp(self, conn, job_id):
+        # changes whenever the job gains or loses an application; read off the (JobID, ID) index
+        row, = self._query(conn, "SELECT COUNT(*) AS n, MAX(ID) AS last FROM job_application WHERE JobID = %s",
+                           (job_id,))
+        return row["n"], row["last"]
+
+
+def _mysql():
+    # not imported with this module: it is slow to load, and SQLite-only installs don't have it.
+    # Errors only need telling apart on a MySQL connection, which has loaded it already.
+    import mysql.connector
+    return mysql.connector
+
+
+# =========================
+# SQLite
+# =========================
+# Full-text index over jobs, kept in sync by triggers (external content table)
+FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, description, company,
+        content='jobs', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, description, company)
+        VALUES (new.id, new.title, new.description, new.company);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, company)
+        VALUES ('delete', old.id, old.title, old.description, old.company);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, description, company ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, company)
+        VALUES ('delete', old.id, old.title, old.description, old.company);
+        INSERT INTO jobs_fts(rowid, title, description, company)
+        VALUES (new.id, new.title, new.description, new.company);
+    END
+    """,
+    # read-only view of the FTS index's terms, used for spelling correction
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts_vocab USING fts5vocab(jobs_fts, 'row')
+    """,
+]
+
+SQLITE_JOB_COLUMNS = (
+    "j.id, j.title, j.description, j.salary, j.company, j.salary_min, j.salary_max, "
+    "NULL AS industry, NULL AS location"
+)
+SQLITE_JOB_SELECT = f"SELECT {SQLITE_JOB_COLUMNS} FROM jobs j "
+# search results also carry the title with its matched terms [marked] and the best-matching part of the description
+SQLITE_HIGHLIGHTS = "highlight(jobs_fts, 0, '[', ']') AS title_highlight, snippet(jobs_fts, 1, '[', ']', '...', 16) AS snippet"
+
+
+def ensure_fts(conn, rebuild=False):
+    """Create the FTS table and triggers. Returns False if FTS5 is unavailable."""
+    cursor = conn.cursor()
+    if not table_exists(cursor, 'jobs'):
+        return False
+    created = not table_exists(cursor, 'jobs_fts')
+    try:
+        for stmt in FTS_SCHEMA:
+            cursor.execute(stmt)
+    except sqlite3.OperationalError:
+        # sqlite built without FTS5
+        return False
+    if created or rebuild:
+        cursor.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+    conn.commit()
+    return True
+
+
+def salary_where(salary_from, salary_to, sort, prefix=''):
+    # jobs whose salary range overlaps the requested one; salary orders skip jobs without one
+    where, params = [], []
+    if salary_from is not None:
+        where.append(f"{prefix}salary_max >= ?")
+        params.append(salary_from)
+    if salary_to is not None:
+        where.append(f"{prefix}salary_min <= ?")
+        params.append(salary_to)
+    if sort != DEFAULT_SORT:
+        where.append(f"{prefix}{JOB_SORTS[sort][0][0]} IS NOT NULL")
+    return where, params
+
+
+def fts_query(text):
+    # quote every term so user input can't trip FTS syntax; the last one matches as a prefix
+    terms = ['"%s"' % t.replace('"', '""') for t in text.split()]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+class SQLitePortal:
+    """The same operations on the sqlite app's tables (jobs, users, profiles, applications).
+
+    Jobs there have no employer table, so industry and location are always None and
+    only the Company and Salary facets filter anything. sqlite runs in-process, so
+    there are no round trips to count, and sqlite3 already keeps every statement
+    compiled in its per-connection statement cache.
+    """
+
+    round_trips = None
+
+    def __init__(self, fts_enabled=True):
+        self.fts_enabled = fts_enabled
+
+    @staticmethod
+    def connect(path):
+        # for a pool shared by worker threads: each connection is used by one thread at a time
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")     # readers don't wait for the writer
+        return conn
+
+    @classmethod
+    def prepare(cls, conn):
+        """Bring a database up to date (migrating it first); returns a portal for it."""
+        migrate(conn, "sqlite")
+        return cls(fts_enabled=ensure_fts(conn))
+
+    # ---------- Jobs ----------
+    def job_page(self, conn, after_id, limit):
+        where = "WHERE j.id < ? " if after_id is not None else ""
+        params = (after_id, limit) if after_id is not None else (limit,)
+        return self._jobs(conn, f"{SQLITE_JOB_SELECT}{where}ORDER BY j.id DESC LIMIT ?", params)
+
+    def filtered_page(self, conn, filters, after, limit):
+        columns, direction = JOB_SORTS[filters[2]]
+        where, params = self._filter_where(filters)
+        if after is not None:
+            op = '<' if direction == 'DESC' else '>'
+            where.append(f"({', '.join('j.' + c for c in columns)}) {op} ({', '.join('?' * len(columns))})")
+            params.extend(after)
+        sql = (
+            f"{SQLITE_JOB_SELECT}{'WHERE ' + ' AND '.join(where) + ' ' if where else ''}"
+            f"ORDER BY {', '.join(f'j.{c} {direction}' for c in columns)} LIMIT ?"
+        )
+        return self._jobs(conn, sql, params + [limit])
+
+    def search_page(self, conn, query, filters=NO_FILTERS, offset=0, limit=50):
+        columns, direction = JOB_SORTS[filters[2]]
+        where, params = self._filter_where(filters)
+        order = ', '.join(f'j.{c} {direction}' for c in columns)
+        if self.fts_enabled:
+            if filters[2] == DEFAULT_SORT:
+                order = 'bm25(jobs_fts, 10.0, 1.0, 5.0)'
+            sql = (
+                f"SELECT {SQLITE_JOB_COLUMNS}, {SQLITE_HIGHLIGHTS} FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid "
+                f"WHERE {' AND '.join(['jobs_fts MATCH ?'] + where)} ORDER BY {order} LIMIT ? OFFSET ?"
+            )
+            params = [fts_query(query)] + params
+        else:
+            sql = (
+                f"SELECT {SQLITE_JOB_COLUMNS}, j.title AS title_highlight, NULL AS snippet FROM jobs j "
+                f"WHERE {' AND '.join(['j.title LIKE ?'] + where)} ORDER BY {order} LIMIT ? OFFSET ?"
+            )
+            params = ['%' + query + '%'] + params
+        return self._jobs(conn, sql, params + [limit, offset])
+
+    def jobs_by_id(self, conn, ids, offset=0, limit=None):
+        chunk = ids[offset:offset + limit] if limit is not None else ids[offset:]
+        if not chunk:
+            return []
+        return self._jobs(conn, f"{SQLITE_JOB_SELECT}WHERE j.id IN ({', '.join('?' * len(chunk))}) ORDER BY j.id DESC",
+                          list(chunk))
+
+    def get_job(self, conn, job_id):
+        jobs = self._jobs(conn, f"{SQLITE_JOB_SELECT}WHERE j.id = ?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def _jobs(self, conn, sql, params):
+        return _dicts(conn.execute(sql, params))
+
+    def _filter_where(self, filters):
+        salary_from, salary_to, sort, chosen = filters
+        where, params = salary_where(salary_from, salary_to, sort, prefix='j.')
+        for name, values in facet_dict(chosen).items():
+            if name == "Company":
+                where.append(f"COALESCE(j.company, 'Unknown') IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+            elif name == "Salary":
+                clause, band_params = _salary_band_where(values, "j.salary_max", "?")
+                where.append(clause)
+                params.extend(band_params)
+        return where, params
+
+    # ---------- Users ----------
+    def find_user(self, conn, username):
+        rows = _dicts(conn.execute(
+            "SELECT id, username, password AS password_hash FROM users WHERE username = ?", (username,)
+        ))
+        return rows[0] if rows else None
+
+    def signup(self, conn, username, password_hash, name, email):
+        # users has no unique constraints; BEGIN IMMEDIATE makes check-and-insert atomic
+        with _write(conn):
+            taken = conn.execute(
+                "SELECT 1 FROM users WHERE username = ? OR email = ?", (username, email)
+            ).fetchone()
+            if taken:
+                raise Conflict("Username or email is already registered")
+            cursor = conn.execute(
+                "INSERT INTO users (email, username, password, remember_me) VALUES (?, ?, ?, 0)",
+                (email, username, password_hash),
+            )
+            if name:
+                conn.execute("INSERT INTO profiles (name, email) VALUES (?, ?)", (name, email))
+        return cursor.lastrowid
+
+    def set_password_hash(self, conn, user_id, password_hash):
+        with _write(conn):
+            conn.execute("UPDATE users SET password = ? WHERE id = ?", (password_hash, user_id))
+
+    def get_profile(self, conn, email):
+        rows = _dicts(conn.execute(
+            "SELECT name, email, experience, skills, picture_path FROM profiles WHERE email = ? ORDER BY id DESC LIMIT 1",
+            (email,),
+        ))
+        return rows[0] if rows else None
+
+    def save_profile(self, conn, name, email, experience, skills):
+        with _write(conn):
+            updated = conn.execute(
+                "UPDATE profiles SET name = ?, experience = ?, skills = ? WHERE email = ?",
+                (name, experience, skills, email),
+            ).rowcount
+            if not updated:
+                conn.execute(
+                    "INSERT INTO profiles (name, email, experience, skills) VALUES (?, ?, ?, ?)",
+                    (name, email, experience, skills),
+                )
+
+    def set_picture(self, conn, email, picture_path):
+        with _write(conn):
+            updated = conn.execute("UPDATE profiles SET picture_path = ? WHERE email = ?",
+                                   (picture_path, email)).rowcount
+            if not updated:
+                conn.execute("INSERT INTO profiles (email, picture_path) VALUES (?, ?)", (email, picture_path))
+
+    # ---------- Applications ----------
+    def apply(self, conn, job_id, email, cover_letter):
+        # applications keep no cover letter here; returns False on a repeat application
+        return self.apply_batch(conn, [(job_id, email, cover_letter)])[0]
+
+    def apply_batch(self, conn, applications):
+        # [(job id, email, cover letter), ...] -> True, or False for a repeat, each
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")     # no other writer between the check and the insert
+        emails = sorted({email for _, email, _ in applications})
+        marks = ", ".join("?" * len(emails))
+        taken = set(conn.execute(f"SELECT job_id, applicant_email FROM applications WHERE applicant_email IN ({marks})",
+                                 emails))
+        names = dict(conn.execute(f"SELECT email, name FROM profiles WHERE email IN ({marks}) ORDER BY id", emails))
+        results, rows = [], []
+        for job_id, email, _ in applications:
+            results.append((job_id, email) not in taken)
+            if results[-1]:
+                taken.add((job_id, email))
+                rows.append((job_id, names.get(email), email))
+        conn.executemany("INSERT INTO applications (job_id, applicant_name, applicant_email) VALUES (?, ?, ?)", rows)
+        conn.commit()
+        return results
+
+    def applicants(self, conn, job_id):
+        # the latest profile of each applicant's email; applications keep no cover letter or status here
+        return _dicts(conn.execute(
+            "SELECT a.id AS application_id, p.id AS seeker_id, COALESCE(p.name, a.applicant_name) AS name, "
+            "a.applicant_email AS email, p.experience, p.skills, p.picture_path, NULL AS cover_letter, NULL AS status, "
+            "a.created_at AS applied "
+            "FROM applications a LEFT JOIN profiles p "
+            "ON p.id = (SELECT MAX(id) FROM profiles WHERE email = a.applicant_email) "
+            "WHERE a.job_id = ? ORDER BY a.id",
+            (job_id,),
+        ))
+
+    def application_stamp(self, conn, job_id):
+        return tuple(conn.execute("SELECT COUNT(*), MAX(id) FROM applications WHERE job_id = ?", (job_id,)).fetchone())
+
+
+def _dicts(cursor):
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+class _write:
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error) on a sqlite connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        if self.conn.in_transaction:
+            self.conn.commit()
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
@@ -0,0 +1,440 @@
+"""Job recommendations for jobseekers, and applicant ranking for employers.
+
+A jobseeker's skills are scored against every job description (JobRecommender);
+a job's applicants are ranked by how well their skills, experience and cover
+letter match its description (ApplicantRanker). Both use hashed TF-IDF vectors.
+
+    python recommend.py [--top 10] [--sqlite job_portal.db]
+
+precomputes the top jobs of every jobseeker with skills into job_recommendation
+(replacing what was there), for use outside the app. The app itself scores live
+with a JobRecommender kept in memory. Needs NumPy.
+"""
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+
+try:
+    import numpy as np
+except ImportError:     # recommendations are off without NumPy
+    np = None
+
+from config import DB_HOST, DB_NAME, DB_PASSWORD, DB_USER
+from migrations import migrate
+from search_index import tokenize
+
+HASH_BITS = 18              # 262,144 hashed terms; collisions are rare enough to not matter for ranking
+TOP_K = 10
+DELTA_MERGE_RATIO = 0.1     # merge added jobs into the main segment at 10% of its size
+DELTA_MERGE_MIN = 2000
+BLOCK_CELLS = 1 << 22       # batch mode: seekers x jobs scores held at once (32 MiB)
+FETCH_SIZE = 5000
+
+# applicant score = weighted cosine similarity of each field to the job's title and description
+RANK_WEIGHTS = {"skills": 0.5, "experience": 0.2, "cover_letter": 0.3}
+RANK_CACHE_JOBS = 256       # jobs whose ranking is kept
+
+
+# =========================
+# Vectors
+# =========================
+class TermHasher:
+    """Words -> columns of a 2**bits term space (the hashing trick): no vocabulary to build or keep in sync.
+
+    Columns are computed, not cached: crc32 of a word costs about as much as a
+    dict lookup, and a cache shared by the recommender and the ranker would grow
+    with every word of every skill list and cover letter.
+    """
+
+    def __init__(self, bits=HASH_BITS):
+        self.dim = 1 << bits
+        self._mask = self.dim - 1
+
+    def column(self, word):
+        # crc32, not hash(): the same word must land in the same column in every process
+        return zlib.crc32(word.encode()) & self._mask
+
+    def counts(self, text):
+        return Counter(self.column(word) for word in tokenize(text))
+
+    def batch(self, texts):
+        """(rows, columns, counts) of the terms of many texts at once, row = position in texts."""
+        crc32, mask = zlib.crc32, self._mask
+        lengths, cols = [], []
+        for text in texts:
+            found = [crc32(word.encode()) & mask for word in tokenize(text)]
+            cols.extend(found)
+            lengths.append(len(found))
+        rows = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+        keys, counts = np.unique(rows * self.dim + np.array(cols, np.int64), return_counts=True)
+        return keys // self.dim, keys % self.dim, counts
+
+
+class JobRecommender:
+    """Hashed TF-IDF vectors of job texts, for scoring skills against all jobs at once.
+
+    A job is a sparse vector over 2**bits hashed terms, holding its L2-normalized
+    log term frequencies. IDF is applied when scoring, so adding a job only
+    changes the document frequencies, never the other vectors. The vectors are
+    kept column-wise (CSC: for each term, the jobs containing it and their
+    weights), so a query is one sparse matrix-vector product over only the
+    columns of its terms. Jobs added after build() go to a small delta segment,
+    merged into the main one once it has grown past a fraction of it.
+    """
+
+    def __init__(self, bits=HASH_BITS):
+        if np is None:
+            raise RuntimeError("job recommendations need NumPy (pip install numpy)")
+        self.terms = TermHasher(bits)
+        self.dim = self.terms.dim
+        self.ids = np.zeros(0, np.int64)        # row -> job id
+        self.alive = np.zeros(0, bool)          # False for removed (or replaced) jobs
+        self.rows = {}                          # job id -> its live row
+        self.df = np.zeros(self.dim, np.int32)  # live jobs per column
+        # main segment, CSC
+        self._col_ptr = np.zeros(self.dim + 1, np.int64)
+        self._row_idx = np.zeros(0, np.int32)
+        self._values = np.zeros(0, np.float32)
+        # delta segment, (row, column, value) triplets
+        self._delta = []
+        self._delta_nnz = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    # ---------- Building ----------
+    def build(self, jobs):
+        """Index [(job id, text), ...] from scratch, as one batch."""
+        ids, rows, cols, values = [], [], [], []
+        for job_id, text in jobs:
+            c, v = self._vector(text)
+            rows.append(np.full(len(c), len(ids), np.int32))
+            cols.append(c)
+            values.append(v)
+            ids.append(job_id)
+        self.ids = np.array(ids, np.int64)
+        self.alive = np.ones(len(ids), bool)
+        self.rows = {job_id: row for row, job_id in enumerate(ids)}
+        self._delta, self._delta_nnz = [], 0
+        self._set_main(*(np.concatenate(a) if a else np.zeros(0, t)
+                         for a, t in ((rows, np.int32), (cols, np.int64), (values, np.float32))))
+        return self
+
+    def add(self, jobs):
+        """Add or replace [(job id, text), ...] without a rebuild."""
+        jobs = list(jobs)
+        if not jobs:
+            return
+        self.remove(job_id for job_id, _ in jobs)
+        first = len(self.ids)
+        self.ids = np.concatenate([self.ids, np.array([job_id for job_id, _ in jobs], np.int64)])
+        self.alive = np.concatenate([self.alive, np.ones(len(jobs), bool)])
+        for row, (job_id, text) in enumerate(jobs, first):
+            cols, values = self._vector(text)
+            self.rows[job_id] = row
+            self.df[cols] += 1
+            self._delta.append((np.full(len(cols), row, np.int32), cols, values))
+            self._delta_nnz += len(cols)
+        if self._delta_nnz > max(DELTA_MERGE_MIN, DELTA_MERGE_RATIO * len(self._row_idx)):
+            self._merge()
+
+    def remove(self, job_ids):
+        # the rows stay until the next merge; only their df is taken back then
+        for job_id in job_ids:
+            row = self.rows.pop(job_id, None)
+            if row is not None:
+                self.alive[row] = False
+
+    def _vector(self, text):
+        counts = self.terms.counts(text)
+        if not counts:
+            return np.zeros(0, np.int64), np.zeros(0, np.float32)
+        cols = np.fromiter(counts.keys(), np.int64, len(counts))
+        values = 1 + np.log(np.fromiter(counts.values(), np.float32, len(counts)))
+        return cols, (values / np.linalg.norm(values)).astype(np.float32)
+
+    def _set_main(self, rows, cols, values):
+        order = np.argsort(cols, kind="stable")
+        self._row_idx, self._values = rows[order], values[order]
+        self._col_ptr = np.zeros(self.dim + 1, np.int64)
+        np.cumsum(np.bincount(cols, minlength=self.dim), out=self._col_ptr[1:])
+        live = self.alive[rows]
+        self.df = np.bincount(cols[live], minlength=self.dim).astype(np.int32)
+
+    def _merge(self):
+        # main + delta -> new main, dropping removed rows and renumbering the rest
+        main_cols = np.repeat(np.arange(self.dim), np.diff(self._col_ptr))
+        rows = np.concatenate([self._row_idx] + [r for r, _, _ in self._delta])
+        cols = np.concatenate([main_cols] + [c for _, c, _ in self._delta])
+        values = np.concatenate([self._values] + [v for _, _, v in self._delta])
+        keep = self.alive[rows]
+        renumber = np.cumsum(self.alive) - 1
+        self.ids = self.ids[self.alive]
+        self.alive = np.ones(len(self.ids), bool)
+        self.rows = {int(job_id): row for row, job_id in enumerate(self.ids)}
+        self._delta, self._delta_nnz = [], 0
+        self._set_main(renumber[rows[keep]].astype(np.int32), cols[keep], values[keep])
+
+    # ---------- Scoring ----------
+    def recommend(self, skills, k=TOP_K, exclude=()):
+        """Top k [(job id, score), ...] for a skills text, best first."""
+        scores = self._scores([skills])[0]
+        return self._top(scores, k, exclude)
+
+    def recommend_many(self, seekers, k=TOP_K):
+        """{key: top k [(job id, score), ...]} for [(key, skills text), ...].
+
+        Scores a block of seekers against all jobs with one product, the block
+        sized so the score matrix stays within BLOCK_CELLS.
+        """
+        seekers = list(seekers)
+        block = max(1, BLOCK_CELLS // max(1, len(self.ids)))
+        result = {}
+        for start in range(0, len(seekers), block):
+            chunk = seekers[start:start + block]
+            scores = self._scores([skills for _, skills in chunk])
+            for (key, _), row in zip(chunk, scores):
+                result[key] = self._top(row, k)
+        return result
+
+    def _scores(self, texts):
+        # queries x jobs scores: each query term's column, weighted by tf * idf^2
+        n_rows, n = len(self.ids), max(1, len(self.rows))
+        q_idx, q_cols, q_weights = [], [], []
+        for i, text in enumerate(texts):
+            counts = self.terms.counts(text)
+            for col, tf in counts.items():
+                q_idx.append(i)
+                q_cols.append(col)
+                q_weights.append(1 + np.log(tf))
+        out = np.zeros((len(texts), n_rows), np.float64)
+        if not q_cols or not n_rows:
+            return out
+        q_idx = np.array(q_idx, np.int64)
+        q_cols = np.array(q_cols, np.int64)
+        idf = np.log((n + 1) / (self.df[q_cols] + 1)) + 1
+        q_weights = np.array(q_weights) * idf * idf
+
+        # main segment: concatenate the columns' slices without a Python loop over them
+        starts, ends = self._col_ptr[q_cols], self._col_ptr[q_cols + 1]
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if total:
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+            cells = np.repeat(q_idx, lengths) * n_rows + self._row_idx[offsets]
+            out += np.bincount(cells, weights=self._values[offsets] * np.repeat(q_weights, lengths),
+                               minlength=out.size).reshape(out.shape)
+        if self._delta:
+            d_rows = np.concatenate([r for r, _, _ in self._delta])
+            d_cols = np.concatenate([c for _, c, _ in self._delta])
+            d_values = np.concatenate([v for _, _, v in self._delta])
+            for i, col, w in zip(q_idx, q_cols, q_weights):
+                hit = d_cols == col
+                np.add.at(out[i], d_rows[hit], d_values[hit] * w)
+        out[:, ~self.alive] = 0
+        return out
+
+    def _top(self, scores, k, exclude=()):
+        if exclude:
+            scores = scores.copy()
+            scores[[self.rows[j] for j in exclude if j in self.rows]] = 0
+        k = min(k, int(np.count_nonzero(scores > 0)))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(self.ids[r]), float(scores[r])) for r in best]
+
+
+# =========================
+# Applicant ranking
+# =========================
+def rank_applicants(job_text, applicants, weights=RANK_WEIGHTS, terms=None, batches=None):
+    """Applicant dicts (with the fields of weights) best first, each with "score" and "<field>_score" added.
+
+    Every field of every applicant is vectorized in one batch (TermHasher.batch;
+    pass ones already made in batches), and scored against the job with one
+    gather and one bincount per field. IDF comes from this pool of applicants,
+    so words every cover letter has count for little.
+    """
+    terms = terms or TermHasher()
+    n = len(applicants)
+    if n == 0:
+        return []
+    batches = batches or {}
+    fields = {field: batches.get(field) or terms.batch([a.get(field) for a in applicants]) for field in weights}
+    job_counts = terms.counts(job_text)
+    # document frequency over every field of every applicant, and the job
+    df = np.bincount(np.concatenate([cols for _, cols, _ in fields.values()] +
+                                    [np.fromiter(job_counts, np.int64, len(job_counts))]),
+                     minlength=terms.dim)
+    idf = np.log((len(fields) * n + 2) / (df + 1)) + 1
+    job = np.zeros(terms.dim)
+    for col, tf in job_counts.items():
+        job[col] = (1 + np.log(tf)) * idf[col]
+    job_norm = np.linalg.norm(job) or 1.0
+    total = np.zeros(n)
+    scores = {}
+    for field, (rows, cols, counts) in fields.items():
+        w = (1 + np.log(counts)) * idf[cols]
+        norms = np.sqrt(np.bincount(rows, w * w, minlength=n))
+        dots = np.bincount(rows, w * job[cols], minlength=n)
+        scores[field] = np.divide(dots, norms * job_norm, out=np.zeros(n), where=norms > 0)
+        total += weights[field] * scores[field]
+    order = np.argsort(-total, kind="stable")
+    ranked = []
+    for i in order:
+        applicant = dict(applicants[i], score=round(float(total[i]), 4))
+        for field in weights:
+            applicant[f"{field}_score"] = round(float(scores[field][i]), 4)
+        ranked.append(applicant)
+    return ranked
+
+
+class ApplicantRanker:
+    """Ranked applicants per job, cached until the job gets a new application.
+
+    ranked(conn, job_id) runs on a DB worker with a portal_service backend. A
+    cached ranking is checked against the job's application stamp (count and
+    latest ID, one indexed query), so an application written by another
+    process invalidates it too; invalidate() does it at once for this one's.
+
+    Tokenizing is most of the cost, and most of the text is cover letters,
+    which never change once sent: their vectors stay with the job, and a new
+    ranking only vectorizes the letters of applications that are new since.
+    """
+
+    def __init__(self, service, weights=RANK_WEIGHTS, max_jobs=RANK_CACHE_JOBS):
+        if np is None:
+            raise RuntimeError("applicant ranking needs NumPy (pip install numpy)")
+        self.service = service
+        self.weights = weights
+        self.max_jobs = max_jobs
+        self.terms = TermHasher()
+        # job id -> [stamp (None once invalidated), ranked applicants, application IDs, letter vectors]
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ranked(self, conn, job_id):
+        """The job's applicants best first, or None if there is no such job."""
+        stamp = self.service.application_stamp(conn, job_id)
+        with self._lock:
+            hit = self._cache.get(job_id)
+            if hit is not None:
+                self._cache.move_to_end(job_id)
+                if hit[0] == stamp:
+                    return hit[1]
+        job = self.service.get_job(conn, job_id)
+        if job is None:
+            return None
+        applicants = self.service.applicants(conn, job_id)
+        ids = [a["application_id"] for a in applicants]
+        letters = self._letters(applicants, ids, hit)
+        ranked = rank_applicants(f"{job['title']} {job['description']}", applicants, self.weights, self.terms,
+                                 {"cover_letter": letters})
+        with self._lock:
+            # an application that arrived after the stamp was read just costs one more ranking
+            self._cache[job_id] = [stamp, ranked, ids, letters]
+            self._cache.move_to_end(job_id)
+            while len(self._cache) > self.max_jobs:
+                self._cache.popitem(last=False)
+        return ranked
+
+    def invalidate(self, job_ids):
+        with self._lock:
+            for job_id in job_ids:
+                if job_id in self._cache:
+                    self._cache[job_id][0] = None
+
+    def _letters(self, applicants, ids, hit):
+        # applications are listed by ID, so new ones are the tail; anything else (one withdrawn) starts over
+        known = len(hit[2]) if hit is not None and ids[:len(hit[2])] == hit[2] else 0
+        rows, cols, counts = self.terms.batch([a["cover_letter"] for a in applicants[known:]])
+        if not known:
+            return rows, cols, counts
+        old_rows, old_cols, old_counts = hit[3]
+        return (np.concatenate([old_rows, rows + known]), np.concatenate([old_cols, cols]),
+                np.concatenate([old_counts, counts]))
+
+
+# =========================
+# Batch mode
+# =========================
+QUERIES = {
+    "mysql": {
+        "jobs": "SELECT ID, CONCAT_WS(' ', Title, Description) FROM joblisting",
+        "seekers": "SELECT ID, Skills FROM jobseeker WHERE Skills IS NOT NULL AND Skills <> ''",
+        "insert": "INSERT INTO job_recommendation (JobSeekerID, JobID, `Rank`, Score) VALUES (%s, %s, %s, %s)",
+    },
+    "sqlite": {
+        "jobs": "SELECT id, COALESCE(title, '') || ' ' || COALESCE(description, '') FROM jobs",
+        "seekers": "SELECT id, skills FROM profiles WHERE skills IS NOT NULL AND skills <> ''",
+        "insert": "INSERT INTO job_recommendation (profile_id, job_id, rank, score) VALUES (?, ?, ?, ?)",
+    },
+}
+
+
+def fetch_all(conn, sql):
+    cursor = conn.cursor()
+    cursor.execute(sql)
+    rows = []
+    while batch := cursor.fetchmany(FETCH_SIZE):
+        rows.extend(batch)
+    cursor.close()
+    return rows
+
+
+def precompute(conn, dialect="mysql", k=TOP_K, progress=sys.stderr):
+    """Replace job_recommendation with the top k jobs of every jobseeker; returns the seeker count."""
+    queries = QUERIES[dialect]
+    migrate(conn, dialect)     # job_recommendation is created by migration 6
+    started = time.perf_counter()
+    recommender = JobRecommender().build(fetch_all(conn, queries["jobs"]))
+    print(f"{len(recommender):,} jobs vectorized in {time.perf_counter() - started:.1f}s", file=progress)
+    seekers = fetch_all(conn, queries["seekers"])
+    top = recommender.recommend_many(seekers, k)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM job_recommendation")
+        rows = [(seeker, job_id, rank, score)
+                for seeker, jobs in top.items() for rank, (job_id, score) in enumerate(jobs, 1)]
+        for i in range(0, len(rows), FETCH_SIZE):
+            cursor.executemany(queries["insert"], rows[i:i + FETCH_SIZE])
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    print(f"{len(seekers):,} jobseekers, {len(rows):,} recommendations in {time.perf_counter() - started:.1f}s",
+          file=progress)
+    return len(seekers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute job recommendations for every jobseeker.")
+    parser.add_argument("--top", type=int, default=TOP_K, help=f"jobs per jobseeker (default {TOP_K})")
+    parser.add_argument("--sqlite", metavar="DB", help="use the sqlite app's database instead of MySQL")
+    args = parser.parse_args(argv)
+    if np is None:
+        print("recommend.py needs NumPy: pip install numpy", file=sys.stderr)
+        return 1
+    if args.sqlite:
+        conn, dialect = sqlite3.connect(args.sqlite), "sqlite"
+    else:
+        import mysql.connector  # only needed for MySQL
+        conn = mysql.connector.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME)
+        dialect = "mysql"
+    try:
+        precompute(conn, dialect, args.top)
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
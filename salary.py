@@ -0,0 +1,61 @@
+import re
+
+# =========================
+# Salary parsing
+# =========================
+# the suffix must end a word: "50000 monthly" and "$60,000 Mumbai" have no "m" (million)
+_AMOUNT_RE = re.compile(r"(\d+(?:[.,]\d+)*)\s*(?:(k|m|lakhs?|lpa|lac)\b)?", re.IGNORECASE)
+_MULTIPLIERS = {"k": 1_000, "m": 1_000_000, "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lpa": 100_000}
+
+
+def parse_amount(text):
+    """First amount in text as a whole number: "$100,000" -> 100000, "80k" -> 80000."""
+    m = _AMOUNT_RE.search(text or "")
+    if not m:
+        return None
+    return _to_int(m.group(1), m.group(2))
+
+
+def parse_salary(text):
+    """(min, max) of a free-text salary such as "$100,000" or "80k - 120k".
+
+    A single amount gives min == max; (None, None) if there is no amount at all.
+    A suffix on the upper end of a range applies to both ends ("80-120k").
+    """
+    matches = _AMOUNT_RE.findall(text or "")[:2]
+    if not matches:
+        return None, None
+    if len(matches) == 2 and not matches[0][1] and matches[1][1]:
+        matches[0] = (matches[0][0], matches[1][1])
+    amounts = [_to_int(number, suffix) for number, suffix in matches]
+    return min(amounts), max(amounts)
+
+
+def _to_int(number, suffix):
+    # Separators before the last one group thousands (1,20,000; 1.234.567); the last one does
+    # too if three digits follow it (100.000, 60,000), else it is the decimal point (1.5k, 1.234,56).
+    parts = re.split(r"[.,]", number)
+    if len(parts) > 1 and len(parts[-1]) != 3:
+        value = float("".join(parts[:-1]) + "." + parts[-1])
+    else:
+        value = float("".join(parts))
+    return int(value * _MULTIPLIERS.get((suffix or "").lower(), 1))
+
+
+# (from, to, label); a job falls in the band of the top of its range
+SALARY_BANDS = (
+    (0, 50_000, "Under 50k"),
+    (50_000, 100_000, "50k-100k"),
+    (100_000, 150_000, "100k-150k"),
+    (150_000, None, "150k+"),
+)
+
+
+def salary_band(amount):
+    """Label of the SALARY_BANDS entry amount falls in; None for no amount."""
+    if amount is None:
+        return None
+    for low, high, label in SALARY_BANDS:
+        if amount >= low and (high is None or amount < high):
+            return label
+    return None
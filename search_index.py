@@ -0,0 +1,414 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+
+# =========================
+# Tokenizer
+# =========================
+_TOKEN_RE = re.compile(r"\w+(?:[+#]+|\.\w+)*")
+
+
+def tokenize(text):
+    """Lower-cased word tokens; keeps things like c++, c#, node.js in one piece."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def parse_query(query):
+    """Split a query into AND clauses, each a list of OR alternatives.
+
+    "python django OR flask" -> [["python"], ["django", "flask"]]
+    """
+    clauses = []
+    join_next = False
+    for word in (query or "").split():
+        if word == "OR":
+            join_next = bool(clauses)
+            continue
+        tokens = tokenize(word)
+        if not tokens:
+            continue
+        if join_next:
+            clauses[-1].append(tokens[0])
+            tokens = tokens[1:]
+            join_next = False
+        clauses.extend([t] for t in tokens)
+    return clauses
+
+
+# =========================
+# Inverted index
+# =========================
+class SearchIndex:
+    """Inverted index over Job-like objects with BM25 ranking.
+
+    Postings map token -> {doc id: weighted term frequency}. Field weights make
+    a hit in the title count more than one buried in the description.
+    """
+
+    FIELDS = (("title", 3.0), ("company", 2.0), ("description", 1.0))
+    MIN_PREFIX = 3          # shorter terms only match whole tokens
+    MAX_EXPANSIONS = 50     # prefix expansions per term
+
+    def __init__(self, fields=FIELDS, k1=1.2, b=0.75):
+        self.fields = fields
+        self.k1 = k1
+        self.b = b
+        self._reset()
+
+    def _reset(self):
+        self.postings = {}   # token -> {doc id: BM25 term impact}
+        self.docs = {}
+        self._doc_tf = {}
+        self._doc_len = {}
+        self._total_len = 0.0
+        self._impact_avgdl = None
+        self._vocab = []     # sorted, for prefix lookups
+        self.fuzzy = TrigramIndex()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.docs
+
+    # ---------- Maintenance ----------
+    def build(self, docs):
+        self._reset()
+        for doc in docs:
+            self._store(doc)
+        if self.docs:
+            self._impact_avgdl = self._total_len / len(self.docs)
+        postings = self.postings
+        for doc_id, tf in self._doc_tf.items():
+            length = self._doc_len[doc_id]
+            for token, freq in tf.items():
+                plist = postings.get(token)
+                if plist is None:
+                    plist = postings[token] = {}
+                plist[doc_id] = self._impact(freq, length)
+        self._vocab = sorted(postings)
+        self.fuzzy = TrigramIndex(self._vocab)
+        return self
+
+    def add(self, doc):
+        if doc.id in self.docs:
+            self.remove(doc.id)
+        tf, length = self._store(doc)
+        for token, freq in tf.items():
+            plist = self.postings.get(token)
+            if plist is None:
+                plist = self.postings[token] = {}
+                insort(self._vocab, token)
+                self.fuzzy.add(token)
+            plist[doc.id] = self._impact(freq, length)
+
+    def _store(self, doc):
+        tf = Counter()
+        for field, weight in self.fields:
+            for token in tokenize(getattr(doc, field, "")):
+                tf[token] += weight
+        length = sum(tf.values())
+        self.docs[doc.id] = doc
+        self._doc_tf[doc.id] = tf
+        self._doc_len[doc.id] = length
+        self._total_len += length
+        return tf, length
+
+    def remove(self, doc_id):
+        if doc_id not in self.docs:
+            return
+        for token in self._doc_tf.pop(doc_id):
+            plist = self.postings[token]
+            del plist[doc_id]
+            if not plist:
+                del self.postings[token]
+                del self._vocab[bisect_left(self._vocab, token)]
+                self.fuzzy.discard(token)
+        self._total_len -= self._doc_len.pop(doc_id)
+        del self.docs[doc_id]
+
+    # The length-normalized tf part of BM25 is stored in the postings so queries
+    # only add up idf * impact. It depends on the average doc length, so impacts
+    # are recomputed once that has drifted noticeably from the value they used.
+    def _impact(self, freq, length):
+        avgdl = self._impact_avgdl or length or 1.0
+        norm = self.k1 * (1 - self.b + self.b * length / avgdl)
+        return freq * (self.k1 + 1) / (freq + norm)
+
+    def _rescore(self):
+        self._impact_avgdl = (self._total_len / len(self.docs)) if self.docs else None
+        for doc_id, tf in self._doc_tf.items():
+            length = self._doc_len[doc_id]
+            for token, freq in tf.items():
+                self.postings[token][doc_id] = self._impact(freq, length)
+
+    def _check_drift(self):
+        if not self.docs:
+            return
+        avgdl = self._total_len / len(self.docs)
+        if self._impact_avgdl is None or abs(avgdl / self._impact_avgdl - 1) > 0.25:
+            self._rescore()
+
+    # ---------- Querying ----------
+    def expand(self, term):
+        """Tokens a query term matches: itself plus, for longer terms, tokens it prefixes."""
+        matches = [term] if term in self.postings else []
+        if len(term) < self.MIN_PREFIX:
+            return matches
+        i = bisect_left(self._vocab, term)
+        while i < len(self._vocab) and len(matches) < self.MAX_EXPANSIONS:
+            token = self._vocab[i]
+            if not token.startswith(term):
+                break
+            if token != term:
+                matches.append(token)
+            i += 1
+        return matches
+
+    def narrows(self, old, new):
+        """True if everything matching `new` also matches `old`.
+
+        Holds when `new` only extends `old` (more characters or more terms, no OR)
+        and none of old's terms was an exact-only or truncated prefix lookup; the
+        results for `old` can then be filtered instead of searching again.
+        """
+        if not old or not new.startswith(old) or "OR" in new.split():
+            return False
+        for clause in parse_query(old):
+            for term in clause:
+                if len(term) < self.MIN_PREFIX or len(self.expand(term)) >= self.MAX_EXPANSIONS:
+                    return False
+        return True
+
+    def suggest(self, query):
+        """Spelling-corrected query for one that matched nothing, or None."""
+        return self.fuzzy.correct(query, known=lambda term: bool(self.expand(term)))
+
+    def search(self, query, limit=None, within=None):
+        """Docs matching every clause of the query, best BM25 score first.
+
+        within: optional doc IDs to restrict the search to, e.g. the results of a
+        query this one narrows.
+        """
+        return self.top(self.match(query, within), limit)
+
+    def match(self, query, within=None):
+        """{doc id: score} of the docs matching every clause of the query, not ranked.
+
+        For a single term this is the term's postings (its impacts rank the same
+        as its scores): read it, don't change it. Rank with top().
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return {}
+        self._check_drift()
+
+        expanded = []
+        for clause in clauses:
+            tokens = []
+            for term in clause:
+                tokens.extend(t for t in self.expand(term) if t not in tokens)
+            if not tokens:
+                return {}
+            expanded.append(tokens)
+
+        if within is None and len(expanded) == 1 and len(expanded[0]) == 1:
+            # single term: every posting matches and shares one idf
+            return self.postings[expanded[0][0]]
+
+        # intersect clauses, cheapest first
+        candidates = None if within is None else set(within)
+        for tokens in sorted(expanded, key=lambda ts: sum(len(self.postings[t]) for t in ts)):
+            if candidates is not None and len(candidates) < sum(len(self.postings[t]) for t in tokens):
+                # few candidates left: probe them instead of walking the postings
+                plists = [self.postings[t] for t in tokens]
+                candidates = {d for d in candidates if any(d in p for p in plists)}
+                if not candidates:
+                    return {}
+                continue
+            if len(tokens) == 1:
+                ids = self.postings[tokens[0]].keys()
+            else:
+                ids = set()
+                for t in tokens:
+                    ids.update(self.postings[t])
+            candidates = set(ids) if candidates is None else candidates.intersection(ids)
+            if not candidates:
+                return {}
+
+        n = len(self.docs)
+        scores = dict.fromkeys(candidates, 0.0)
+        for tokens in expanded:
+            for t in tokens:
+                plist = self.postings[t]
+                idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+                if len(plist) < len(scores):
+                    for d, impact in plist.items():
+                        if d in scores:
+                            scores[d] += idf * impact
+                else:
+                    for d in scores:
+                        impact = plist.get(d)
+                        if impact:
+                            scores[d] += idf * impact
+        return scores
+
+    def top(self, scores, limit=None, offset=0, key=None, reverse=True):
+        """Docs offset..offset + limit of match()'s scores, best first (or by key).
+
+        Only the first offset + limit are ranked, with a heap, so a page of a
+        common term costs a pass over its matches rather than a full sort.
+        Ties go to the newest listing.
+        """
+        if key is None:
+            # (score, id) pairs compare without a key function call per match. Newest first
+            # (ids are roughly in insertion order): tied scores then rarely displace the heap.
+            items = zip(reversed(scores.values()), reversed(scores.keys()))
+            if limit is None:
+                pairs = sorted(items, reverse=reverse)[offset:]
+            else:
+                pairs = (heapq.nlargest if reverse else heapq.nsmallest)(offset + limit, items)[offset:]
+            ranked = [d for _, d in pairs]
+        elif limit is None:
+            ranked = sorted(scores, key=key, reverse=reverse)[offset:]
+        else:
+            ranked = (heapq.nlargest if reverse else heapq.nsmallest)(offset + limit, scores, key=key)[offset:]
+        # a job removed since the match is skipped
+        return [self.docs[d] for d in ranked if d in self.docs]
+
+
+# =========================
+# Fuzzy matching
+# =========================
+def trigrams(word):
+    """Padded character trigrams: "sql" -> {"$$s", "$sq", "sql", "ql$"}."""
+    padded = "$$" + word + "$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, bound):
+    """Levenshtein distance with adjacent transpositions, or bound + 1 once it exceeds bound."""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        row = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            row[j] = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                row[j] = min(row[j], prev2[j - 2] + 1)
+        if min(row) > bound:
+            return bound + 1
+        prev2, prev = prev, row
+    return min(prev[-1], bound + 1)
+
+
+class TrigramIndex:
+    """Trigram index over a vocabulary, for typo-tolerant term lookups.
+
+    Candidates are the words sharing trigrams with the term, ranked by trigram
+    Jaccard similarity; only the best SHORTLIST of those are checked with the
+    (bounded) edit distance, so a lookup never compares against the whole vocabulary.
+    """
+
+    MIN_LENGTH = 3          # shorter terms are never corrected
+    MIN_SIMILARITY = 0.2    # trigram Jaccard needed to make the shortlist
+    SHORTLIST = 20
+
+    def __init__(self, words=()):
+        self.grams = {}      # trigram -> set of words
+        self.words = set()
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def add(self, word):
+        if word in self.words or len(word) < self.MIN_LENGTH:
+            return
+        self.words.add(word)
+        for gram in trigrams(word):
+            self.grams.setdefault(gram, set()).add(word)
+
+    def discard(self, word):
+        if word not in self.words:
+            return
+        self.words.discard(word)
+        for gram in trigrams(word):
+            bucket = self.grams[gram]
+            bucket.discard(word)
+            if not bucket:
+                del self.grams[gram]
+
+    def similar(self, term, limit=3):
+        """Vocabulary words closest to term, best first; [] if none is close enough."""
+        if len(term) < self.MIN_LENGTH:
+            return []
+        grams = trigrams(term)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.grams.get(gram, ()))
+        scored = []
+        for word, n in shared.items():
+            jaccard = n / (len(grams) + len(word) + 1 - n)   # a word has len + 1 trigrams
+            if jaccard >= self.MIN_SIMILARITY:
+                scored.append((jaccard, word))
+        bound = 1 if len(term) <= 5 else 2
+        ranked = []
+        for jaccard, word in heapq.nlargest(self.SHORTLIST, scored):
+            distance = edit_distance(term, word, bound)
+            if distance <= bound:
+                ranked.append((distance, -jaccard, word))
+        ranked.sort()
+        return [word for _, _, word in ranked[:limit]]
+
+    def correct(self, query, known=None):
+        """The query with unknown terms replaced by their closest word; None if nothing changed.
+
+        known(term) says whether a term already matches as typed (default: it is
+        in the vocabulary). AND/OR structure is kept.
+        """
+        known = known or self.__contains__
+        words, changed = [], False
+        for word in (query or "").split():
+            if word == "OR":
+                words.append(word)
+                continue
+            fixed = []
+            for term in tokenize(word):
+                if not known(term):
+                    close = self.similar(term, limit=1)
+                    if close:
+                        term, changed = close[0], True
+                fixed.append(term)
+            words.append(" ".join(fixed))
+        return " ".join(words) if changed else None
+
+
+# =========================
+# MySQL FULLTEXT
+# =========================
+def boolean_query(query, min_len=3):
+    """Translate a query into MySQL boolean-mode syntax with the same AND/OR meaning.
+
+    Terms shorter than InnoDB's minimum token size can never match, so they are
+    dropped; returns "" when nothing usable is left.
+    """
+    parts = []
+    for clause in parse_query(query):
+        # InnoDB splits on punctuation (and reads some of it as operators),
+        # so each term is reduced to its longest word piece
+        terms = [max(re.findall(r"\w+", t), key=len, default="") for t in clause]
+        terms = [t + "*" for t in terms if len(t) >= min_len]
+        if len(terms) == 1:
+            parts.append("+" + terms[0])
+        elif terms:
+            parts.append("+(" + " ".join(terms) + ")")
+    return " ".join(parts)
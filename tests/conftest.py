@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the modules under test live next to "job portal advance.py"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,89 @@
+import gzip
+import json
+
+import pytest
+
+from bulk_import import BulkImporter, chunked, normalize, read_records
+
+
+class FakeDatabase:
+    """employer and joblisting rows, with commit and rollback; fail_jobs makes the next job insert fail."""
+
+    def __init__(self):
+        self.committed = {"employer": {}, "joblisting": []}
+        self.rollback()
+        self.fail_jobs = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed = {"employer": dict(self.open["employer"]), "joblisting": list(self.open["joblisting"])}
+
+    def rollback(self):
+        self.open = {"employer": dict(self.committed["employer"]), "joblisting": list(self.committed["joblisting"])}
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.lastrowid = None
+
+    def execute(self, sql, params=()):
+        assert sql.startswith("INSERT INTO employer")
+        employers = self.db.open["employer"]
+        self.lastrowid = max(employers.values(), default=0) + 1
+        employers[params[0]] = self.lastrowid
+
+    def executemany(self, sql, rows):
+        if self.db.fail_jobs:
+            self.db.fail_jobs = False
+            raise RuntimeError("lost connection")
+        self.db.open["joblisting"].extend(rows)
+
+    def close(self):
+        pass
+
+
+def _job(company, title="Clerk"):
+    return {"title": title, "description": "Files", "company": company, "phone": "555"}
+
+
+def test_employers_of_a_failed_chunk_are_forgotten():
+    db = FakeDatabase()
+    importer = BulkImporter(db, progress=None)
+    db.fail_jobs = True
+    with pytest.raises(RuntimeError):
+        importer.import_chunk([_job("Acme")])
+    assert db.committed["employer"] == {} and importer.employers == {}
+    assert importer.stats["employers"] == 0
+
+    importer.import_chunk([_job("Acme"), _job("acme", "Typist")])
+    acme = db.committed["employer"]["Acme"]
+    assert importer.employers == {"acme": acme}
+    assert [row[-1] for row in db.committed["joblisting"]] == [acme, acme]
+    assert importer.stats["employers"] == 1
+
+
+def test_normalize_maps_aliases_and_trims():
+    record = normalize({"Job Title": "  Clerk ", "DESC": "Files", "Company_Name": "Acme", "Pay": "",
+                        "PhoneNo": 5551234, "unknown": "x", "City": None, "Title2": "ignored"})
+    assert record == {"title": "Clerk", "description": "Files", "company": "Acme", "phone": "5551234"}
+    assert len(normalize({"title": "x" * 500})["title"]) == 120     # cut to the column width
+
+
+def test_chunked_streams_fixed_size_chunks():
+    def records():
+        yield from range(7)
+    assert list(chunked(records(), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked([], 3)) == []
+
+
+def test_read_records_from_csv_and_gzipped_jsonl(tmp_path):
+    csv_path = tmp_path / "feed.csv"
+    csv_path.write_text("title,company,salary\nClerk,Acme,40k\n", encoding="utf-8")
+    jsonl_path = tmp_path / "feed.jsonl.gz"
+    with gzip.open(jsonl_path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"jobtitle": "Typist", "employer": "Initech"}) + "\n\n")
+    assert list(read_records(str(csv_path))) == [{"title": "Clerk", "company": "Acme", "salary": "40k"}]
+    assert list(read_records(str(jsonl_path))) == [{"title": "Typist", "company": "Initech"}]
@@ -0,0 +1,36 @@
+from collections import namedtuple
+
+from catalog import JobCatalog
+
+Job = namedtuple("Job", "id title")
+
+
+def _ids(catalog):
+    return [job.id for job in catalog.jobs]
+
+
+def test_pages_are_kept_newest_first():
+    catalog = JobCatalog()
+    catalog.extend([Job(9, "a"), Job(7, "b")])
+    catalog.extend([Job(5, "c"), Job(7, "b2")])     # a row seen again is replaced, not repeated
+    assert _ids(catalog) == [9, 7, 5]
+    assert catalog.by_id[7].title == "b2"
+
+
+def test_delta_is_merged_in_place():
+    catalog = JobCatalog()
+    catalog.extend([Job(9, "a"), Job(7, "b"), Job(5, "c")])
+    changed = catalog.apply(upserts=[Job(10, "new"), Job(8, "between"), Job(7, "edited")], deletes=[9])
+    assert changed
+    assert _ids(catalog) == [10, 8, 7, 5]
+    assert catalog.by_id[7].title == "edited" and 9 not in catalog
+
+
+def test_rows_beyond_the_loaded_pages_wait_for_their_page():
+    catalog = JobCatalog()
+    catalog.extend([Job(9, "a"), Job(7, "b")])
+    assert not catalog.apply(upserts=[Job(3, "older")], deletes=[2])
+    assert _ids(catalog) == [9, 7]
+    catalog.extend([Job(6, "c")], complete=True)
+    assert catalog.upsert(Job(3, "older"))
+    assert _ids(catalog) == [9, 7, 6, 3]
@@ -0,0 +1,64 @@
+import importlib.util
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def app_module():
+    pytest.importorskip("tkinter")
+    spec = importlib.util.spec_from_file_location("job_portal_advance", os.path.join(ROOT, "job portal advance.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class ChangeLog:
+    """joblisting_change rows (Seq, JobID, Op), answering the paged SELECT fetch_changes runs."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.selects = 0
+
+    def cursor(self, dictionary=False):
+        return self
+
+    def execute(self, sql, params):
+        since, limit = params
+        self.selects += 1
+        self._result = [{"Seq": s, "JobID": j, "Op": op} for s, j, op in self.rows if s > since][:limit]
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class Service:
+    def __init__(self, live):
+        self.live = live
+
+    def jobs_by_id(self, conn, ids):
+        return [{"id": i, "title": f"job {i}", "description": "", "salary": None, "company": None,
+                 "salary_min": None, "salary_max": None, "industry": None, "location": None}
+                for i in sorted(ids, reverse=True) if i in self.live]
+
+
+def test_changes_collapse_to_the_last_operation_per_job(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "CHANGE_BATCH_SIZE", 2)
+    app = object.__new__(app_module.JobPortalApp)
+    # job 1 added then deleted, 2 edited twice, 3 added, 4 edited and deleted since (row gone)
+    log = ChangeLog([(10, 9, "U"), (11, 1, "I"), (12, 2, "U"), (13, 1, "D"), (14, 2, "U"), (15, 3, "I"),
+                     (16, 4, "U")])
+    app.service = Service(live={2, 3})
+
+    since, upserts, deletes = app.fetch_changes(log, 10)
+
+    assert since == 16
+    assert sorted(job.id for job in upserts) == [2, 3]
+    assert sorted(deletes) == [1, 4]
+    assert log.selects == 4         # 2 rows a batch: three full batches, then an empty one
+    assert app.fetch_changes(log, since) == (16, [], [])
@@ -0,0 +1,39 @@
+from credentials import PasswordHasher, hash_password, needs_rehash, verify_password
+
+FAST = {"n": 16, "r": 1, "p": 1}        # scrypt cost small enough for tests
+FASTER = {"n": 8, "r": 1, "p": 1}
+
+
+def test_hash_verifies_and_is_salted():
+    stored = hash_password("s3cret", "scrypt", FAST)
+    assert stored.startswith("scrypt$16$1$1$")
+    assert stored != hash_password("s3cret", "scrypt", FAST)
+    assert verify_password("s3cret", stored, "scrypt", FAST) == (True, None)
+    assert verify_password("wrong", stored, "scrypt", FAST) == (False, None)
+
+
+def test_login_upgrades_an_old_cost():
+    stored = hash_password("s3cret", "scrypt", FASTER)
+    assert needs_rehash(stored, "scrypt", FAST)
+    ok, new_hash = verify_password("s3cret", stored, "scrypt", FAST)
+    assert ok and new_hash.startswith("scrypt$16$")
+    assert verify_password("s3cret", new_hash, "scrypt", FAST) == (True, None)
+    assert verify_password("wrong", stored, "scrypt", FAST) == (False, None)     # no upgrade without a match
+
+
+def test_login_hashes_a_raw_password_and_moves_schemes():
+    ok, new_hash = verify_password("s3cret", "s3cret", "scrypt", FAST)
+    assert ok and new_hash.startswith("scrypt$")
+    pbkdf2 = hash_password("s3cret", "pbkdf2_sha256", {"iterations": 1000})
+    ok, new_hash = verify_password("s3cret", pbkdf2, "scrypt", FAST)
+    assert ok and new_hash.startswith("scrypt$")
+    assert verify_password("s3cret", None) == (False, None)
+
+
+def test_hasher_runs_in_worker_processes():
+    hasher = PasswordHasher(workers=1, scheme="scrypt", params=FAST)
+    try:
+        stored = hasher.hash("s3cret").result(60)
+        assert hasher.verify("s3cret", stored).result(60) == (True, None)
+    finally:
+        hasher.shutdown()
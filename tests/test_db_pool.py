@@ -0,0 +1,51 @@
+import sqlite3
+
+from db_pool import ConnectionPool
+
+
+def _connect(path):
+    # autocommit at the sqlite3 level; transactions are begun explicitly, as a driver
+    # with autocommit off (mysql-connector) begins one at a task's first statement
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def _count(conn):
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    return conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+def test_borrowers_see_commits_made_after_a_read(tmp_path):
+    path = str(tmp_path / "pool.db")
+    writer = _connect(path)
+    writer.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY)")
+    pool = ConnectionPool(lambda: _connect(path), size=2)
+
+    with pool.connection() as a, pool.connection() as b:
+        assert (_count(a), _count(b)) == (0, 0)     # each read leaves a snapshot open
+
+    writer.execute("INSERT INTO jobs DEFAULT VALUES")
+
+    with pool.connection() as a, pool.connection() as b:
+        assert (_count(a), _count(b)) == (1, 1)
+    pool.close()
+    writer.close()
+
+
+def test_failed_task_is_rolled_back(tmp_path):
+    path = str(tmp_path / "pool.db")
+    pool = ConnectionPool(lambda: _connect(path), size=1)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY)")
+    try:
+        with pool.connection() as conn:
+            conn.execute("BEGIN")
+            conn.execute("INSERT INTO jobs DEFAULT VALUES")
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    with pool.connection() as conn:
+        assert _count(conn) == 0
+    pool.close()
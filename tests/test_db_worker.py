@@ -0,0 +1,100 @@
+import threading
+
+from db_pool import ConnectionPool
+from db_worker import DBExecutor, GroupCommitQueue
+
+
+class FakeConnection:
+    closed = False
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_shutdown_cancels_queued_tasks_and_pool_closes_connections():
+    conns = []
+
+    def connect():
+        conns.append(FakeConnection())
+        return conns[-1]
+
+    pool = ConnectionPool(connect, size=1)
+    executor = DBExecutor(pool, workers=1)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(conn):
+        started.set()
+        release.wait(5)
+        return "done"
+
+    running = executor.submit(blocking)
+    started.wait(5)
+    queued = executor.submit(lambda conn: "never")
+    executor.shutdown(cancel_futures=True)
+    pool.close()
+    assert queued.cancelled()
+
+    release.set()
+    assert running.result(5) == "done"
+    executor.shutdown(wait=True)
+    assert [c.closed for c in conns] == [True]
+
+
+def _queue(write_batch, **kwargs):
+    pool = ConnectionPool(FakeConnection, size=1)
+    return GroupCommitQueue(pool, write_batch, **kwargs), pool
+
+
+def test_items_queued_during_a_commit_share_the_next_batch():
+    batches, first_started, release = [], threading.Event(), threading.Event()
+
+    def write_batch(conn, items):
+        batches.append(list(items))
+        first_started.set()
+        release.wait(5)
+        return [n * 10 for n, in items]
+
+    commits, pool = _queue(write_batch, max_wait=0)
+    first = commits.submit(0)
+    first_started.wait(5)
+    rest = [commits.submit(n) for n in range(1, 6)]
+    release.set()
+    assert [f.result(5) for f in [first] + rest] == [0, 10, 20, 30, 40, 50]
+    assert batches == [[(0,)], [(1,), (2,), (3,), (4,), (5,)]]
+    assert commits.stats()["batches"] == 2 and commits.stats()["written"] == 6
+    commits.shutdown(wait=True)
+    pool.close()
+
+
+def test_an_item_error_fails_only_its_future():
+    commits, pool = _queue(lambda conn, items: [ValueError(n) if n == 2 else n for n, in items], max_wait=0.05)
+    futures = [commits.submit(n) for n in range(1, 4)]
+    assert futures[0].result(5) == 1 and futures[2].result(5) == 3
+    assert isinstance(futures[1].exception(5), ValueError)
+    commits.shutdown(wait=True)
+    pool.close()
+
+
+def test_a_failed_batch_fails_every_future_in_it():
+    def write_batch(conn, items):
+        raise RuntimeError("deadlock")
+
+    commits, pool = _queue(write_batch, max_wait=0.05)
+    futures = [commits.submit(n) for n in range(3)]
+    assert all(isinstance(f.exception(5), RuntimeError) for f in futures)
+    assert pool.stats()["idle"] == 1        # rolled back and returned, still usable
+    commits.shutdown(wait=True)
+    pool.close()
+
+
+def test_shutdown_writes_what_is_queued():
+    written = []
+    commits, pool = _queue(lambda conn, items: written.extend(items) or [None] * len(items), max_wait=1.0)
+    for n in range(4):
+        commits.submit(n)
+    commits.shutdown(wait=True)
+    assert written == [(0,), (1,), (2,), (3,)]
+    pool.close()
@@ -0,0 +1,58 @@
+import csv
+import gzip
+import io
+import json
+import sqlite3
+from datetime import date
+
+from export_applications import COLUMNS, export_applications, main, write_rows
+from migrations import migrate
+
+
+def _database(path):
+    conn = sqlite3.connect(path)
+    migrate(conn, "sqlite")
+    conn.executemany("INSERT INTO jobs (id, title, company) VALUES (?, ?, ?)", [(1, "Clerk", "Acme"), (2, "Nurse", "City")])
+    conn.executemany(
+        "INSERT INTO applications (job_id, applicant_name, applicant_email, created_at) VALUES (?, ?, ?, ?)",
+        [(1, f"seeker {i}", f"s{i}@example.com", f"2024-01-0{i + 1} 10:00:00") for i in range(5)]
+        + [(2, "nurse", "n@example.com", "2024-01-03 09:00:00")],
+    )
+    conn.commit()
+    return conn
+
+
+def test_csv_export_filters_by_employer_and_dates(tmp_path):
+    conn = _database(str(tmp_path / "portal.db"))
+    out = io.StringIO()
+    count = export_applications(conn, out, "csv", employer="Acme", since=date(2024, 1, 2), until=date(2024, 1, 4),
+                                dialect="sqlite", fetch_size=2)
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert count == 3
+    assert rows[0] == list(COLUMNS)
+    assert [r[COLUMNS.index("applicant_name")] for r in rows[1:]] == ["seeker 1", "seeker 2", "seeker 3"]
+    conn.close()
+
+
+def test_rows_are_written_batch_by_batch():
+    out = io.StringIO()
+    written = []
+
+    def batches():
+        for i in range(3):
+            written.append(out.getvalue().count("\n"))     # lines already out when the next batch is read
+            yield [(i,) + (None,) * (len(COLUMNS) - 1)] * 2
+
+    assert write_rows(out, "jsonl", batches()) == 6
+    assert written == [0, 2, 4]
+    assert json.loads(out.getvalue().splitlines()[-1])["application_id"] == 2
+
+
+def test_main_writes_gzipped_jsonl(tmp_path, capsys):
+    _database(str(tmp_path / "portal.db")).close()
+    path = str(tmp_path / "out.jsonl.gz")
+    assert main([path, "--sqlite", str(tmp_path / "portal.db"), "--employer", "City"]) == 0
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [(r["company"], r["job_title"], r["applicant_email"]) for r in records] == [("City", "Nurse", "n@example.com")]
+    assert "1 applications exported" in capsys.readouterr().err
@@ -0,0 +1,36 @@
+from facets import FacetIndex
+
+
+def _index():
+    facets = FacetIndex(("Company", "Location"))
+    facets.add(1, {"Company": "Acme", "Location": "Pune"})
+    facets.add(2, {"Company": "Acme", "Location": "Delhi"})
+    facets.add(3, {"Company": "Initech", "Location": "Pune"})
+    facets.add(4, {"Company": "Initech", "Location": None})    # no location: left out of that facet
+    return facets
+
+
+def test_counts_without_a_selection():
+    assert _index().counts({}) == {"Company": {"Acme": 2, "Initech": 2}, "Location": {"Pune": 2, "Delhi": 1}}
+
+
+def test_each_facet_is_counted_against_the_other_selections():
+    counts = _index().counts({"Company": {"Acme"}})
+    assert counts["Company"] == {"Acme": 2, "Initech": 2}   # other companies stay choosable
+    assert counts["Location"] == {"Pune": 1, "Delhi": 1}
+
+
+def test_matching_ors_within_a_facet_and_ands_across():
+    facets = _index()
+    assert facets.matching({"Company": {"Acme", "Initech"}}) == {1, 2, 3, 4}
+    assert facets.matching({"Company": {"Initech"}, "Location": {"Pune", "Delhi"}}) == {3}
+    assert facets.matching({"Company": {"Nobody"}}) == set()
+    assert facets.matching({}) is None
+
+
+def test_changes_keep_counts_current():
+    facets = _index()
+    facets.add(2, {"Company": "Initech", "Location": "Delhi"})     # re-indexed
+    facets.remove(1)
+    assert facets.counts({}) == {"Company": {"Initech": 3}, "Location": {"Pune": 1, "Delhi": 1}}
+    assert 1 not in facets and len(facets) == 3
@@ -0,0 +1,51 @@
+import os
+import sqlite3
+
+import migrations
+
+LEGACY_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "job_portal cont", "create_job_portal_db.sql")
+
+
+def test_legacy_layout_is_migrated(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "legacy.db"))
+    with open(LEGACY_SQL) as f:
+        conn.executescript(f.read())
+    conn.execute("INSERT INTO employer VALUES ('E1', 'Acme', 'IT', 'Pune', 'acme.example', 'Ann', 12345)")
+    conn.execute("INSERT INTO joblisting VALUES ('J1', 'Clerk', 'E1', 'Files', 'Typing', 'Pune', 40000, 'O', "
+                 "'2024-01-01')")
+    conn.execute("INSERT INTO users VALUES ('U1', 'ann', 'ann@example.com', 'secret')")
+    conn.execute("INSERT INTO job_application VALUES ('A1', 'J1', 'U1', '2024-02-01', 'P', 'Hello')")
+    conn.commit()
+
+    start, version, _ = migrations.migrate(conn, "sqlite")
+
+    assert (start, version) == (0, migrations.SCHEMA_VERSION)
+    assert conn.execute("SELECT title, description, salary, company, salary_min FROM jobs").fetchall() == [
+        ("Clerk", "Files\n\nTyping", "40000", "Acme", 40000)]
+    assert conn.execute("SELECT username, email, password FROM users").fetchall() == [
+        ("ann", "ann@example.com", "secret")]
+    assert conn.execute("SELECT applicant_name, applicant_email FROM applications").fetchall() == [
+        ("ann", "ann@example.com")]
+    assert migrations.table_exists(conn.cursor(), "job_recommendation")
+    assert migrations.migrate(conn, "sqlite")[:2] == (version, version)
+    conn.close()
+
+
+def test_mysql_script_is_generated_from_the_migrations():
+    with open(os.path.join(os.path.dirname(LEGACY_SQL), "job_portal_schema.sql")) as f:
+        assert f.read() == migrations.mysql_script()
+
+
+def test_mysql_script_can_run_again():
+    script = migrations.mysql_script()
+    statements = [s.strip() for s in script.replace("//", ";").split(";") if s.strip()]
+    for name in migrations.MYSQL_TRIGGERS:
+        drop = statements.index(f"DROP TRIGGER IF EXISTS {name}")
+        assert drop < next(i for i, s in enumerate(statements) if s.startswith(f"CREATE TRIGGER {name} "))
+    for statement in statements:
+        assert not statement.startswith(("CREATE INDEX", "ALTER TABLE"))
+        assert not statement.startswith("CREATE TABLE") or statement.startswith("CREATE TABLE IF NOT EXISTS")
+        assert not statement.startswith("INSERT INTO") or "WHERE NOT EXISTS" in statement
+    guarded = [s for s in statements if s.startswith("SET @ddl = IF(EXISTS")]
+    assert len(guarded) == script.count("ADD INDEX") + script.count("ADD FULLTEXT INDEX")
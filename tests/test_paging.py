@@ -0,0 +1,17 @@
+from paging import KeysetPager
+
+
+def test_failed_fetch_is_retried_by_the_next_request():
+    calls, pages = [], []
+
+    def fetch_page(after, limit, deliver):
+        calls.append(after)
+        deliver(None if len(calls) == 1 else list(range(after or 0, (after or 0) + limit)))
+
+    pager = KeysetPager(fetch_page, page_size=3, key=lambda row: row + 1, read_ahead=False)
+    pager.next_page(pages.append)
+    assert pages == [None] and not pager.loading and not pager.done
+    pager.next_page(pages.append)
+    pager.next_page(pages.append)
+    assert pages == [None, [0, 1, 2], [3, 4, 5]]
+    assert calls == [None, None, 3]
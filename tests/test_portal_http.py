@@ -0,0 +1,31 @@
+import asyncio
+
+from portal_http import PortalServer
+
+
+async def _exchange(request):
+    server = PortalServer(service=None, db=None, applications=None, passwords=None)
+    listener = await asyncio.start_server(server.handle_client, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        return response
+    finally:
+        listener.close()
+        await listener.wait_closed()
+
+
+def test_oversized_header_gets_431():
+    request = b"GET /jobs HTTP/1.1\r\nHost: x\r\nX-Big: " + b"a" * 100_000 + b"\r\n\r\n"
+    response = asyncio.run(_exchange(request))
+    assert response.startswith(b"HTTP/1.1 431 ")
+
+
+def test_oversized_request_line_gets_414():
+    request = b"GET /jobs?q=" + b"a" * 100_000 + b" HTTP/1.1\r\n\r\n"
+    response = asyncio.run(_exchange(request))
+    assert response.startswith(b"HTTP/1.1 414 ")
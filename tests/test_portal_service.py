@@ -0,0 +1,79 @@
+from portal_service import MySQLPortal, SQLitePortal
+
+
+class FakeCursor:
+    column_names = ("id",)
+    lastrowid = None
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=()):
+        self.conn.executed.append((sql, list(params)))
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    connection_id = 1
+
+    def __init__(self):
+        self.executed = []
+
+    def cursor(self, prepared=False):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+
+def test_prepared_statements_count_the_reset():
+    portal, conn = MySQLPortal(), FakeConnection()
+    portal.get_job(conn, 1)
+    assert portal.round_trips.last == ("get_job", 3)     # prepare, reset, execute
+    portal.get_job(conn, 2)
+    assert portal.round_trips.last == ("get_job", 2)     # reset, execute
+    portal.set_password_hash(conn, 1, "hash")
+    portal.set_password_hash(conn, 1, "hash")
+    assert portal.round_trips.last == ("set_password_hash", 3)   # reset, execute, commit
+
+
+def test_salary_keyset_is_spelled_out_for_the_range_optimizer():
+    portal, conn = MySQLPortal(), FakeConnection()
+    portal.filtered_page(conn, (None, None, "Salary: high to low", frozenset()), (90000, 17), 50)
+    sql, params = conn.executed[-1]
+    assert "(j.SalaryMax < %s) OR (j.SalaryMax = %s AND j.ID < %s)" in sql
+    assert "ORDER BY j.SalaryMax DESC, j.ID DESC" in sql
+    assert params == [90000, 90000, 17, 50]
+
+
+def _sqlite_portal(tmp_path):
+    conn = SQLitePortal.connect(str(tmp_path / "portal.db"))
+    portal = SQLitePortal.prepare(conn)
+    conn.executemany("INSERT INTO jobs (title, description, salary, company) VALUES (?, ?, ?, ?)", [
+        ("Python developer", "Build web services in Python and SQL for our clients.", "80k", "Acme"),
+        ("Nurse", "Care for patients on the ward.", "50000", "City Hospital"),
+    ])
+    conn.commit()
+    return portal, conn
+
+
+def test_sqlite_search_highlights_matches(tmp_path):
+    portal, conn = _sqlite_portal(tmp_path)
+    job, = portal.search_page(conn, "python")
+    assert job["title"] == "Python developer"
+    assert job["title_highlight"] == "[Python] developer"
+    assert "[Python]" in job["snippet"]
+    conn.close()
+
+
+def test_sqlite_search_without_fts_has_the_same_fields(tmp_path):
+    portal, conn = _sqlite_portal(tmp_path)
+    portal.fts_enabled = False
+    job, = portal.search_page(conn, "Nurse")
+    assert (job["title_highlight"], job["snippet"]) == ("Nurse", None)
+    conn.close()
@@ -0,0 +1,143 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from recommend import TermHasher
+
+
+def test_term_hasher_batch_agrees_with_counts_and_keeps_no_words():
+    hasher = TermHasher(bits=10)
+    texts = ["python sql python", "", "care ward care care"]
+    rows, cols, counts = hasher.batch(texts)
+    for i, text in enumerate(texts):
+        got = {int(c): int(n) for r, c, n in zip(rows, cols, counts) if r == i}
+        assert got == dict(hasher.counts(text))
+    assert vars(hasher) == {"dim": 1024, "_mask": 1023}
+
+
+JOBS = [(i, f"{['python', 'java', 'nurse', 'sql'][i % 4]} developer {['remote', 'ward', 'data'][i % 3]}")
+        for i in range(1, 41)]
+
+
+def _same(got, expected):
+    # jobs with equal scores come in row order, which a merge can change
+    assert dict(got) == pytest.approx(dict(expected))
+    assert [score for _, score in got] == pytest.approx([score for _, score in expected])
+
+
+def test_added_jobs_score_as_if_built_together(monkeypatch):
+    import recommend
+    from recommend import JobRecommender
+
+    full = JobRecommender(bits=12).build(JOBS)
+    grown = JobRecommender(bits=12).build(JOBS[:30])
+    grown.add(JOBS[30:])
+    assert grown._delta and len(grown) == len(full)
+    for skills in ("python data", "nurse ward", "sql remote developer"):
+        _same(grown.recommend(skills, k=40), full.recommend(skills, k=40))
+
+    # past the delta's limit, the next add merges it into the main segment
+    monkeypatch.setattr(recommend, "DELTA_MERGE_MIN", 0)
+    monkeypatch.setattr(recommend, "DELTA_MERGE_RATIO", 0)
+    grown.add([JOBS[0]])
+    assert not grown._delta and grown.alive.all()
+    for skills in ("python data", "nurse ward"):
+        _same(grown.recommend(skills, k=40), full.recommend(skills, k=40))
+
+
+def test_replaced_and_removed_jobs(monkeypatch):
+    import recommend
+    from recommend import JobRecommender
+
+    index = JobRecommender(bits=12).build(JOBS)
+    index.add([(1, "cobol mainframe")])             # replaces job 1
+    index.remove([2, 99])
+    assert len(index) == 39
+    assert [job for job, _ in index.recommend("cobol")] == [1]
+    assert 2 not in [job for job, _ in index.recommend("java developer", k=40)]
+    assert {job for job, _ in index.recommend("python", k=40, exclude=[4, 8])} == set(range(12, 41, 4))
+
+    monkeypatch.setattr(recommend, "DELTA_MERGE_MIN", 0)
+    monkeypatch.setattr(recommend, "DELTA_MERGE_RATIO", 0)
+    index.add([(100, "cobol")])
+    assert len(index.ids) == len(index) == 40      # merged: the dead rows are gone
+    assert sorted(index.rows) == sorted({i for i, _ in JOBS} - {2} | {100})
+    assert {job for job, _ in index.recommend("cobol")} == {1, 100}
+    rebuilt = JobRecommender(bits=12).build([(job, text) for job, text in JOBS if job not in (1, 2)]
+                                            + [(1, "cobol mainframe"), (100, "cobol")])
+    _same(index.recommend("java developer", k=40), rebuilt.recommend("java developer", k=40))
+
+
+class FakeService:
+    """The three reads ApplicantRanker makes, over a list of applications per job."""
+
+    def __init__(self):
+        self.jobs = {1: {"title": "python developer", "description": "python sql data"}}
+        self.applications = {1: []}
+        self.calls = []
+
+    def apply(self, job_id, skills, letter):
+        rows = self.applications[job_id]
+        rows.append({"application_id": len(rows) + 1, "skills": skills, "experience": "", "cover_letter": letter})
+
+    def application_stamp(self, conn, job_id):
+        rows = self.applications.get(job_id, [])
+        return len(rows), rows[-1]["application_id"] if rows else None
+
+    def get_job(self, conn, job_id):
+        return self.jobs.get(job_id)
+
+    def applicants(self, conn, job_id):
+        self.calls.append(job_id)
+        return [dict(row) for row in self.applications[job_id]]
+
+
+def _ranker(service, **kwargs):
+    from recommend import ApplicantRanker
+
+    ranker = ApplicantRanker(service, **kwargs)
+    letters = []
+    batch = ranker.terms.batch
+    ranker.terms.batch = lambda texts: (letters.append(list(texts)), batch(texts))[1]
+    return ranker, letters
+
+
+def test_ranking_is_cached_until_the_job_gets_an_application():
+    service = FakeService()
+    service.apply(1, "java", "hello")
+    service.apply(1, "python sql", "I love python")
+    ranker, batches = _ranker(service)
+    first = ranker.ranked(None, 1)
+    assert [a["application_id"] for a in first] == [2, 1]
+    assert ranker.ranked(None, 1) is first and service.calls == [1]
+
+    service.apply(1, "python sql data", "python data")
+    batches.clear()
+    ranked = ranker.ranked(None, 1)
+    assert ranked[0]["application_id"] == 3 and service.calls == [1, 1]
+    assert ["python data"] in batches                # only the new cover letter is vectorized
+    fresh, _ = _ranker(service)
+    assert ranked == fresh.ranked(None, 1)
+
+    service.calls.clear()
+    ranker.invalidate([1, 2])
+    assert ranker.ranked(None, 1) == ranked and service.calls == [1]
+    assert ranker.ranked(None, 2) is None
+
+
+def test_withdrawn_application_reranks_from_scratch_and_cache_is_bounded():
+    service = FakeService()
+    for letter in ("a python", "b sql", "c data"):
+        service.apply(1, "python", letter)
+    ranker, batches = _ranker(service, max_jobs=1)
+    ranker.ranked(None, 1)
+    del service.applications[1][0]
+    batches.clear()
+    assert [a["application_id"] for a in ranker.ranked(None, 1)] == [2, 3]
+    assert ["b sql", "c data"] in batches
+
+    service.jobs[2] = {"title": "nurse", "description": "ward"}
+    service.applications[2] = []
+    service.apply(2, "nurse", "ward")
+    ranker.ranked(None, 2)
+    assert list(ranker._cache) == [2]
@@ -0,0 +1,35 @@
+import pytest
+
+from salary import parse_amount, parse_salary
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$100,000", (100_000, 100_000)),
+    ("80k - 120k", (80_000, 120_000)),
+    ("80-120k", (80_000, 120_000)),
+    ("₹8,00,000", (800_000, 800_000)),
+    ("1.5k", (1_500, 1_500)),
+    ("10M", (10_000_000, 10_000_000)),
+    ("5 LPA", (500_000, 500_000)),
+    # a word starting with a suffix letter is not a suffix
+    ("50000 monthly", (50_000, 50_000)),
+    ("$60,000 Mumbai", (60_000, 60_000)),
+    ("100000INR", (100_000, 100_000)),
+    # suffixes in any case
+    ("5 Lakhs", (500_000, 500_000)),
+    ("80K", (80_000, 80_000)),
+    # "." and "," before three digits group thousands
+    ("100.000", (100_000, 100_000)),
+    ("1.234.567", (1_234_567, 1_234_567)),
+    ("1,234.56", (1_234, 1_234)),
+    ("Negotiable", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_salary(text, expected):
+    assert parse_salary(text) == expected
+
+
+def test_parse_amount():
+    assert parse_amount("60,000 Mumbai") == 60_000
+    assert parse_amount("5 Lakhs") == 500_000
+    assert parse_amount("") is None
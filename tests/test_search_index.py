@@ -0,0 +1,75 @@
+from search_index import SearchIndex, TrigramIndex, edit_distance
+
+
+class Doc:
+    def __init__(self, id_, title, description="", company="Acme"):
+        self.id = id_
+        self.title = title
+        self.description = description
+        self.company = company
+
+
+def _index():
+    titles = ["python developer", "data engineer", "python data engineer", "manager"]
+    return SearchIndex().build([Doc(i, titles[i % 4], "python" * (i % 3 == 0)) for i in range(1, 501)])
+
+
+def test_pages_of_top_match_full_ranking():
+    index = _index()
+    for query in ("python", "data engineer", "pyth"):
+        scores = index.match(query)
+        ranked = [d.id for d in index.search(query)]
+        assert len(ranked) == len(scores)
+        pages = [d.id for offset in range(0, len(scores), 50) for d in index.top(scores, 50, offset)]
+        assert pages == ranked
+
+
+def test_top_by_key_and_removed_jobs():
+    index = _index()
+    scores = index.match("manager")
+    assert [d.id for d in index.top(scores, 3, key=lambda d: d, reverse=False)] == [3, 7, 11]
+    index.remove(499)
+    assert 499 not in [d.id for d in index.top(scores, 5)]
+
+
+def test_no_match():
+    assert _index().match("cobol") == {}
+    assert _index().search("cobol") == []
+
+
+def test_narrowing_a_query_filters_its_previous_results():
+    index = _index()
+    assert index.narrows("pyth", "python")
+    assert index.narrows("python", "python eng")
+    assert not index.narrows("py", "pyth")                  # too short: matched whole tokens only
+    assert not index.narrows("python", "python OR manager")
+    assert not index.narrows("data", "python")
+    for old, new in (("pyth", "python"), ("python", "python eng"), ("data", "data engineer")):
+        previous = set(index.match(old))
+        # the same matches; a lone term's scores come back as its postings, which rank the same
+        assert index.match(new, within=previous).keys() == index.match(new).keys()
+
+
+def test_trigram_index_corrects_typos():
+    fuzzy = TrigramIndex(["python", "pandas", "manager", "engineer", "java"])
+    assert fuzzy.similar("pyhton") == ["python"]           # transposition
+    assert fuzzy.similar("enginer")[0] == "engineer"        # missing letter
+    assert fuzzy.similar("zzzzzz") == []
+    assert fuzzy.correct("pyhton OR jav") == "python OR java"
+    assert fuzzy.correct("python manager") is None         # nothing to fix
+    fuzzy.discard("python")
+    assert "python" not in fuzzy.similar("pyhton")
+
+
+def test_suggest_fixes_a_query_that_matched_nothing():
+    index = _index()
+    assert index.match("pyhton enginer") == {}
+    corrected = index.suggest("pyhton enginer")
+    assert corrected == "python engineer"
+    assert index.match(corrected)
+
+
+def test_edit_distance_is_bounded():
+    assert edit_distance("python", "pyhton", 2) == 1
+    assert edit_distance("kitten", "sitting", 2) == 3      # over the bound: bound + 1
+    assert edit_distance("a", "abcdef", 2) == 3